@@ -0,0 +1,115 @@
+"""Micro-batching: process items that arrive together in one call.
+
+Items submitted under the same key within ``window_seconds`` of the first
+one, up to ``max_size`` of them, form a group. Each group is handed to
+``process`` in a single executor task, and every submitter gets its own
+outcome through a ``Future``, so nobody holds a thread while waiting.
+"""
+
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Group:
+    __slots__ = ("key", "deadline", "items", "futures")
+
+    def __init__(self, key: Hashable, deadline: float):
+        self.key = key
+        self.deadline = deadline
+        self.items: List[Any] = []
+        self.futures: List[Future] = []
+
+
+class Coalescer:
+    """Collects items per key and processes each group in one executor task.
+
+    ``process(key, items)`` returns one outcome per item, in order: a result,
+    or an exception to raise for that item alone. If ``process`` itself
+    raises, or the executor refuses the task, every item in the group fails
+    with that error. A ``window_seconds`` of 0 processes every item alone.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Hashable, List[Any]], List[Any]],
+        executor: Executor,
+        window_seconds: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.process = process
+        self.executor = executor
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._clock = clock
+        # Groups in creation order, which is also deadline order
+        self._open: Dict[Hashable, _Group] = {}
+        self._condition = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+
+    def submit(self, key: Hashable, item: Any) -> Future:
+        future: Future = Future()
+        with self._condition:
+            group = self._open.get(key)
+            if group is None:
+                group = _Group(key, self._clock() + self.window_seconds)
+                self._open[key] = group
+                self._start_flusher()
+                self._condition.notify()
+            group.items.append(item)
+            group.futures.append(future)
+            full = len(group.items) >= self.max_size or self.window_seconds <= 0
+            if full:
+                del self._open[key]
+        if full:
+            self._dispatch(group)
+        return future
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None and self.window_seconds > 0:
+            self._flusher = threading.Thread(target=self._flush_expired, name="coalescer", daemon=True)
+            self._flusher.start()
+
+    def _flush_expired(self) -> None:
+        while True:
+            with self._condition:
+                while not self._open:
+                    self._condition.wait()
+                first = next(iter(self._open.values()))
+                delay = first.deadline - self._clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                del self._open[first.key]
+            self._dispatch(first)
+
+    def _dispatch(self, group: _Group) -> None:
+        try:
+            self.executor.submit(self._run, group)
+        except Exception as exc:
+            for future in group.futures:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(exc)
+
+    def _run(self, group: _Group) -> None:
+        # Submitters that gave up before processing started are left out
+        live = [
+            (item, future)
+            for item, future in zip(group.items, group.futures)
+            if future.set_running_or_notify_cancel()
+        ]
+        if not live:
+            return
+        try:
+            outcomes = self.process(group.key, [item for item, _ in live])
+        except Exception as exc:
+            for _, future in live:
+                future.set_exception(exc)
+            return
+        for (_, future), outcome in zip(live, outcomes):
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
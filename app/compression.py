@@ -0,0 +1,215 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+gzip is always available; zstd and brotli are offered when the
+``zstandard`` or ``brotli`` packages are installed. Whole bodies below the
+configured minimum size are sent as is, and compressed bodies of responses
+that carry an ``ETag`` are cached, so polling an unchanged listing does not
+compress it again. Streamed responses are compressed chunk by chunk.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import COMPRESSION_CACHE_SIZE, get_compression_min_size
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class _Stream:
+    """Incremental compressor with a common ``compress``/``flush``/``finish`` shape."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes], finish: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+        self.finish = finish
+
+
+def _gzip_stream() -> _Stream:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return _Stream(compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush)
+
+
+def _gzip(data: bytes) -> bytes:
+    stream = _gzip_stream()
+    return stream.compress(data) + stream.finish()
+
+
+# Server preference order, used to break ties between equal q-values
+ENCODERS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[], _Stream]]] = {}
+if zstandard is not None:
+    def _zstd_stream() -> _Stream:
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        return _Stream(
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+    ENCODERS["zstd"] = (zstandard.ZstdCompressor(level=3).compress, _zstd_stream)
+if brotli is not None:
+    def _brotli_stream() -> _Stream:
+        compressor = brotli.Compressor(quality=4)
+        return _Stream(compressor.process, compressor.flush, compressor.finish)
+
+    ENCODERS["br"] = (lambda data: brotli.compress(data, quality=4), _brotli_stream)
+ENCODERS["gzip"] = (_gzip, _gzip_stream)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the supported coding with the highest q-value, or ``None`` for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[coding] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in ENCODERS:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressedBodyCache:
+    """Small LRU of compressed bodies keyed by request target, ETag and coding."""
+
+    def __init__(self, max_entries: int = COMPRESSION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON and NDJSON responses."""
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None, cache: Optional[CompressedBodyCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else get_compression_min_size()
+        self.cache = cache if cache is not None else CompressedBodyCache()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, scope, coding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.target = (scope["path"], scope.get("query_string", b""))
+        self._send = send
+        self._start: Optional[Message] = None
+        self._stream: Optional[_Stream] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self._passthrough:
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._stream is not None:
+            data = self._stream.compress(body) + (self._stream.flush() if more_body else self._stream.finish())
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+        elif not more_body:
+            await self._send_whole(body)
+        else:
+            # A streamed body: its size is unknown up front, so always compress
+            self._stream = ENCODERS[self.coding][1]()
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self._send(self._start)
+            data = self._stream.compress(body) + self._stream.flush()
+            await self._send({"type": "http.response.body", "body": data, "more_body": True})
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size:
+            await self._send(self._start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+        etag = Headers(raw=self._start["headers"]).get("etag")
+        key = (self.target, etag, self.coding)
+        compressed = self.middleware.cache.get(key) if etag else None
+        if compressed is None:
+            compressed = ENCODERS[self.coding][0](body)
+            if etag:
+                self.middleware.cache.put(key, compressed)
+        headers = self._encoded_headers()
+        headers["content-length"] = str(len(compressed))
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["content-encoding"] = self.coding
+        vary: List[str] = [value.strip() for value in headers.get("vary", "").split(",") if value.strip()]
+        if "accept-encoding" not in (value.lower() for value in vary):
+            vary.append("Accept-Encoding")
+        headers["vary"] = ", ".join(vary)
+        return headers
@@ -14,27 +14,135 @@ HOST = "0.0.0.0"
 # Business Logic Settings
 MAX_BATCH_SIZE = 20
 MAX_TOTAL_HOSPITALS = 10000
+DEFAULT_DEDUP_MODE = "off"  # off, return (the existing hospital) or reject (409)
+DEDUP_MODES = ("off", "return", "reject")
+STREAM_CHUNK_SIZE = 500  # rows per read and per write when streaming NDJSON
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Storage Settings
+DEFAULT_STORAGE_BACKEND = "memory"
+DEFAULT_EVICTION_POLICY = "fifo"  # fifo, inactive_first or lru
+DEFAULT_MAX_STORE_BYTES = 0  # estimated byte budget for in-memory rows (0 = row count only)
+DEFAULT_SQLITE_PATH = "hospitals.db"
+SQLITE_POOL_SIZE = 4
+DEFAULT_JOURNAL_DIR = "journal"
+JOURNAL_FSYNC_BATCH = 64  # fsync the write-ahead log every N entries (1 = every write)
+JOURNAL_SNAPSHOT_INTERVAL = 100000  # compact into a snapshot every N log entries (0 = never)
+DEFAULT_SHARED_STORE_ADDRESS = "127.0.0.1:0"  # port 0 picks a free port
+SHARED_STORE_POOL_SIZE = 4  # connections each worker keeps to the store server
+
+# Idempotency Settings
+IDEMPOTENCY_CACHE_SIZE = 10000  # most recent Idempotency-Key responses kept
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+
+# Background Job Settings
+JOB_CACHE_SIZE = 10000  # finished create jobs kept for polling
+JOB_TTL_SECONDS = 60 * 60
+
+# CSV Import Settings
+IMPORT_CHUNK_SIZE = 20  # rows per batch created by an import (at most MAX_BATCH_SIZE)
+IMPORT_MAX_PENDING_CHUNKS = 8  # chunks an import may have queued before it stops reading the upload
+IMPORT_MAX_RECORD_SIZE = 64 * 1024  # characters in one CSV record
+IMPORT_MAX_ERRORS = 100  # failed rows reported in detail per import
+IMPORT_MAX_BATCH_IDS = 100  # batch ids listed per import; batch_count has the total
+IMPORT_HISTORY_SIZE = 100  # finished imports kept for progress polling
+
+# Compression Settings
+DEFAULT_COMPRESSION_MIN_SIZE = 1024  # bytes; smaller response bodies are sent uncompressed
+COMPRESSION_CACHE_SIZE = 64  # compressed bodies of ETag-tagged responses kept for reuse
 
 # Processing Settings
 SLOW_TASK_DELAY_SECONDS = 5
+DEFAULT_CREATE_WORKERS = 64  # threads reserved for create requests, apart from the read threadpool
+DEFAULT_CREATE_QUEUE_DEPTH = 256  # creates waiting for a worker before new ones get 503
+DEFAULT_COALESCE_WINDOW_MS = 20  # creates for one batch arriving this close together share a pass (0 = off)
+DEFAULT_COALESCE_MAX_SIZE = 20  # most creates processed in one pass
 
 # Rate Limiting Settings (requests per minute)
 RATE_LIMITS = {
     "health_check": "100/minute",
     "create_hospital": "30/minute",
+    "bulk_create_hospitals": "30/minute",
+    "get_job": "50/minute",
+    "import_hospitals": "5/minute",
+    "get_import": "50/minute",
     "get_hospitals": "50/minute",
     "get_hospital_by_id": "50/minute",
+    "search_hospitals": "50/minute",
     "update_hospital": "50/minute",
     "delete_hospital": "50/minute",
     "get_batch": "50/minute",
     "delete_batch": "50/minute",
     "activate_batch": "50/minute",
+    "get_stats": "50/minute",
 }
 
 def get_port() -> int:
     """Get the port from environment variable or use default."""
     return int(os.getenv("PORT", DEFAULT_PORT))
 
+def get_workers() -> int:
+    """Get the number of uvicorn worker processes from environment variable."""
+    return int(os.getenv("WORKERS", 1))
+
+def get_create_workers() -> int:
+    """Get the number of threads serving create requests from environment variable or use default."""
+    return int(os.getenv("CREATE_WORKERS", DEFAULT_CREATE_WORKERS))
+
+def get_create_queue_depth() -> int:
+    """Get how many creates may wait for a worker from environment variable or use default."""
+    return int(os.getenv("CREATE_QUEUE_DEPTH", DEFAULT_CREATE_QUEUE_DEPTH))
+
+def get_coalesce_window_ms() -> float:
+    """Get how long a create waits for others from its batch from environment variable or use default."""
+    return float(os.getenv("CREATE_COALESCE_WINDOW_MS", DEFAULT_COALESCE_WINDOW_MS))
+
+def get_coalesce_max_size() -> int:
+    """Get the most creates processed together from environment variable or use default."""
+    return int(os.getenv("CREATE_COALESCE_MAX_SIZE", DEFAULT_COALESCE_MAX_SIZE))
+
+def get_dedup_mode() -> str:
+    """Get the duplicate handling mode for hospital creation."""
+    mode = os.getenv("DEDUP_MODE", DEFAULT_DEDUP_MODE).lower()
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown DEDUP_MODE '{mode}', expected one of: {', '.join(DEDUP_MODES)}")
+    return mode
+
+def get_storage_backend() -> str:
+    """Get the storage backend name from environment variable or use default."""
+    return os.getenv("STORAGE_BACKEND", DEFAULT_STORAGE_BACKEND)
+
+def get_eviction_policy() -> str:
+    """Get the eviction policy name from environment variable or use default."""
+    return os.getenv("EVICTION_POLICY", DEFAULT_EVICTION_POLICY)
+
+def get_max_store_bytes() -> int:
+    """Get the in-memory byte budget from environment variable or use default."""
+    return int(os.getenv("MAX_STORE_BYTES", DEFAULT_MAX_STORE_BYTES))
+
+def get_compression_min_size() -> int:
+    """Get the minimum body size worth compressing from environment variable or use default."""
+    return int(os.getenv("COMPRESSION_MIN_SIZE", DEFAULT_COMPRESSION_MIN_SIZE))
+
+def get_sqlite_path() -> str:
+    """Get the SQLite database path from environment variable or use default."""
+    return os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+
+def get_journal_dir() -> str:
+    """Get the write-ahead log directory from environment variable or use default."""
+    return os.getenv("JOURNAL_DIR", DEFAULT_JOURNAL_DIR)
+
+def get_shared_store_address() -> str:
+    """Get the local store server address (host:port or Unix socket path)."""
+    return os.getenv("SHARED_STORE_ADDRESS", DEFAULT_SHARED_STORE_ADDRESS)
+
+def get_shared_store_authkey() -> str:
+    """Get the hex-encoded authkey workers use to reach the store server."""
+    return os.getenv("SHARED_STORE_AUTHKEY", "")
+
 def get_environment() -> str:
     """Get the current environment."""
     return os.getenv("ENVIRONMENT", "development")
@@ -1,79 +1,107 @@
-from typing import List, Optional
-from .models import Hospital
-from .config import MAX_TOTAL_HOSPITALS
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .models import BatchSummary, Hospital, StoreStats
+from .storage import StorageBackend, create_backend
 from uuid import UUID
-from collections import deque
 
-# FIFO storage with maximum capacity
-hospitals_db: deque = deque(maxlen=MAX_TOTAL_HOSPITALS)
-next_id: int = 1
+# Active storage backend, selected by the STORAGE_BACKEND setting
+store: StorageBackend = create_backend()
+
+
+def count_hospitals() -> int:
+    return store.count_hospitals()
 
 
 def get_all_hospitals() -> List[Hospital]:
-    return list(hospitals_db)
+    return store.get_all_hospitals()
+
+
+def get_all_hospitals_json(fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    return store.get_all_hospitals_json(fields)
+
+
+def get_hospitals_page(after_id: int, limit: int) -> List[Hospital]:
+    return store.get_hospitals_page(after_id, limit)
+
+
+def iter_hospitals() -> Iterator[Hospital]:
+    return store.iter_hospitals()
 
 
 def get_hospitals_by_batch_id(batch_id: UUID) -> List[Hospital]:
-    return [hospital for hospital in hospitals_db if hospital.creation_batch_id == batch_id]
+    return store.get_hospitals_by_batch_id(batch_id)
+
+
+def get_batch_size(batch_id: UUID) -> int:
+    return store.get_batch_size(batch_id)
+
+
+def get_batch_summary(batch_id: UUID) -> Optional[BatchSummary]:
+    return store.get_batch_summary(batch_id)
 
 
 def get_hospital_by_id(hospital_id: int) -> Optional[Hospital]:
-    for hospital in hospitals_db:
-        if hospital.id == hospital_id:
-            return hospital
-    return None
+    return store.get_hospital_by_id(hospital_id)
+
+
+def get_hospital_json(hospital_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]:
+    return store.get_hospital_json(hospital_id, fields)
 
 
 def create_hospital(hospital: Hospital) -> Hospital:
-    global next_id
-    hospital.id = next_id
-    next_id += 1
-    hospitals_db.append(hospital)
-    return hospital
+    return store.create_hospital(hospital)
+
+
+def create_hospitals(hospitals: List[Hospital]) -> List[Hospital]:
+    """Create several hospitals at once; either all are stored or none."""
+    return store.create_hospitals(hospitals)
+
+
+def find_or_create_hospitals(hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]:
+    """Store the hospitals that have no stored duplicate, atomically; each comes back with whether it was created."""
+    return store.find_or_create_hospitals(hospitals)
 
 
 def update_hospital(hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]:
-    global hospitals_db
-    # Convert to list for modification
-    hospital_list = list(hospitals_db)
-    for i, hospital in enumerate(hospital_list):
-        if hospital.id == hospital_id:
-            hospital_list[i] = updated_hospital
-            # Convert back to deque
-            hospitals_db = deque(hospital_list, maxlen=MAX_TOTAL_HOSPITALS)
-            return updated_hospital
-    return None
+    return store.update_hospital(hospital_id, updated_hospital)
+
+
+def update_hospital_fields(hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]:
+    """Change only the given fields; ``None`` if the hospital does not exist."""
+    return store.update_hospital_fields(hospital_id, fields)
 
 
 def delete_hospital(hospital_id: int) -> bool:
-    global hospitals_db
-    initial_len = len(hospitals_db)
-    # Convert to list, filter, and convert back to deque
-    filtered_hospitals = [hospital for hospital in hospitals_db if hospital.id != hospital_id]
-    hospitals_db = deque(filtered_hospitals, maxlen=MAX_TOTAL_HOSPITALS)
-    return len(hospitals_db) < initial_len
+    return store.delete_hospital(hospital_id)
 
 
 def delete_hospitals_by_batch_id(batch_id: UUID) -> int:
-    global hospitals_db
-    initial_len = len(hospitals_db)
-    # Convert to list, filter, and convert back to deque
-    filtered_hospitals = [hospital for hospital in hospitals_db if hospital.creation_batch_id != batch_id]
-    hospitals_db = deque(filtered_hospitals, maxlen=MAX_TOTAL_HOSPITALS)
-    return initial_len - len(hospitals_db)
+    return store.delete_hospitals_by_batch_id(batch_id)
 
 
 def has_active_hospitals_in_batch(batch_id: UUID) -> bool:
-    for hospital in hospitals_db:
-        if hospital.creation_batch_id == batch_id and hospital.active:
-            return True
-    return False
+    summary = store.get_batch_summary(batch_id)
+    return summary is not None and summary.active_count > 0
 
 
 def activate_hospitals_by_batch_id(batch_id: UUID) -> int:
-    count = 0
-    for hospital in hospitals_db:
-        if hospital.creation_batch_id == batch_id and not hospital.active:
-            hospital.active = True
-            count += 1
-    return count
+    return store.activate_hospitals_by_batch_id(batch_id)
+
+
+def find_duplicate(name: str, address: str, phone: Optional[str]) -> Optional[Hospital]:
+    return store.find_duplicate(name, address, phone)
+
+
+def search_hospitals(query: str, limit: int) -> List[Hospital]:
+    return store.search_hospitals(query, limit)
+
+
+def get_store_stats() -> StoreStats:
+    return store.get_stats()
+
+
+def get_version(batch_id: Optional[UUID] = None) -> Optional[str]:
+    """Opaque version of the whole store, or of one batch (``None`` if absent).
+
+    Changes whenever the rows it covers change, evictions included.
+    """
+    return store.get_version(batch_id)
@@ -0,0 +1,118 @@
+"""Idempotency-Key handling: share in-flight work and replay finished responses."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS
+
+
+class IdempotencyKeyReused(ValueError):
+    """An Idempotency-Key was sent again with a different request."""
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "result", "error", "expires_at")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[HTTPException] = None
+        self.expires_at = float("inf")  # In-flight entries never expire
+
+
+class IdempotencyCache:
+    """Bounded cache of responses keyed by client-supplied idempotency keys.
+
+    The first request for a key runs; concurrent requests with the same key
+    wait for it and get the same result. Finished results (including 4xx
+    ``HTTPException``s, which a retry would only repeat) are kept for
+    ``ttl_seconds`` in an LRU of at most ``max_entries``. Unexpected errors
+    are not cached, so one of the waiters runs the work again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_CACHE_SIZE,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(self, key: str, fingerprint: str, work: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``work`` once per key; returns ``(result, replayed)``."""
+        while True:
+            entry, owner = self._claim(key, fingerprint)
+            if owner:
+                return self._execute(key, entry, work), False
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            if entry.expires_at != float("inf"):
+                return entry.result, True
+            # The owner failed unexpectedly and dropped the entry; try again
+
+    def forget(self, key: str, result: Any) -> None:
+        """Drop a finished entry whose ``result`` turned out not to be worth replaying."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.result is result:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _claim(self, key: str, fingerprint: str) -> Tuple[_Entry, bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused(key)
+                self._entries.move_to_end(key)
+                return entry, False
+            entry = self._entries[key] = _Entry(fingerprint)
+            while len(self._entries) > self.max_entries:
+                # Waiters hold their own reference, so dropping in-flight entries is safe
+                self._entries.popitem(last=False)
+            return entry, True
+
+    def _execute(self, key: str, entry: _Entry, work: Callable[[], Any]) -> Any:
+        try:
+            entry.result = work()
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                self._abandon(key, entry)
+                raise
+            entry.error = exc
+            self._finish(entry)
+            raise
+        except BaseException:
+            self._abandon(key, entry)
+            raise
+        self._finish(entry)
+        return entry.result
+
+    def _finish(self, entry: _Entry) -> None:
+        entry.expires_at = self._clock() + self.ttl_seconds
+        entry.done.set()
+
+    def _abandon(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
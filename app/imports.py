@@ -0,0 +1,330 @@
+"""Streaming CSV imports: parse an upload as it arrives and track its progress.
+
+Nothing here holds the whole file: ``upload_chunks`` yields the CSV bytes of
+a raw or ``multipart/form-data`` body as they are received, ``CsvRecords``
+turns them into records with bounded buffering, and ``Import`` counts what
+became of each row.
+"""
+
+import codecs
+import csv
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from multipart.multipart import MultipartParser, parse_options_header
+from pydantic import ValidationError
+
+from app.config import IMPORT_HISTORY_SIZE, IMPORT_MAX_BATCH_IDS, IMPORT_MAX_ERRORS, IMPORT_MAX_RECORD_SIZE
+from app.models import Hospital, HospitalCreate, ImportRowError, ImportStatus
+
+IMPORT_COLUMNS = ("name", "address", "phone")
+REQUIRED_COLUMNS = ("name", "address")
+
+Record = Tuple[int, List[str]]
+
+
+class CsvRecords:
+    """Incremental CSV parser: feed bytes, get back complete records.
+
+    A record ends at a newline outside double quotes, so quoted fields may
+    span lines. Records come with the line number they start on. Raises
+    ``ValueError`` for undecodable input or a record longer than
+    ``max_record_size`` characters, which bounds the buffer.
+    """
+
+    def __init__(self, max_record_size: int = IMPORT_MAX_RECORD_SIZE):
+        self.max_record_size = max_record_size
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._scanned = 0  # buffer position up to which quotes were counted
+        self._quotes = 0
+        self._line = 1
+
+    def feed(self, data: bytes) -> List[Record]:
+        return self._split(self._decode(data, final=False), final=False)
+
+    def close(self) -> List[Record]:
+        return self._split(self._decode(b"", final=True), final=True)
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"Line {self._line}: file is not valid UTF-8") from exc
+
+    def _split(self, text: str, final: bool) -> List[Record]:
+        buffer = self._buffer + text
+        records: List[Record] = []
+        start = 0
+        while True:
+            end = buffer.find("\n", self._scanned)
+            if end == -1:
+                break
+            self._quotes += buffer.count('"', self._scanned, end)
+            self._scanned = end + 1
+            if self._quotes % 2 == 0:
+                # Escaped quotes come in pairs, so an even count means the newline is outside quotes
+                self._emit(buffer[start:end + 1], records)
+                start = self._scanned
+                self._quotes = 0
+        self._buffer = buffer[start:]
+        self._scanned -= start
+        if final:
+            self._emit(self._buffer, records)
+            self._buffer = ""
+            self._scanned = self._quotes = 0
+        elif len(self._buffer) > self.max_record_size:
+            raise ValueError(f"Line {self._line}: record exceeds {self.max_record_size} characters")
+        return records
+
+    def _emit(self, text: str, records: List[Record]) -> None:
+        line = self._line
+        self._line += text.count("\n")
+        if not text.strip():
+            return
+        try:
+            fields = next(csv.reader([text]))
+        except csv.Error as exc:
+            fields = [f"\0{exc}"]  # reported against the row by parse_row
+        records.append((line, fields))
+
+
+def parse_header(fields: List[str]) -> Dict[str, int]:
+    """Map import column names to positions; raises ``ValueError`` if required ones are missing."""
+    columns: Dict[str, int] = {}
+    for position, name in enumerate(fields):
+        name = name.strip().lower()
+        if name in IMPORT_COLUMNS and name not in columns:
+            columns[name] = position
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(
+            f"CSV header must include {', '.join(REQUIRED_COLUMNS)} columns, missing: {', '.join(missing)}"
+        )
+    return columns
+
+
+def parse_row(fields: List[str], columns: Dict[str, int], width: int) -> HospitalCreate:
+    """Validate one record against ``HospitalCreate``; raises ``ValueError`` with a readable message."""
+    if len(fields) == 1 and fields[0].startswith("\0"):
+        raise ValueError(f"Malformed CSV: {fields[0][1:]}")
+    if len(fields) != width:
+        raise ValueError(f"Expected {width} fields, got {len(fields)}")
+    values = {name: fields[position] for name, position in columns.items()}
+    if not values.get("phone"):
+        values["phone"] = None
+    try:
+        return HospitalCreate(**values)
+    except ValidationError as exc:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )) from None
+
+
+async def csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    records = CsvRecords()
+    async for data in chunks:
+        for record in records.feed(data):
+            yield record
+    for record in records.close():
+        yield record
+
+
+class _FilePart:
+    """Multipart callbacks collecting the data of the first file (or ``file`` field)."""
+
+    def __init__(self):
+        self.data: List[bytes] = []
+        self.found = False
+        self._reading = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._reading:
+            self.data.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        self._reading = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if not self.found and (b"filename" in options or options.get(b"name") == b"file"):
+            self.found = self._reading = True
+
+
+async def upload_chunks(content_type: str, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield the CSV bytes of an upload as they arrive.
+
+    Accepts a raw ``text/csv`` body or the first file of a
+    ``multipart/form-data`` body. Raises ``HTTPException`` for anything else.
+    """
+    media_type, params = parse_options_header(content_type)
+    if media_type == b"text/csv":
+        async for data in body:
+            yield data
+        return
+    if media_type != b"multipart/form-data":
+        raise HTTPException(status_code=415, detail="Send the CSV as multipart/form-data or text/csv")
+    if b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Missing boundary in multipart upload")
+
+    part = _FilePart()
+    parser = MultipartParser(params[b"boundary"], part.callbacks())
+    async for data in body:
+        parser.write(data)
+        if part.data:
+            yield b"".join(part.data)
+            part.data.clear()
+    parser.finalize()
+    if not part.found:
+        raise HTTPException(status_code=400, detail="Multipart upload has no file")
+
+
+class ImportIdInUse(ValueError):
+    """A client-chosen import id belongs to a known import that has not failed."""
+
+
+class Import:
+    """Progress of one CSV import, updated from the request and worker threads."""
+
+    def __init__(self, import_id: Optional[UUID] = None):
+        self._status = ImportStatus(id=import_id or uuid4(), status="receiving")
+        self._pending_chunks = 0
+        self._lock = threading.Lock()
+
+    @property
+    def id(self) -> UUID:
+        return self._status.id
+
+    @property
+    def finished(self) -> bool:
+        return self._status.finished_at is not None
+
+    @property
+    def failed(self) -> bool:
+        return self._status.status == "failed"
+
+    def snapshot(self) -> ImportStatus:
+        # Both lists only ever grow, with entries that never change, so
+        # copying the lists themselves is enough; they are bounded too
+        with self._lock:
+            status = self._status
+            return status.model_copy(update={"batch_ids": list(status.batch_ids), "errors": list(status.errors)})
+
+    def row_read(self) -> None:
+        with self._lock:
+            self._status.rows_read += 1
+
+    def row_failed(self, line: int, detail: str) -> None:
+        with self._lock:
+            self._fail_row(line, detail)
+
+    def chunk_started(self, batch_id: UUID) -> None:
+        with self._lock:
+            self._pending_chunks += 1
+            self._status.batch_count += 1
+            if len(self._status.batch_ids) < IMPORT_MAX_BATCH_IDS:
+                self._status.batch_ids.append(batch_id)
+
+    def chunk_finished(self, batch_id: UUID, lines: List[int], outcomes: List[object]) -> None:
+        """Record a chunk's outcomes: hospitals, or exceptions for rows that failed."""
+        # A row repeated within the chunk gets the row its first copy created
+        stored = set()
+        with self._lock:
+            for line, outcome in zip(lines, outcomes):
+                if isinstance(outcome, Hospital):
+                    if outcome.creation_batch_id == batch_id and outcome.id not in stored:
+                        self._status.rows_created += 1
+                    else:
+                        self._status.rows_duplicate += 1
+                    stored.add(outcome.id)
+                elif isinstance(outcome, HTTPException):
+                    self._fail_row(line, str(outcome.detail))
+                else:
+                    self._fail_row(line, "Internal error")
+            self._pending_chunks -= 1
+            self._finish_if_done()
+
+    def upload_finished(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._status.error = error
+            self._status.status = "processing"
+            self._finish_if_done()
+
+    def _fail_row(self, line: int, detail: str) -> None:
+        self._status.rows_failed += 1
+        if len(self._status.errors) < IMPORT_MAX_ERRORS:
+            self._status.errors.append(ImportRowError(line=line, detail=detail))
+
+    def _finish_if_done(self) -> None:
+        if self._status.status == "processing" and self._pending_chunks == 0:
+            self._status.status = "failed" if self._status.error is not None else "completed"
+            self._status.finished_at = datetime.now()
+
+
+class ImportStore:
+    """The most recent imports, for progress polling; unfinished ones are never dropped."""
+
+    def __init__(self, max_entries: int = IMPORT_HISTORY_SIZE):
+        self.max_entries = max_entries
+        self._imports: "OrderedDict[UUID, Import]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, import_id: Optional[UUID] = None) -> Import:
+        """Track a new import, under ``import_id`` if the client chose one.
+
+        The id of a failed import may be reused, so an interrupted upload can
+        be retried under the id its client has been polling.
+        """
+        started = Import(import_id)
+        with self._lock:
+            previous = self._imports.get(started.id)
+            if previous is not None:
+                if not previous.failed:
+                    raise ImportIdInUse(started.id)
+                del self._imports[started.id]
+            finished = [import_id for import_id, entry in self._imports.items() if entry.finished]
+            for import_id in finished[:max(len(self._imports) + 1 - self.max_entries, 0)]:
+                del self._imports[import_id]
+            self._imports[started.id] = started
+        return started
+
+    def get(self, import_id: UUID) -> Optional[ImportStatus]:
+        with self._lock:
+            entry = self._imports.get(import_id)
+        return entry.snapshot() if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._imports.clear()
@@ -0,0 +1,121 @@
+"""Background create jobs: accept a request now, let it finish on a worker, poll for the result."""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+
+from app.config import JOB_CACHE_SIZE, JOB_TTL_SECONDS
+from app.models import Job
+
+
+class JobStore:
+    """Follows create jobs to completion and keeps their status for polling.
+
+    A job wraps a ``Future`` handed over by the caller (``track``). Finished jobs
+    are kept for ``ttl_seconds`` in insertion order, at most ``max_entries``
+    of them; unfinished jobs are never dropped. Reads return copies, so
+    callers never see a job change underneath them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = JOB_CACHE_SIZE,
+        ttl_seconds: float = JOB_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._jobs: "OrderedDict[UUID, Job]" = OrderedDict()
+        self._futures: Dict[UUID, Future] = {}
+        self._expires_at: Dict[UUID, float] = {}
+        self._by_batch: Dict[UUID, Dict[UUID, None]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def track(self, future: Future, batch_id: Optional[UUID] = None) -> Job:
+        """Start a pending job that finishes with ``future``."""
+        job = Job(id=uuid4(), status="pending", batch_id=batch_id)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self._futures[job.id] = future
+            if batch_id is not None:
+                self._by_batch.setdefault(batch_id, {})[job.id] = None
+            snapshot = job.model_copy()
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return snapshot
+
+    def get(self, job_id: UUID) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job is not None else None
+
+    def get_by_batch_id(self, batch_id: UUID) -> List[Job]:
+        with self._lock:
+            return [self._view(self._jobs[job_id]) for job_id in self._by_batch.get(batch_id, ())]
+
+    def count_unfinished(self, batch_id: UUID) -> int:
+        """Count a batch's jobs that have not finished yet."""
+        with self._lock:
+            return sum(job_id in self._futures for job_id in self._by_batch.get(batch_id, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+            self._futures.clear()
+            self._expires_at.clear()
+            self._by_batch.clear()
+
+    def _view(self, job: Job) -> Job:
+        view = job.model_copy()
+        future = self._futures.get(job.id)
+        if future is not None and future.running():
+            view.status = "running"
+        return view
+
+    def _finish(self, job: Job, future: Future) -> None:
+        hospital, error, status_code = None, None, None
+        if future.cancelled():
+            error, status_code = "Cancelled", 500
+        elif isinstance(future.exception(), HTTPException):
+            exc = future.exception()
+            error, status_code = str(exc.detail), exc.status_code
+        elif future.exception() is not None:
+            error, status_code = "Internal error", 500
+        else:
+            hospital = future.result()
+        with self._lock:
+            job.hospital = hospital
+            job.error = error
+            job.status_code = status_code
+            job.status = "failed" if error is not None else "succeeded"
+            job.finished_at = datetime.now()
+            if self._futures.pop(job.id, None) is not None:
+                self._expires_at[job.id] = self._clock() + self.ttl_seconds
+
+    def _prune(self) -> None:
+        now = self._clock()
+        finished = len(self._expires_at)
+        for job_id in list(self._expires_at):
+            if self._expires_at[job_id] > now and finished <= self.max_entries:
+                break
+            del self._expires_at[job_id]
+            self._forget(job_id)
+            finished -= 1
+
+    def _forget(self, job_id: UUID) -> None:
+        job = self._jobs.pop(job_id)
+        if job.batch_id is not None:
+            members = self._by_batch[job.batch_id]
+            del members[job_id]
+            if not members:
+                del self._by_batch[job.batch_id]
@@ -1,27 +1,94 @@
-from fastapi import FastAPI, HTTPException, Request
-from typing import List
-from app.models import Hospital, HospitalCreate, HospitalUpdate
+import asyncio
+from concurrent.futures import Future
+from fastapi import Body, FastAPI, Header, HTTPException, Query, Request, Response
+from typing import Dict, List, Optional, Tuple, Union
+from app.models import (
+    BatchSummary,
+    BulkCreateResult,
+    Hospital,
+    HospitalCreate,
+    HospitalUpdate,
+    ImportStatus,
+    Job,
+    QueueStats,
+    StoreStats,
+)
 from app import database
+from app.coalescer import Coalescer
+from app.compression import CompressionMiddleware
+from app.idempotency import IdempotencyCache, IdempotencyKeyReused
+from app.imports import Import, ImportIdInUse, ImportStore, csv_records, parse_header, parse_row, upload_chunks
+from app.jobs import JobStore
+from app.work_queue import QueueFull, WorkQueue
+from app.pagination import decode_cursor, encode_cursor
+from app.serialization import parse_fields
+from app.responses import (
+    hospitals_response,
+    is_not_modified,
+    json_response,
+    make_etag,
+    ndjson_response,
+    not_modified_response,
+    set_etag,
+    wants_ndjson,
+)
+from app.storage import SqliteBackend, StoreServer
+from app.storage.search import dedup_key
 from app.config import (
     APP_NAME,
     DESCRIPTION,
     VERSION,
     MAX_BATCH_SIZE,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
     SLOW_TASK_DELAY_SECONDS,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_MAX_PENDING_CHUNKS,
     RATE_LIMITS,
+    HOST,
+    get_coalesce_max_size,
+    get_coalesce_window_ms,
+    get_create_queue_depth,
+    get_create_workers,
+    get_dedup_mode,
     get_port,
+    get_workers,
 )
-from uuid import UUID
+from uuid import UUID, uuid4
 import uvicorn
+import json
+import os
 import time
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 
 limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(title=APP_NAME, description=DESCRIPTION, version=VERSION)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(CompressionMiddleware)
+idempotency_cache = IdempotencyCache()
+# Creates spend most of their time in slow_running_task; running them here
+# keeps them from filling the threadpool that serves every other route, and
+# the bounded queue sheds excess load with 503 instead of a latency cliff
+create_queue = WorkQueue(
+    workers=get_create_workers(),
+    max_depth=get_create_queue_depth(),
+    expected_seconds=SLOW_TASK_DELAY_SECONDS,
+    thread_name_prefix="create",
+)
+job_store = JobStore()
+import_store = ImportStore()
+
+
+@app.on_event("shutdown")
+def close_store():
+    database.store.close()
 
 
 def slow_running_task():
@@ -35,47 +102,563 @@ def health_check(request: Request):
     return {"status": "OK"}
 
 
-@app.post("/hospitals/", response_model=Hospital)
-@limiter.limit(RATE_LIMITS["create_hospital"])
-def create_hospital(request: Request, hospital: HospitalCreate):
-    # Check if adding this hospital would exceed batch size limit
-    if hospital.creation_batch_id:
-        existing_batch = database.get_hospitals_by_batch_id(hospital.creation_batch_id)
-        if len(existing_batch) >= MAX_BATCH_SIZE:
+@app.get("/stats", response_model=StoreStats)
+@limiter.limit(RATE_LIMITS["get_stats"])
+def get_stats(request: Request):
+    return database.get_store_stats()
+
+
+@app.get("/stats/queue", response_model=QueueStats)
+@limiter.limit(RATE_LIMITS["get_stats"])
+def get_queue_stats(request: Request):
+    return create_queue.stats()
+
+
+def projection(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Validate a ``fields`` query parameter; ``None`` means every field."""
+    try:
+        return parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def duplicate_error(existing: Hospital) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Hospital already exists with ID {existing.id}",
+        headers={"Location": f"/hospitals/{existing.id}"},
+    )
+
+
+def find_duplicate(hospital: HospitalCreate, dedup_mode: str) -> Optional[Hospital]:
+    """Return the stored duplicate to answer with, or raise 409 in reject mode."""
+    if dedup_mode == "off":
+        return None
+    existing = database.find_duplicate(hospital.name, hospital.address, hospital.phone)
+    if existing is not None and dedup_mode == "reject":
+        raise duplicate_error(existing)
+    return existing
+
+
+def split_repeats(hospitals: List[HospitalCreate], pending: List[int], dedup_mode: str) -> Tuple[List[int], Dict[int, int]]:
+    """Keep the first of each set of duplicates in ``pending``; map the rest to it."""
+    if dedup_mode == "off":
+        return pending, {}
+    first: Dict[str, int] = {}
+    repeats = {}
+    for i in pending:
+        hospital = hospitals[i]
+        repeats[i] = first.setdefault(dedup_key(hospital.name, hospital.address, hospital.phone), i)
+    return list(first.values()), {i: j for i, j in repeats.items() if i != j}
+
+
+def store_hospitals(hospitals: List[Hospital], dedup_mode: str) -> List[Union[Hospital, HTTPException]]:
+    """Insert new hospitals, answering any duplicate stored since they were checked.
+
+    The duplicate check and the insert are one write, so concurrent creates
+    of the same hospital store it once.
+    """
+    if dedup_mode == "off":
+        return database.create_hospitals(hospitals)
+    return [
+        stored if created or dedup_mode == "return" else duplicate_error(stored)
+        for stored, created in database.find_or_create_hospitals(hospitals)
+    ]
+
+
+def create_group(batch_id: Optional[UUID], hospitals: List[HospitalCreate]) -> List[Union[Hospital, HTTPException]]:
+    """Create hospitals that arrived together for one batch, in one slow task pass.
+
+    Each hospital gets the outcome it would have had alone: duplicates and
+    batch overflow fail individually, in arrival order, and a hospital sent
+    twice is stored once. The rest are stored with a single insert.
+    """
+    dedup_mode = get_dedup_mode()
+
+    def check_duplicate(hospital: HospitalCreate) -> Union[Hospital, HTTPException, None]:
+        try:
+            return find_duplicate(hospital, dedup_mode)
+        except HTTPException as exc:
+            return exc
+
+    # Answer retried uploads before paying for the slow task again
+    outcomes = [check_duplicate(hospital) for hospital in hospitals]
+    pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    # Repeats within the group get their first copy's outcome instead of a row
+    pending, repeats = split_repeats(hospitals, pending, dedup_mode)
+
+    # Check if adding these hospitals would exceed batch size limit
+    if batch_id is not None:
+        room = max(MAX_BATCH_SIZE - database.get_batch_size(batch_id), 0)
+        for i in pending[room:]:
+            outcomes[i] = HTTPException(
+                status_code=400,
+                detail=f"Batch cannot exceed {MAX_BATCH_SIZE} hospitals",
+            )
+        pending = pending[:room]
+
+    if pending:
+        # Execute slow running task
+        slow_running_task()
+
+    new_hospitals = [
+        Hospital(
+            id=0,  # Set by store_hospitals
+            name=hospitals[i].name,
+            address=hospitals[i].address,
+            phone=hospitals[i].phone,
+            creation_batch_id=batch_id,
+            active=batch_id is None,  # False if batch_id provided, True otherwise
+        )
+        for i in pending
+    ]
+    # A concurrent request may have created the same hospital meanwhile
+    for i, outcome in zip(pending, store_hospitals(new_hospitals, dedup_mode)):
+        outcomes[i] = outcome
+    for i, j in repeats.items():
+        created = isinstance(outcomes[j], Hospital) and dedup_mode == "reject"
+        outcomes[i] = duplicate_error(outcomes[j]) if created else outcomes[j]
+    return outcomes
+
+
+# Creates for one batch that arrive together share a slow task pass and an insert
+create_coalescer = Coalescer(
+    create_group,
+    create_queue,
+    window_seconds=get_coalesce_window_ms() / 1000,
+    max_size=get_coalesce_max_size(),
+)
+
+
+def queue_full_error(exc: QueueFull) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many creates in progress, try again later",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def submit_create(hospital: HospitalCreate) -> Future:
+    """Queue a create to be processed together with others for its batch."""
+    try:
+        create_queue.admit()
+    except QueueFull as exc:
+        raise queue_full_error(exc)
+    return create_coalescer.submit(hospital.creation_batch_id, hospital)
+
+
+def forget_failure(idempotency_key: str, done: Future) -> None:
+    """Stop replaying a keyed create that failed with a server error, as run_idempotent would."""
+    error = done.exception()
+    if error is not None and not (isinstance(error, HTTPException) and error.status_code < 500):
+        idempotency_cache.forget(idempotency_key, done)
+
+
+def submit_idempotent_create(idempotency_key: str, hospital: HospitalCreate) -> Future:
+    """``submit_create`` for a keyed request, whose future is replayed on retries."""
+    future = submit_create(hospital)
+    future.add_done_callback(lambda done: forget_failure(idempotency_key, done))
+    return future
+
+
+async def wait_create(future: Future) -> Hospital:
+    # Shielded: a client going away must not cancel work shared with retries
+    try:
+        return await asyncio.shield(asyncio.wrap_future(future))
+    except QueueFull as exc:
+        raise queue_full_error(exc)
+
+
+async def run_create(work):
+    """Run a blocking create on ``create_queue`` without holding a request thread."""
+    try:
+        future = create_queue.submit(work)
+    except QueueFull as exc:
+        raise queue_full_error(exc)
+    return await asyncio.wrap_future(future)
+
+
+def run_idempotent(response: Response, idempotency_key: Optional[str], fingerprint: str, work):
+    """Run ``work`` once per Idempotency-Key, replaying its result on retries."""
+    if idempotency_key is None:
+        return work()
+    try:
+        result, replayed = idempotency_cache.run(idempotency_key, fingerprint, work)
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request body",
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+def can_poll() -> bool:
+    """Whether job and import status can be polled.
+
+    Both live in the process that accepted the request, so with several
+    workers a poll could reach a process that never heard of it.
+    """
+    return get_workers() == 1
+
+
+def prefers_async(prefer: Optional[str]) -> bool:
+    """Whether a ``Prefer`` header asks for ``respond-async`` and it can be honoured."""
+    if not prefer or not can_poll():
+        return False
+    return any(
+        preference.split(";")[0].split("=")[0].strip().lower() == "respond-async"
+        for preference in prefer.split(",")
+    )
+
+
+def submit_create_job(hospital: HospitalCreate) -> Job:
+    """Queue a create, rejecting it now if its batch is already full."""
+    batch_id = hospital.creation_batch_id
+    if batch_id is not None:
+        if database.get_batch_size(batch_id) + job_store.count_unfinished(batch_id) >= MAX_BATCH_SIZE:
             raise HTTPException(
                 status_code=400,
                 detail=f"Batch cannot exceed {MAX_BATCH_SIZE} hospitals",
             )
+    return job_store.track(submit_create(hospital), batch_id)
+
 
-    # Execute slow running task
-    slow_running_task()
-
-    new_hospital = Hospital(
-        id=0,  # Temporary ID, will be set by database.create_hospital
-        name=hospital.name,
-        address=hospital.address,
-        phone=hospital.phone,
-        creation_batch_id=hospital.creation_batch_id,
-        active=hospital.creation_batch_id
-        is None,  # False if batch_id provided, True otherwise
+def accepted_response(job: Job, response: Response) -> Response:
+    """202 pointing at a queued job, keeping any headers already set on ``response``."""
+    accepted = Response(job.model_dump_json(), status_code=202, media_type="application/json")
+    accepted.headers.update(response.headers)
+    accepted.headers["Location"] = f"/jobs/{job.id}"
+    accepted.headers["Preference-Applied"] = "respond-async"
+    return accepted
+
+
+def create_bulk(hospitals: List[HospitalCreate], batch_id: Optional[UUID], activate: bool) -> BulkCreateResult:
+    """Create a whole batch at once: one validation pass, one slow task pass, one atomic insert."""
+    row_batch_ids = {hospital.creation_batch_id for hospital in hospitals} - {None}
+    if batch_id is not None:
+        row_batch_ids.add(batch_id)
+    if len(row_batch_ids) > 1:
+        raise HTTPException(
+            status_code=400, detail="All hospitals in a bulk request must share one creation_batch_id"
+        )
+    batch_id = row_batch_ids.pop() if row_batch_ids else uuid4()
+
+    # Duplicates are answered (or rejected) exactly as on single creation
+    dedup_mode = get_dedup_mode()
+    existing = [find_duplicate(hospital, dedup_mode) for hospital in hospitals]
+    pending = [i for i, duplicate in enumerate(existing) if duplicate is None]
+    pending, repeats = split_repeats(hospitals, pending, dedup_mode)
+    if repeats and dedup_mode == "reject":
+        i, j = next(iter(repeats.items()))
+        raise HTTPException(status_code=409, detail=f"Hospital {i} duplicates hospital {j} of the request")
+
+    batch_size = database.get_batch_size(batch_id)
+    if batch_size + len(pending) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch cannot exceed {MAX_BATCH_SIZE} hospitals",
+        )
+
+    if pending:
+        # Like a coalesced group, the request pays for the slow task once
+        slow_running_task()
+
+    if dedup_mode == "reject":
+        # Fail the whole request, before anything is stored, if a duplicate appeared meanwhile
+        for i in pending:
+            find_duplicate(hospitals[i], dedup_mode)
+    new_hospitals = [
+        Hospital(
+            id=0,  # Set by the insert
+            name=hospitals[i].name,
+            address=hospitals[i].address,
+            phone=hospitals[i].phone,
+            creation_batch_id=batch_id,
+            active=activate,
+        )
+        for i in pending
+    ]
+    if dedup_mode == "off":
+        results = [(hospital, True) for hospital in database.create_hospitals(new_hospitals)]
+    else:
+        # Checked and inserted in one write, so a duplicate that races the
+        # check above is returned instead of stored twice
+        results = database.find_or_create_hospitals(new_hospitals)
+    for i, (hospital, _) in zip(pending, results):
+        existing[i] = hospital
+    for i, j in repeats.items():
+        existing[i] = existing[j]
+    if activate and batch_size:
+        # Earlier members of the batch were stored inactive; activate them too
+        database.activate_hospitals_by_batch_id(batch_id)
+    return BulkCreateResult(
+        batch_id=batch_id,
+        created_count=sum(created for _, created in results),
+        activated=activate,
+        hospitals=existing,
     )
-    created = database.create_hospital(new_hospital)
-    return created
+
+
+@app.post(
+    "/hospitals/",
+    response_model=Hospital,
+    responses={202: {"model": Job, "description": "Queued as a background job (Prefer: respond-async)"}},
+)
+@limiter.limit(RATE_LIMITS["create_hospital"])
+async def create_hospital(
+    request: Request,
+    response: Response,
+    hospital: HospitalCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    prefer: Optional[str] = Header(None),
+):
+    if prefers_async(prefer):
+        job = await run_in_threadpool(
+            run_idempotent,
+            response,
+            idempotency_key,
+            "async:" + hospital.model_dump_json(),
+            lambda: submit_create_job(hospital),
+        )
+        # A replayed job may have finished since it was first accepted
+        return accepted_response(job_store.get(job.id) or job, response)
+    if idempotency_key is None:
+        return await wait_create(submit_create(hospital))
+    future = await run_in_threadpool(
+        run_idempotent,
+        response,
+        idempotency_key,
+        hospital.model_dump_json(),
+        lambda: submit_idempotent_create(idempotency_key, hospital),
+    )
+    if future.done():
+        # A future that failed before the cache stored it (e.g. the queue
+        # refused its group at once) was missed by the done callback
+        forget_failure(idempotency_key, future)
+    return await wait_create(future)
+
+
+@app.post("/hospitals/bulk", response_model=BulkCreateResult)
+@limiter.limit(RATE_LIMITS["bulk_create_hospitals"])
+async def bulk_create_hospitals(
+    request: Request,
+    response: Response,
+    hospitals: List[HospitalCreate] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+    batch_id: Optional[UUID] = Query(None),
+    activate: bool = Query(False),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    fingerprint = "bulk:" + json.dumps(
+        [[h.model_dump(mode="json") for h in hospitals], str(batch_id), activate], separators=(",", ":")
+    )
+    return await run_create(lambda: run_idempotent(
+        response, idempotency_key, fingerprint, lambda: create_bulk(hospitals, batch_id, activate)
+    ))
+
+
+def import_chunk(batch_id: UUID, hospitals: List[HospitalCreate], activate: bool) -> List[Union[Hospital, HTTPException]]:
+    """Create one chunk of an import as its own batch."""
+    outcomes = create_group(batch_id, hospitals)
+    if activate and any(isinstance(outcome, Hospital) for outcome in outcomes):
+        database.activate_hospitals_by_batch_id(batch_id)
+    return outcomes
+
+
+async def ingest_csv(request: Request, progress: Import, activate: bool, wait: bool) -> None:
+    """Validate rows as the upload arrives and create them a chunk at a time.
+
+    At most IMPORT_MAX_PENDING_CHUNKS chunks wait on the create queue; past
+    that, reading pauses, so a fast upload cannot outrun the workers. With
+    ``wait``, returns only once every chunk has been created.
+    """
+    in_flight = set()
+    chunk: List[Tuple[int, HospitalCreate]] = []
+
+    async def submit_chunk():
+        while len(in_flight) >= IMPORT_MAX_PENDING_CHUNKS:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.difference_update(done)
+        batch_id = uuid4()
+        lines = [line for line, _ in chunk]
+        hospitals = [hospital for _, hospital in chunk]
+        while True:
+            try:
+                future = create_queue.submit(import_chunk, batch_id, hospitals, activate)
+                break
+            except QueueFull as exc:
+                # Imports wait for room rather than failing
+                await asyncio.sleep(min(exc.retry_after, 1))
+        progress.chunk_started(batch_id)
+        future.add_done_callback(lambda done: progress.chunk_finished(
+            batch_id, lines, done.result() if done.exception() is None else [done.exception()] * len(lines)
+        ))
+        in_flight.add(asyncio.wrap_future(future))
+        chunk.clear()
+
+    columns = None
+    try:
+        async for line, fields in csv_records(upload_chunks(request.headers.get("content-type", ""), request.stream())):
+            if columns is None:
+                columns = parse_header(fields)
+                width = len(fields)
+                continue
+            progress.row_read()
+            try:
+                chunk.append((line, parse_row(fields, columns, width)))
+            except ValueError as exc:
+                progress.row_failed(line, str(exc))
+                continue
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                await submit_chunk()
+    except Exception:
+        # Rows already read are created, like the chunks before them
+        if chunk:
+            await submit_chunk()
+        raise
+    if columns is None:
+        raise ValueError("CSV upload is empty")
+    if chunk:
+        await submit_chunk()
+    if wait and in_flight:
+        await asyncio.wait(in_flight)
+
+
+@app.post("/hospitals/import", response_model=ImportStatus, status_code=202)
+@limiter.limit(RATE_LIMITS["import_hospitals"])
+async def import_hospitals(
+    request: Request,
+    response: Response,
+    activate: bool = Query(False),
+    import_id: Optional[UUID] = Query(None),
+):
+    # A client that picks the id can poll progress while it is still uploading
+    try:
+        progress = import_store.start(import_id)
+    except ImportIdInUse:
+        raise HTTPException(status_code=409, detail="Import id is already in use")
+    # Without polling, the import answers once it is complete instead
+    pollable = can_poll()
+    headers = {"Location": f"/imports/{progress.id}"} if pollable else None
+    try:
+        await ingest_csv(request, progress, activate, wait=not pollable)
+    except (HTTPException, ValueError, ClientDisconnect) as exc:
+        if isinstance(exc, HTTPException):
+            status_code, detail = exc.status_code, exc.detail
+        elif isinstance(exc, ClientDisconnect):
+            status_code, detail = 400, "Client disconnected before the upload finished"
+        else:
+            status_code, detail = 400, str(exc)
+        progress.upload_finished(error=detail)
+        # Rows read before the problem are still created; the import shows them
+        raise HTTPException(status_code=status_code, detail=detail, headers=headers)
+    except BaseException:
+        # Never leave an import "receiving": nothing would ever end it
+        progress.upload_finished(error="Internal error")
+        raise
+    progress.upload_finished()
+    if pollable:
+        response.headers.update(headers)
+    else:
+        response.status_code = 200
+    return progress.snapshot()
+
+
+@app.get("/imports/{import_id}", response_model=ImportStatus)
+@limiter.limit(RATE_LIMITS["get_import"])
+def get_import(request: Request, import_id: UUID):
+    status = import_store.get(import_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return status
+
+
+@app.get("/jobs/{job_id}", response_model=Job)
+@limiter.limit(RATE_LIMITS["get_job"])
+def get_job(request: Request, job_id: UUID):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs", response_model=List[Job])
+@limiter.limit(RATE_LIMITS["get_job"])
+def get_jobs_by_batch_id(request: Request, batch_id: UUID):
+    jobs = job_store.get_by_batch_id(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="No jobs found with the specified batch ID")
+    return jobs
 
 
 @app.get("/hospitals/", response_model=List[Hospital])
 @limiter.limit(RATE_LIMITS["get_hospitals"])
-def get_all_hospitals(request: Request):
-    return database.get_all_hospitals()
+def get_all_hospitals(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = Query(None, max_length=100),
+    fields: Optional[str] = Query(None, max_length=200),
+):
+    projected = projection(fields)
+    paginated = limit is not None or after_id is not None or cursor is not None
+    if cursor is not None:
+        if after_id is not None:
+            raise HTTPException(status_code=400, detail="Use either cursor or after_id, not both")
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Read the version before the rows: a concurrent write can only make the
+    # tag older than the body, which costs a refetch, never a stale 304
+    etag = make_etag(database.get_version(), request)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    if not paginated:
+        if wants_ndjson(request):
+            return set_etag(ndjson_response(database.iter_hospitals(), projected), etag)
+        return set_etag(json_response(database.get_all_hospitals_json(projected)), etag)
+
+    # Keyset pagination: ids only grow, so a page boundary survives inserts
+    # and evictions, and only the rows of this page are read
+    limit = limit or DEFAULT_PAGE_SIZE
+    page = database.get_hospitals_page(after_id or 0, limit + 1)
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].id)
+    if wants_ndjson(request):
+        response = ndjson_response(page, projected)
+    else:
+        response = hospitals_response(page, projected)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return set_etag(response, etag)
+
+
+# Declared before /hospitals/{hospital_id} so "search" is not parsed as an id
+@app.get("/hospitals/search", response_model=List[Hospital])
+@limiter.limit(RATE_LIMITS["search_hospitals"])
+def search_hospitals(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    return database.search_hospitals(q, limit)
 
 
 @app.get("/hospitals/{hospital_id}", response_model=Hospital)
 @limiter.limit(RATE_LIMITS["get_hospital_by_id"])
-def get_hospital_by_id(request: Request, hospital_id: int):
-    hospital = database.get_hospital_by_id(hospital_id)
-    if hospital is None:
+def get_hospital_by_id(
+    request: Request, hospital_id: int, fields: Optional[str] = Query(None, max_length=200)
+):
+    body = database.get_hospital_json(hospital_id, projection(fields))
+    if body is None:
         raise HTTPException(status_code=404, detail="Hospital not found")
-    return hospital
+    return json_response(body)
 
 
 @app.put("/hospitals/{hospital_id}", response_model=Hospital)
@@ -83,17 +666,11 @@ def get_hospital_by_id(request: Request, hospital_id: int):
 def update_hospital(
     request: Request, hospital_id: int, hospital_update: HospitalUpdate
 ):
-    existing_hospital = database.get_hospital_by_id(hospital_id)
-    if existing_hospital is None:
-        raise HTTPException(status_code=404, detail="Hospital not found")
-
-    update_data = hospital_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(existing_hospital, key, value)
-
-    updated = database.update_hospital(hospital_id, existing_hospital)
+    # Only the sent fields are written, inside the store's write lock, so a
+    # concurrent batch activation is never overwritten with a stale flag
+    updated = database.update_hospital_fields(hospital_id, hospital_update.model_dump(exclude_unset=True))
     if updated is None:
-        raise HTTPException(status_code=500, detail="Failed to update hospital")
+        raise HTTPException(status_code=404, detail="Hospital not found")
     return updated
 
 
@@ -107,13 +684,36 @@ def delete_hospital(request: Request, hospital_id: int):
 
 @app.get("/hospitals/batch/{batch_id}", response_model=List[Hospital])
 @limiter.limit(RATE_LIMITS["get_batch"])
-def get_hospitals_by_batch_id(request: Request, batch_id: UUID):
+def get_hospitals_by_batch_id(
+    request: Request, batch_id: UUID, fields: Optional[str] = Query(None, max_length=200)
+):
+    projected = projection(fields)
+    version = database.get_version(batch_id)
+    etag = make_etag(version, request) if version is not None else None
+    if etag is not None and is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     hospitals = database.get_hospitals_by_batch_id(batch_id)
     if not hospitals:
         raise HTTPException(
             status_code=404, detail="No hospitals found with the specified batch ID"
         )
-    return hospitals
+    if wants_ndjson(request):
+        response = ndjson_response(hospitals, projected)
+    else:
+        response = hospitals_response(hospitals, projected)
+    return set_etag(response, etag) if etag is not None else response
+
+
+@app.get("/hospitals/batch/{batch_id}/summary", response_model=BatchSummary)
+@limiter.limit(RATE_LIMITS["get_batch"])
+def get_batch_summary(request: Request, batch_id: UUID):
+    summary = database.get_batch_summary(batch_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=404, detail="No hospitals found with the specified batch ID"
+        )
+    return summary
 
 
 @app.delete("/hospitals/batch/{batch_id}")
@@ -134,14 +734,14 @@ def delete_hospitals_by_batch(request: Request, batch_id: UUID):
 @limiter.limit(RATE_LIMITS["activate_batch"])
 def activate_hospitals_by_batch(request: Request, batch_id: UUID):
     # Check if batch exists
-    hospitals_in_batch = database.get_hospitals_by_batch_id(batch_id)
-    if not hospitals_in_batch:
+    summary = database.get_batch_summary(batch_id)
+    if summary is None:
         raise HTTPException(
             status_code=404, detail="No hospitals found with the specified batch ID"
         )
 
     # Check if any hospitals in the batch are already active
-    if database.has_active_hospitals_in_batch(batch_id):
+    if summary.active_count > 0:
         raise HTTPException(
             status_code=400,
             detail="Cannot activate batch: one or more hospitals in the batch are already active",
@@ -154,6 +754,26 @@ def activate_hospitals_by_batch(request: Request, batch_id: UUID):
     }
 
 
+def run_workers(port: int, workers: int):
+    """Run several uvicorn workers that share this process's store."""
+    server = None
+    if not isinstance(database.store, SqliteBackend):
+        # SQLite workers open the database file themselves; every other
+        # backend is hosted here and reached through a local store server.
+        server = StoreServer(database.store).start()
+        os.environ.update(server.client_environment())
+    try:
+        uvicorn.run("app.main:app", host=HOST, port=port, workers=workers)
+    finally:
+        if server is not None:
+            server.stop()
+        database.store.close()
+
+
 if __name__ == "__main__":
     port = get_port()
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = get_workers()
+    if workers > 1:
+        run_workers(port, workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -35,6 +35,74 @@ class HospitalCreate(BaseModel):
         return v
 
 
+class BulkCreateResult(BaseModel):
+    batch_id: UUID
+    created_count: int
+    activated: bool
+    hospitals: List[Hospital]
+
+
+class Job(BaseModel):
+    id: UUID
+    status: Literal["pending", "running", "succeeded", "failed"]
+    batch_id: Optional[UUID] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    hospital: Optional[Hospital] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportStatus(BaseModel):
+    id: UUID
+    status: Literal["receiving", "processing", "completed", "failed"]
+    rows_read: int = 0
+    rows_created: int = 0
+    rows_duplicate: int = 0
+    rows_failed: int = 0
+    batch_count: int = 0
+    batch_ids: List[UUID] = Field(default_factory=list)  # the first IMPORT_MAX_BATCH_IDS batches
+    errors: List[ImportRowError] = Field(default_factory=list)  # the first IMPORT_MAX_ERRORS failed rows
+    error: Optional[str] = None  # why the upload itself was rejected part way
+    created_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+
+class BatchSummary(BaseModel):
+    batch_id: UUID
+    hospital_count: int
+    active_count: int
+    first_created_at: Optional[datetime] = None
+    last_created_at: Optional[datetime] = None
+
+
+class StoreStats(BaseModel):
+    backend: str
+    hospital_count: int
+    capacity: int
+    eviction_policy: str
+    evictions: int
+    max_bytes: Optional[int] = None
+    estimated_bytes: Optional[int] = None
+
+
+class QueueStats(BaseModel):
+    workers: int
+    max_depth: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+    drain_rate: Optional[float] = None  # tasks per second
+    wait_seconds: float  # moving average of time spent queued
+    estimated_wait_seconds: float  # for a task queued now
+
+
 class HospitalUpdate(BaseModel):
     name: Optional[str] = None
     address: Optional[str] = None
@@ -43,6 +111,9 @@ class HospitalUpdate(BaseModel):
     @field_validator('name', 'address')
     @classmethod
     def validate_non_empty_strings(cls, v):
-        if v is not None and isinstance(v, str) and not v.strip():
+        # Omitted fields keep their value; an explicit null would blank a required one
+        if v is None:
+            raise ValueError('Field cannot be null; omit it to keep the current value')
+        if isinstance(v, str) and not v.strip():
             raise ValueError('Field cannot be empty or whitespace only')
         return v
@@ -0,0 +1,25 @@
+"""Opaque cursors for keyset pagination of hospital listings."""
+
+import base64
+import binascii
+
+_CURSOR_PREFIX = "h1:"
+
+
+def encode_cursor(after_id: int) -> str:
+    """Encode the last id of a page into a cursor for the next one."""
+    return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{after_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor back into the id to continue after.
+
+    Raises ``ValueError`` for anything ``encode_cursor`` did not produce.
+    """
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Malformed cursor") from None
+    if not text.startswith(_CURSOR_PREFIX) or not text[len(_CURSOR_PREFIX):].isdigit():
+        raise ValueError("Malformed cursor")
+    return int(text[len(_CURSOR_PREFIX):])
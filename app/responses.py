@@ -0,0 +1,79 @@
+"""Response encodings and conditional-GET helpers for hospital listings."""
+
+from typing import Iterable, Iterator, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.config import STREAM_CHUNK_SIZE
+from app.models import Hospital
+from app.serialization import encode_hospitals, hospital_fields, hospital_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def json_response(body: bytes) -> Response:
+    """Send JSON that is already encoded, bypassing ``response_model`` handling."""
+    return Response(body, media_type="application/json")
+
+
+def hospitals_response(hospitals: Iterable[Hospital], fields: Optional[Tuple[str, ...]] = None) -> Response:
+    return json_response(encode_hospitals([hospital_fields(hospital, fields) for hospital in hospitals]))
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True when the client asked for newline-delimited JSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_lines(
+    hospitals: Iterable[Hospital],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Iterator[bytes]:
+    """Encode hospitals one JSON object per line, ``chunk_size`` lines per write."""
+    chunk = []
+    for hospital in hospitals:
+        chunk.append(hospital_json(hospital, fields))
+        if len(chunk) >= chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def ndjson_response(hospitals: Iterable[Hospital], fields: Optional[Tuple[str, ...]] = None) -> StreamingResponse:
+    """Stream hospitals lazily, so memory stays flat however many rows there are."""
+    return StreamingResponse(ndjson_lines(hospitals, STREAM_CHUNK_SIZE, fields), media_type=NDJSON_MEDIA_TYPE)
+
+
+def make_etag(version: str, request: Request) -> str:
+    """Weak ETag for a store or batch version, distinct per representation."""
+    variant = "ndjson" if wants_ndjson(request) else "json"
+    return f'W/"{version}.{variant}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def not_modified_response(etag: str) -> Response:
+    return set_etag(Response(status_code=304), etag)
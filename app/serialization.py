@@ -0,0 +1,68 @@
+"""Encode hospitals straight to JSON bytes, skipping response-model validation.
+
+Uses ``orjson`` when it is installed and Pydantic's own serializer otherwise;
+both produce exactly the bytes FastAPI would send for a ``Hospital``.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.models import Hospital
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+HOSPITAL_FIELDS: Tuple[str, ...] = tuple(Hospital.model_fields)
+
+
+def parse_fields(text: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated ``fields`` parameter into model-ordered names.
+
+    Returns ``None`` when every field is wanted, so callers can take the
+    unprojected path. Raises ``ValueError`` for unknown or missing names.
+    """
+    if text is None:
+        return None
+    requested = {name.strip() for name in text.split(",")} - {""}
+    if not requested:
+        raise ValueError("No fields requested")
+    unknown = requested.difference(HOSPITAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if len(requested) == len(HOSPITAL_FIELDS):
+        return None
+    return tuple(name for name in HOSPITAL_FIELDS if name in requested)
+
+
+def encode_hospital(fields: Dict[str, Any]) -> bytes:
+    """Encode a mapping of ``Hospital`` field names to already-valid values.
+
+    The mapping may hold a subset of the fields, in model order.
+    """
+    if orjson is not None:
+        # OPT_UTC_Z writes UTC as "Z", matching Pydantic
+        return orjson.dumps(fields, option=orjson.OPT_UTC_Z)
+    return Hospital.model_construct(**fields).model_dump_json(include=set(fields)).encode()
+
+
+def encode_hospitals(rows: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode many field mappings as one JSON array, in a single call when possible."""
+    if orjson is not None:
+        return orjson.dumps(list(rows), option=orjson.OPT_UTC_Z)
+    return json_array(encode_hospital(row) for row in rows)
+
+
+def hospital_fields(hospital: Hospital, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    if fields is None:
+        return dict(hospital)
+    return {name: getattr(hospital, name) for name in fields}
+
+
+def hospital_json(hospital: Hospital, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    return encode_hospital(hospital_fields(hospital, fields))
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    """Join already-encoded JSON values into one JSON array."""
+    return b"[" + b",".join(items) + b"]"
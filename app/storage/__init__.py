@@ -0,0 +1,41 @@
+"""Pluggable storage backends for hospital records."""
+
+from typing import Callable, Dict, Optional
+
+from app.config import MAX_TOTAL_HOSPITALS, get_storage_backend
+from .base import StorageBackend
+from .journal import JournaledBackend
+from .memory import MemoryBackend
+from .shared import SharedBackend, StoreServer
+from .sqlite import SqliteBackend
+
+BACKENDS: Dict[str, Callable[..., StorageBackend]] = {
+    "memory": MemoryBackend,
+    "journal": JournaledBackend,
+    "sqlite": SqliteBackend,
+    "shared": SharedBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, capacity: int = MAX_TOTAL_HOSPITALS) -> StorageBackend:
+    """Create the storage backend selected by name or the STORAGE_BACKEND setting."""
+    name = (name or get_storage_backend()).lower()
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend '{name}', expected one of: {', '.join(sorted(BACKENDS))}"
+        ) from None
+    return factory(capacity=capacity)
+
+
+__all__ = [
+    "BACKENDS",
+    "JournaledBackend",
+    "MemoryBackend",
+    "SharedBackend",
+    "SqliteBackend",
+    "StorageBackend",
+    "StoreServer",
+    "create_backend",
+]
@@ -0,0 +1,90 @@
+"""Storage backend protocol for the Hospital Directory API."""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+try:
+    from typing import Protocol, runtime_checkable
+except ImportError:  # pragma: no cover - Python < 3.8
+    from typing_extensions import Protocol, runtime_checkable
+
+from app.models import BatchSummary, Hospital, StoreStats
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """Operations every hospital storage engine must provide.
+
+    Backends own id allocation, the capacity limit and eviction.
+    ``update_hospital_fields`` reads and writes a row under the backend's
+    write lock, so partial updates never undo a concurrent change to other
+    fields, and ``find_or_create_hospitals`` checks for duplicates and
+    stores the new rows as one write, pairing each with whether it was
+    created. They accept and return ``Hospital`` models, plus ready-made
+    JSON bytes for the hottest reads, optionally projected to a subset of
+    fields; how rows are kept internally is up to the backend.
+    """
+
+    def count_hospitals(self) -> int: ...
+
+    def get_all_hospitals(self) -> List[Hospital]: ...
+
+    def get_all_hospitals_json(self, fields: Optional[Tuple[str, ...]] = None) -> bytes: ...
+
+    def get_hospitals_page(self, after_id: int, limit: int) -> List[Hospital]: ...
+
+    def iter_hospitals(self) -> Iterator[Hospital]: ...
+
+    def get_hospital_by_id(self, hospital_id: int) -> Optional[Hospital]: ...
+
+    def get_hospital_json(self, hospital_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]: ...
+
+    def create_hospital(self, hospital: Hospital) -> Hospital: ...
+
+    def create_hospitals(self, hospitals: List[Hospital]) -> List[Hospital]: ...
+
+    def find_or_create_hospitals(self, hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]: ...
+
+    def update_hospital(self, hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]: ...
+
+    def update_hospital_fields(self, hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]: ...
+
+    def delete_hospital(self, hospital_id: int) -> bool: ...
+
+    def get_hospitals_by_batch_id(self, batch_id: UUID) -> List[Hospital]: ...
+
+    def get_batch_size(self, batch_id: UUID) -> int: ...
+
+    def get_batch_summary(self, batch_id: UUID) -> Optional[BatchSummary]: ...
+
+    def delete_hospitals_by_batch_id(self, batch_id: UUID) -> int: ...
+
+    def activate_hospitals_by_batch_id(self, batch_id: UUID) -> int: ...
+
+    def find_duplicate(self, name: str, address: str, phone: Optional[str]) -> Optional[Hospital]: ...
+
+    def search_hospitals(self, query: str, limit: int) -> List[Hospital]: ...
+
+    def get_version(self, batch_id: Optional[UUID] = None) -> Optional[str]: ...
+
+    def get_stats(self) -> StoreStats: ...
+
+    def clear(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def with_fields(hospital: Hospital, fields: Dict[str, Any]) -> Hospital:
+    """Copy a hospital with ``fields`` changed, validating the merged row."""
+    return Hospital.model_validate({**hospital.model_dump(), **fields})
+
+
+def iter_pages(get_page: Callable[[int, int], List[Hospital]], page_size: int) -> Iterator[Hospital]:
+    """Iterate every hospital in id order by walking keyset pages."""
+    after_id = 0
+    while True:
+        page = get_page(after_id, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1].id
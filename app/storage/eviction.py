@@ -0,0 +1,121 @@
+"""Eviction policies deciding which hospital a full store drops first."""
+
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Collection, Dict, Iterable, Optional, Type
+
+
+class EvictionPolicy:
+    """Tracks stored ids and picks the next one to evict.
+
+    The store calls ``add``/``remove`` as rows come and go, ``activated``
+    when a row's ``active`` flag changes and ``touch`` when a row is read.
+    ``victim`` must never return an id in ``protected`` (the rows being
+    inserted) and only returns ``None`` when no other row exists. Every hook
+    is O(1), and ``victim`` looks at no more than ``len(protected) + 1`` ids.
+    """
+
+    name = ""
+
+    def add(self, hospital_id: int, active: bool) -> None:
+        pass
+
+    def remove(self, hospital_id: int) -> None:
+        pass
+
+    def activated(self, hospital_id: int, active: bool) -> None:
+        pass
+
+    def touch(self, hospital_id: int) -> None:
+        pass
+
+    def victim(self, oldest_first: Iterable[int], protected: Collection[int] = ()) -> Optional[int]:
+        # Every protected id may come first, so one more candidate is enough
+        for hospital_id in islice(oldest_first, len(protected) + 1):
+            if hospital_id not in protected:
+                return hospital_id
+        return None
+
+
+class FifoPolicy(EvictionPolicy):
+    """Evict the oldest inserted row, like the original ``deque(maxlen=...)``."""
+
+    name = "fifo"
+
+
+class InactiveFirstPolicy(EvictionPolicy):
+    """Evict the oldest inactive row, falling back to the oldest row overall.
+
+    Keeps unactivated batches from pushing out live hospitals.
+    """
+
+    name = "inactive_first"
+
+    def __init__(self):
+        self._inactive: "OrderedDict[int, None]" = OrderedDict()
+
+    def add(self, hospital_id: int, active: bool) -> None:
+        if not active:
+            self._inactive[hospital_id] = None
+
+    def remove(self, hospital_id: int) -> None:
+        self._inactive.pop(hospital_id, None)
+
+    def activated(self, hospital_id: int, active: bool) -> None:
+        if active:
+            self._inactive.pop(hospital_id, None)
+        else:
+            self._inactive[hospital_id] = None
+
+    def victim(self, oldest_first: Iterable[int], protected: Collection[int] = ()) -> Optional[int]:
+        hospital_id = super().victim(iter(self._inactive), protected)
+        if hospital_id is None:
+            hospital_id = super().victim(oldest_first, protected)
+        return hospital_id
+
+
+class LruPolicy(EvictionPolicy):
+    """Evict the least recently read or written row.
+
+    Reads happen outside the store's writer lock, so the recency order has
+    its own small lock.
+    """
+
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, hospital_id: int, active: bool) -> None:
+        with self._lock:
+            self._order[hospital_id] = None
+
+    def remove(self, hospital_id: int) -> None:
+        with self._lock:
+            self._order.pop(hospital_id, None)
+
+    def touch(self, hospital_id: int) -> None:
+        with self._lock:
+            if hospital_id in self._order:
+                self._order.move_to_end(hospital_id)
+
+    def victim(self, oldest_first: Iterable[int], protected: Collection[int] = ()) -> Optional[int]:
+        with self._lock:
+            return super().victim(iter(self._order), protected)
+
+
+EVICTION_POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    policy.name: policy for policy in (FifoPolicy, InactiveFirstPolicy, LruPolicy)
+}
+
+
+def create_policy(name: str) -> EvictionPolicy:
+    """Create an eviction policy by name."""
+    try:
+        return EVICTION_POLICIES[name.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown eviction policy '{name}', expected one of: {', '.join(sorted(EVICTION_POLICIES))}"
+        ) from None
@@ -0,0 +1,345 @@
+"""In-memory storage backend made durable by a write-ahead log and snapshots."""
+
+import json
+import mmap
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from app.config import (
+    JOURNAL_FSYNC_BATCH,
+    JOURNAL_SNAPSHOT_INTERVAL,
+    MAX_TOTAL_HOSPITALS,
+    get_journal_dir,
+)
+from app.models import Hospital
+from .memory import HospitalRecord, MemoryBackend, _intern
+
+LOG_FILENAME = "hospitals.log"
+SNAPSHOT_FILENAME = "hospitals.snapshot"
+
+
+def _encode_record(record: HospitalRecord) -> list:
+    created_at = record.created_at
+    return [
+        record.id,
+        record.name,
+        record.address,
+        record.phone,
+        str(record.creation_batch_id) if record.creation_batch_id is not None else None,
+        record.active,
+        created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    ]
+
+
+def _decode_record(row: list, batch_ids: Dict[str, UUID]) -> HospitalRecord:
+    hospital_id, name, address, phone, batch_id, active, created_at = row
+    if batch_id is not None:
+        # Batch members are adjacent, so parsing each batch UUID once pays off
+        batch_uuid = batch_ids.get(batch_id)
+        if batch_uuid is None:
+            batch_uuid = batch_ids[batch_id] = UUID(batch_id)
+    else:
+        batch_uuid = None
+    return HospitalRecord(
+        hospital_id,
+        _intern(name),
+        _intern(address),
+        _intern(phone),
+        batch_uuid,
+        active,
+        datetime.fromisoformat(created_at) if isinstance(created_at, str) else created_at,
+    )
+
+
+def _dumps(entry: Any) -> bytes:
+    return json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+
+
+def _fsync_directory(path: str) -> None:
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JournaledBackend(MemoryBackend):
+    """``MemoryBackend`` that journals every mutation to an append-only log.
+
+    Each applied mutation is appended to the log with a sequence number and
+    flushed to the OS; ``fsync`` runs every ``fsync_batch`` entries (1 makes
+    every write durable against power loss). Every ``snapshot_interval``
+    entries the log is rotated into a segment named after its last sequence
+    number, and a background thread compacts the store, as it was at that
+    point, into a snapshot file, written atomically; segments the snapshot
+    covers are then deleted. Writers only wait for the rotation.
+
+    On start-up the latest snapshot is read through ``mmap``, then the
+    segments and the log newer than the snapshot are replayed in sequence
+    order. A torn final log line from a crash is discarded. Evictions are
+    logged with the create that caused them, since an LRU victim depends on
+    reads the log never sees; LRU recency itself is not persisted and
+    restarts in insertion order.
+    """
+
+    name = "journal"
+
+    def __init__(
+        self,
+        capacity: int = MAX_TOTAL_HOSPITALS,
+        directory: Optional[str] = None,
+        fsync_batch: int = JOURNAL_FSYNC_BATCH,
+        snapshot_interval: int = JOURNAL_SNAPSHOT_INTERVAL,
+    ):
+        super().__init__(capacity=capacity)
+        self.directory = directory or get_journal_dir()
+        self.fsync_batch = max(1, fsync_batch)
+        self.snapshot_interval = snapshot_interval
+        self.log_path = os.path.join(self.directory, LOG_FILENAME)
+        self.snapshot_path = os.path.join(self.directory, SNAPSHOT_FILENAME)
+        self.seq = 0
+        self._entries_since_snapshot = 0
+        self._unsynced = 0
+        self._snapshotter: Optional[threading.Thread] = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+        self._log = open(self.log_path, "ab")
+
+    def _segments(self) -> Iterator[Tuple[int, str]]:
+        """Rotated log segments as ``(last seq, path)``, oldest first."""
+        prefix = LOG_FILENAME + "."
+        seqs = sorted(
+            int(name[len(prefix):])
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name[len(prefix):].isdigit()
+        )
+        return ((seq, f"{self.log_path}.{seq}") for seq in seqs)
+
+    # Recovery
+
+    def _recover(self) -> None:
+        self._load_snapshot()
+        for seq, path in self._segments():
+            if seq <= self.seq:
+                os.remove(path)  # Covered by the snapshot; a crash came before its cleanup
+            else:
+                self._replay_log(path)
+        self._replay_log(self.log_path)
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self.snapshot_path) or os.path.getsize(self.snapshot_path) == 0:
+            return
+        with open(self.snapshot_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = json.loads(mm.readline())
+            store = self.store.empty_copy()
+            batch_ids: Dict[str, UUID] = {}
+            for line in iter(mm.readline, b""):
+                store.append(_decode_record(json.loads(line), batch_ids))
+        self.store = store
+        self.next_id = header["next_id"]
+        self.seq = header["seq"]
+
+    def _replay_log(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        valid_bytes = 0
+        batch_ids: Dict[str, UUID] = {}
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Torn write from a crash; everything after it is unusable
+                valid_bytes += len(line)
+                if entry["seq"] <= self.seq:
+                    continue
+                self._apply(entry, batch_ids)
+                self.seq = entry["seq"]
+                self._entries_since_snapshot += 1
+        if valid_bytes < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def _apply(self, entry: Dict[str, Any], batch_ids: Dict[str, UUID]) -> None:
+        op = entry["op"]
+        if op == "create":
+            record = _decode_record(entry["row"], batch_ids)
+            if "evicted" in entry:
+                self.store.append(record, evict=False)
+                self.store.evict_ids(entry["evicted"])
+            else:
+                self.store.append(record)
+            self.next_id = max(self.next_id, record.id + 1)
+        elif op == "create_many":
+            records = [_decode_record(row, batch_ids) for row in entry["rows"]]
+            for record in records:
+                self.store.append(record, evict=False)
+            self.store.evict_ids(entry.get("evicted", ()))
+            self.next_id = max(self.next_id, records[-1].id + 1)
+        elif op == "update":
+            record = _decode_record(entry["row"], batch_ids)
+            self.store.replace(record.id, record)
+        elif op == "delete":
+            super().delete_hospital(entry["id"])
+        elif op == "delete_batch":
+            super().delete_hospitals_by_batch_id(UUID(entry["batch_id"]))
+        elif op == "activate":
+            super().activate_hospitals_by_batch_id(UUID(entry["batch_id"]))
+        elif op == "clear":
+            super().clear()
+
+    # Logging
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.seq += 1
+        entry["seq"] = self.seq
+        self._log.write(_dumps(entry))
+        self._log.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_batch:
+            self.sync()
+        self._entries_since_snapshot += 1
+        if self.snapshot_interval and self._entries_since_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def sync(self) -> None:
+        """Force journaled mutations to stable storage."""
+        if self._unsynced:
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+
+    def snapshot(self) -> None:
+        """Start compacting the current store into a snapshot in the background.
+
+        Does nothing while the previous snapshot is still being written; the
+        log keeps growing until the next call.
+        """
+        with self._lock:
+            if self._snapshotter is not None and self._snapshotter.is_alive():
+                return
+            self._rotate()
+            header = {"next_id": self.next_id, "seq": self.seq}
+            # The shared row tuple never changes; rows are replaced on update.
+            # Only an activation flips ``active`` in place, and replaying the
+            # logged activation after the snapshot makes that harmless.
+            records = self._records()
+            self._entries_since_snapshot = 0
+            self._snapshotter = threading.Thread(
+                target=self._write_snapshot, args=(header, records), name="journal-snapshot", daemon=True
+            )
+            self._snapshotter.start()
+
+    def _rotate(self) -> None:
+        # Callers hold the writer lock. The log so far becomes a segment, so
+        # new entries go to a fresh log while the snapshot is written.
+        if self._log.tell() == 0:
+            return
+        self.sync()
+        self._log.close()
+        os.replace(self.log_path, f"{self.log_path}.{self.seq}")
+        self._log = open(self.log_path, "ab")
+        _fsync_directory(self.directory)
+
+    def _write_snapshot(self, header: Dict[str, int], records: Tuple[HospitalRecord, ...]) -> None:
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_dumps(header))
+            f.writelines(_dumps(_encode_record(record)) for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        _fsync_directory(self.directory)
+        # Entries up to the snapshot's seq are covered by it
+        for seq, path in self._segments():
+            if seq <= header["seq"]:
+                os.remove(path)
+
+    # Mutations
+    #
+    # The writer lock is held across apply + append so the log order always
+    # matches the order mutations were applied in.
+
+    def create_hospital(self, hospital: Hospital) -> Hospital:
+        with self._lock:
+            evicted = self._create(hospital)
+            entry = {"op": "create", "row": _encode_record(self.store.get(hospital.id))}
+            if evicted:
+                entry["evicted"] = [record.id for record in evicted]
+            self._append(entry)
+        return hospital
+
+    def create_hospitals(self, hospitals: List[Hospital]) -> List[Hospital]:
+        # One log line, so a crash mid-write loses the whole batch or none of it
+        with self._lock:
+            evicted = self._create_many(hospitals)
+            entry = {
+                "op": "create_many",
+                "rows": [_encode_record(self.store.get(hospital.id)) for hospital in hospitals],
+            }
+            if evicted:
+                entry["evicted"] = [record.id for record in evicted]
+            self._append(entry)
+        return hospitals
+
+    def find_or_create_hospitals(self, hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]:
+        with self._lock:
+            results, evicted = self._find_or_create_many(hospitals)
+            rows = [_encode_record(self.store.get(hospital.id)) for hospital, created in results if created]
+            if rows:
+                entry = {"op": "create_many", "rows": rows}
+                if evicted:
+                    entry["evicted"] = [record.id for record in evicted]
+                self._append(entry)
+        return results
+
+    def update_hospital(self, hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]:
+        with self._lock:
+            updated = super().update_hospital(hospital_id, updated_hospital)
+            if updated is not None:
+                self._append({"op": "update", "row": _encode_record(self.store.get(hospital_id))})
+        return updated
+
+    def update_hospital_fields(self, hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]:
+        with self._lock:
+            updated = super().update_hospital_fields(hospital_id, fields)
+            if updated is not None:
+                self._append({"op": "update", "row": _encode_record(self.store.get(hospital_id))})
+        return updated
+
+    def delete_hospital(self, hospital_id: int) -> bool:
+        with self._lock:
+            deleted = super().delete_hospital(hospital_id)
+            if deleted:
+                self._append({"op": "delete", "id": hospital_id})
+        return deleted
+
+    def delete_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._lock:
+            count = super().delete_hospitals_by_batch_id(batch_id)
+            if count:
+                self._append({"op": "delete_batch", "batch_id": str(batch_id)})
+        return count
+
+    def activate_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._lock:
+            count = super().activate_hospitals_by_batch_id(batch_id)
+            if count:
+                self._append({"op": "activate", "batch_id": str(batch_id)})
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._append({"op": "clear"})
+
+    def close(self) -> None:
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        with self._lock:
+            if not self._log.closed:
+                self.sync()
+                self._log.close()
@@ -0,0 +1,695 @@
+"""In-memory storage backend with pluggable eviction."""
+
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from app.models import BatchSummary, Hospital, StoreStats
+from app.config import MAX_TOTAL_HOSPITALS, get_eviction_policy, get_max_store_bytes
+from uuid import UUID
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import os
+import sys
+import threading
+
+from app.serialization import encode_hospital, encode_hospitals, json_array
+from .base import with_fields
+from .eviction import create_policy
+from .search import TrigramIndex, dedup_key
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _pack_datetime(value: datetime) -> Union[int, datetime]:
+    # Naive timestamps (the server default) are kept as exact microsecond
+    # offsets; aware ones are rare enough to store untouched.
+    if value.tzinfo is not None:
+        return value
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _unpack_datetime(value: Union[int, datetime]) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def record_size(record: "HospitalRecord") -> int:
+    """Estimate the bytes a stored record keeps alive.
+
+    Interned strings may be shared between rows, so this errs high; it is
+    meant for budgeting, not exact accounting. The cached JSON is left out
+    because it is filled lazily by readers.
+    """
+    size = sys.getsizeof(record) + sys.getsizeof(record.created_at)
+    for value in (record.name, record.address, record.phone):
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size
+
+
+class HospitalRecord:
+    """Compact stored form of a hospital.
+
+    Strings are interned and ``created_at`` is packed into an int, so a row
+    costs a fixed-size slots object instead of a Pydantic model with its own
+    ``__dict__`` and ``datetime``. Models are only built at the API boundary,
+    and reads that only need JSON use ``to_json``, which encodes a row once.
+    """
+
+    __slots__ = ("id", "name", "address", "phone", "creation_batch_id", "active", "created_at", "_json")
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        address: str,
+        phone: Optional[str],
+        creation_batch_id: Optional[UUID],
+        active: bool,
+        created_at: Union[int, datetime],
+    ):
+        self.id = id
+        self.name = name
+        self.address = address
+        self.phone = phone
+        self.creation_batch_id = creation_batch_id
+        self.active = active
+        self.created_at = created_at
+        self._json: Optional[Tuple[bool, bytes]] = None
+
+    @classmethod
+    def from_model(cls, hospital: Hospital) -> "HospitalRecord":
+        return cls(
+            hospital.id,
+            _intern(hospital.name),
+            _intern(hospital.address),
+            _intern(hospital.phone),
+            hospital.creation_batch_id,
+            hospital.active,
+            _pack_datetime(hospital.created_at),
+        )
+
+    def to_model(self) -> Hospital:
+        # Records only ever hold validated data, so skip re-validation
+        return Hospital.model_construct(
+            id=self.id,
+            name=self.name,
+            address=self.address,
+            phone=self.phone,
+            creation_batch_id=self.creation_batch_id,
+            active=self.active,
+            created_at=_unpack_datetime(self.created_at),
+        )
+
+    def to_json(self) -> bytes:
+        # Updates replace the record, so only ``active`` (flipped in place by
+        # batch activation) can go stale; the cache remembers the flag it was
+        # built with rather than relying on writers to clear it
+        cached = self._json
+        active = self.active
+        if cached is None or cached[0] is not active:
+            cached = self._json = (active, encode_hospital({
+                "id": self.id,
+                "name": self.name,
+                "address": self.address,
+                "phone": self.phone,
+                "creation_batch_id": self.creation_batch_id,
+                "active": active,
+                "created_at": _unpack_datetime(self.created_at),
+            }))
+        return cached[1]
+
+    def project(self, fields: Tuple[str, ...]) -> Dict[str, object]:
+        """Map the given field names to model values, unpacking only what is asked for."""
+        return {
+            name: _unpack_datetime(self.created_at) if name == "created_at" else getattr(self, name)
+            for name in fields
+        }
+
+
+def _record_dedup_key(record: HospitalRecord) -> str:
+    return dedup_key(record.name, record.address, record.phone)
+
+
+# Estimated cost of a duplicate index entry besides its key: the id set and the slot holding it
+_DEDUP_ENTRY_BYTES = sys.getsizeof({0: None}) + 32
+
+
+class BatchStats:
+    """Members and running counters of one creation batch."""
+
+    __slots__ = ("batch_id", "members", "active_count", "first_created_at", "last_created_at", "version")
+
+    def __init__(self, batch_id: UUID):
+        self.batch_id = batch_id
+        self.version = 0
+        self.members: Dict[int, HospitalRecord] = {}
+        self.active_count = 0
+        self.first_created_at: Union[int, datetime, None] = None
+        self.last_created_at: Union[int, datetime, None] = None
+
+
+class HospitalStore:
+    """Id-keyed, insertion-ordered hospital storage with bounded size.
+
+    Keeps the semantics of the ``deque(maxlen=...)`` it replaces by default:
+    ``append`` evicts once ``maxlen`` is reached and iteration runs
+    oldest-first. Lookups, replacements and removals by id are O(1).
+
+    Which row goes is up to the ``EvictionPolicy`` (see ``eviction.py``);
+    ``max_bytes`` additionally caps the estimated size of all rows. Each
+    eviction costs O(1) plus the batch index update, and ``evictions``
+    counts them so capacity can be sized from real traffic.
+
+    A secondary index maps each ``creation_batch_id`` to its ``BatchStats``
+    (member records in insertion order plus member/active counts and the
+    created_at range) so batch operations cost O(batch size) and batch
+    checks run in O(1). Rows sharing a batch also share one ``UUID`` object.
+    ``search_index`` (see ``search.py``) is built by ``build_search_index``
+    on the first search and follows every change after that, so stores
+    that are never searched never pay for it. Likewise ``dedup_index``, a
+    hash index of ``dedup_key`` that finds duplicates of a new row in O(1),
+    is built by ``build_dedup_index`` on the first duplicate lookup, which
+    only happens with duplicate detection on. ``bytes`` counts the rows and
+    any index that has been built.
+
+    Keyset pages come from a sorted list of ids. Ids only grow, so inserts
+    are appends; removed ids stay behind as dead entries, skipped on read,
+    until they outnumber an eighth of the rows and the list is compacted.
+
+    ``version`` counts changes and each batch's ``BatchStats.version`` holds
+    its value at the batch's latest change, for conditional GETs. Both are
+    bumped only once a change is visible, so a reader that reads a version
+    before the rows can only pair rows with an older version, never a newer.
+    ``epoch`` is random per store, so versions never repeat across restarts.
+    """
+
+    def __init__(self, maxlen: int = MAX_TOTAL_HOSPITALS, policy: str = "fifo", max_bytes: int = 0):
+        self.maxlen = maxlen
+        self.max_bytes = max_bytes
+        self.policy = create_policy(policy)
+        self.evictions = 0
+        self.version = 0
+        self.epoch = os.urandom(4).hex()
+        self.search_index: Optional[TrigramIndex] = None
+        self._row_bytes = 0
+        self.dedup_index: Optional[Dict[str, Dict[int, None]]] = None
+        self._dedup_bytes = 0
+        self._rows: "OrderedDict[int, HospitalRecord]" = OrderedDict()
+        self._batches: Dict[UUID, BatchStats] = {}
+        self._ids: List[int] = []
+        self._dead_ids = 0
+        self._changed_batches: List[BatchStats] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[HospitalRecord]:
+        return iter(self._rows.values())
+
+    def __contains__(self, hospital_id: object) -> bool:
+        return hospital_id in self._rows
+
+    @property
+    def bytes(self) -> int:
+        """Estimated bytes held by the rows and the indexes built so far."""
+        index = self.search_index
+        return self._row_bytes + self._dedup_bytes + (index.bytes if index is not None else 0)
+
+    def empty_copy(self) -> "HospitalStore":
+        """Create an empty store with the same limits and policy."""
+        return HospitalStore(self.maxlen, self.policy.name, self.max_bytes)
+
+    def append(self, record: HospitalRecord, evict: bool = True) -> List[HospitalRecord]:
+        """Add a record and return whatever had to be evicted to make room."""
+        self.remove(record.id)
+        self._rows[record.id] = record
+        self._add_id(record.id)
+        self._track(record)
+        self._index(record)
+        self._bump_version()
+        return self.evict(protected=(record.id,)) if evict else []
+
+    def page(self, after_id: int, limit: int) -> List[HospitalRecord]:
+        """Return up to ``limit`` records with ids above ``after_id``, in id order."""
+        ids, rows = self._ids, self._rows
+        records = []
+        for position in range(bisect_right(ids, after_id), len(ids)):
+            record = rows.get(ids[position])
+            if record is not None:
+                records.append(record)
+                if len(records) == limit:
+                    break
+        return records
+
+    def evict(self, protected: Collection[int] = ()) -> List[HospitalRecord]:
+        """Evict rows other than ``protected`` until the store is within its limits again."""
+        evicted = []
+        while self._over_limit():
+            victim_id = self.policy.victim(iter(self._rows), protected)
+            if victim_id is None:
+                break  # Only protected rows are left
+            evicted.append(self.remove(victim_id))
+        self.evictions += len(evicted)
+        return evicted
+
+    def evict_ids(self, hospital_ids: Iterable[int]) -> None:
+        """Replay evictions that were decided earlier (e.g. from a journal)."""
+        for hospital_id in hospital_ids:
+            if self.remove(hospital_id) is not None:
+                self.evictions += 1
+
+    def get(self, hospital_id: int) -> Optional[HospitalRecord]:
+        return self._rows.get(hospital_id)
+
+    def build_search_index(self) -> TrigramIndex:
+        """Index every row for search, once; later changes keep the index current."""
+        if self.search_index is None:
+            index = TrigramIndex(self._rows)
+            for record in self._rows.values():
+                index.add(record.id, record.name, record.address)
+            # Publish only once populated so lock-free readers never see a partial index
+            self.search_index = index
+        return self.search_index
+
+    def build_dedup_index(self) -> Dict[str, Dict[int, None]]:
+        """Index every row by ``dedup_key``, once; later changes keep the index current."""
+        if self.dedup_index is None:
+            self.dedup_index = {}
+            for record in self._rows.values():
+                self._dedup(record)
+        return self.dedup_index
+
+    def find_duplicate(self, key: str) -> Optional[HospitalRecord]:
+        """Return the oldest stored record with this ``dedup_key``; needs ``build_dedup_index``."""
+        ids = self.dedup_index.get(key)
+        if not ids:
+            return None
+        for hospital_id in list(ids):
+            record = self._rows.get(hospital_id)
+            if record is not None:
+                return record
+        return None
+
+    def touch(self, hospital_id: int) -> None:
+        """Tell the eviction policy a row was accessed."""
+        self.policy.touch(hospital_id)
+
+    def replace(self, hospital_id: int, record: HospitalRecord) -> bool:
+        previous = self._rows.get(hospital_id)
+        if previous is None:
+            return False
+        record.id = hospital_id
+        self._row_bytes += record_size(record) - record_size(previous)
+        if record.active != previous.active:
+            self.policy.activated(hospital_id, record.active)
+        self.policy.touch(hospital_id)
+        index = self.search_index
+        if index is not None and (record.name, record.address) != (previous.name, previous.address):
+            index.change(hospital_id, previous.name, previous.address, record.name, record.address)
+        if self.dedup_index is not None and (
+            (record.name, record.address, record.phone) != (previous.name, previous.address, previous.phone)
+        ):
+            self._undedup(previous)
+            self._dedup(record)
+        stats = self._batches.get(previous.creation_batch_id)
+        if stats is not None and previous.creation_batch_id == record.creation_batch_id:
+            # Same batch: swap the member in place to keep its position
+            record.creation_batch_id = stats.batch_id
+            stats.members[hospital_id] = record
+            stats.active_count += record.active - previous.active
+            self._rows[hospital_id] = record
+            if record.created_at != previous.created_at:
+                self._refresh_created_range(stats)
+            self._changed_batches.append(stats)
+            self._bump_version()
+            return True
+        self._unindex(previous)
+        self._rows[hospital_id] = record
+        self._index(record)
+        self._bump_version()
+        return True
+
+    def remove(self, hospital_id: int) -> Optional[HospitalRecord]:
+        record = self._rows.pop(hospital_id, None)
+        if record is not None:
+            self._untrack(record)
+            self._unindex(record)
+            self._dead_ids += 1
+            if self._dead_ids > max(64, len(self._rows) // 8):
+                # Build a new list so lock-free readers keep a consistent one
+                self._ids = [i for i in self._ids if i in self._rows]
+                self._dead_ids = 0
+            self._bump_version()
+        return record
+
+    def batch_stats(self, batch_id: UUID) -> Optional[BatchStats]:
+        return self._batches.get(batch_id)
+
+    def batch_member_ids(self, batch_id: UUID) -> List[int]:
+        stats = self._batches.get(batch_id)
+        return list(stats.members) if stats is not None else []
+
+    def batch_members(self, batch_id: UUID) -> List[HospitalRecord]:
+        stats = self._batches.get(batch_id)
+        return list(stats.members.values()) if stats is not None else []
+
+    def activate_batch(self, batch_id: UUID) -> int:
+        stats = self._batches.get(batch_id)
+        if stats is None:
+            return 0
+        count = 0
+        for record in stats.members.values():
+            if not record.active:
+                record.active = True
+                self.policy.activated(record.id, True)
+                count += 1
+        stats.active_count += count
+        if count:
+            self._changed_batches.append(stats)
+            self._bump_version()
+        return count
+
+    def _add_id(self, hospital_id: int) -> None:
+        ids = self._ids
+        if not ids or hospital_id > ids[-1]:
+            ids.append(hospital_id)
+            return
+        # Only re-inserted or replayed ids land here
+        position = bisect_left(ids, hospital_id)
+        if position < len(ids) and ids[position] == hospital_id:
+            self._dead_ids -= 1  # A dead entry comes back to life
+        else:
+            ids.insert(position, hospital_id)
+
+    def _bump_version(self) -> None:
+        self.version += 1
+        for stats in self._changed_batches:
+            stats.version = self.version
+        self._changed_batches.clear()
+
+    def _over_limit(self) -> bool:
+        return len(self._rows) > self.maxlen or 0 < self.max_bytes < self.bytes
+
+    def _track(self, record: HospitalRecord) -> None:
+        self._row_bytes += record_size(record)
+        self.policy.add(record.id, record.active)
+        if self.search_index is not None:
+            self.search_index.add(record.id, record.name, record.address)
+        if self.dedup_index is not None:
+            self._dedup(record)
+
+    def _untrack(self, record: HospitalRecord) -> None:
+        self._row_bytes -= record_size(record)
+        self.policy.remove(record.id)
+        if self.search_index is not None:
+            self.search_index.remove(record.id, record.name, record.address)
+        if self.dedup_index is not None:
+            self._undedup(record)
+
+    def _dedup(self, record: HospitalRecord) -> None:
+        key = _record_dedup_key(record)
+        self.dedup_index.setdefault(key, {})[record.id] = None
+        self._dedup_bytes += sys.getsizeof(key) + _DEDUP_ENTRY_BYTES
+
+    def _undedup(self, record: HospitalRecord) -> None:
+        key = _record_dedup_key(record)
+        ids = self.dedup_index.get(key)
+        if ids is not None and record.id in ids:
+            del ids[record.id]
+            self._dedup_bytes -= sys.getsizeof(key) + _DEDUP_ENTRY_BYTES
+            if not ids:
+                del self.dedup_index[key]
+
+    def _index(self, record: HospitalRecord) -> None:
+        if record.creation_batch_id is None:
+            return
+        stats = self._batches.get(record.creation_batch_id)
+        is_new = stats is None
+        if is_new:
+            stats = BatchStats(record.creation_batch_id)
+            stats.version = self.version  # Never below a deleted namesake's
+        record.creation_batch_id = stats.batch_id
+        stats.members[record.id] = record
+        stats.active_count += record.active
+        created_at = record.created_at
+        if stats.first_created_at is None or created_at < stats.first_created_at:
+            stats.first_created_at = created_at
+        if stats.last_created_at is None or created_at > stats.last_created_at:
+            stats.last_created_at = created_at
+        self._changed_batches.append(stats)
+        if is_new:
+            # Publish only once populated so lock-free readers never see a blank batch
+            self._batches[stats.batch_id] = stats
+
+    def _unindex(self, record: HospitalRecord) -> None:
+        stats = self._batches.get(record.creation_batch_id)
+        if stats is None or stats.members.pop(record.id, None) is None:
+            return
+        stats.active_count -= record.active
+        if not stats.members:
+            del self._batches[record.creation_batch_id]
+            return
+        if record.created_at in (stats.first_created_at, stats.last_created_at):
+            # Only a boundary member leaving needs a rescan, bounded by batch size
+            self._refresh_created_range(stats)
+        self._changed_batches.append(stats)
+
+    @staticmethod
+    def _refresh_created_range(stats: BatchStats) -> None:
+        created = [member.created_at for member in stats.members.values()]
+        stats.first_created_at = min(created)
+        stats.last_created_at = max(created)
+
+
+class MemoryBackend:
+    """Process-local storage backend built on ``HospitalStore``.
+
+    Safe to share across FastAPI's threadpool. All mutations (including id
+    allocation) go through one writer lock. Readers never take it: single
+    lookups are atomic dict reads, stored records are replaced rather than
+    edited (except for the ``active`` flag, a single attribute write), and
+    listings iterate an immutable tuple snapshot that is rebuilt at most
+    once per store version. Keying it on the version the ETags use means a
+    listing body is never older than a tag read before it.
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        capacity: int = MAX_TOTAL_HOSPITALS,
+        eviction_policy: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.store = HospitalStore(
+            maxlen=capacity,
+            policy=eviction_policy or get_eviction_policy(),
+            max_bytes=max_bytes if max_bytes is not None else get_max_store_bytes(),
+        )
+        self.next_id = 1
+        self._lock = threading.RLock()
+        self._snapshot: Tuple[Optional[HospitalStore], int, Tuple[HospitalRecord, ...]] = (None, 0, ())
+
+    def _records(self) -> Tuple[HospitalRecord, ...]:
+        store = self.store
+        snapshot_store, version, records = self._snapshot
+        if snapshot_store is not store or version != store.version:
+            # Read the version first: a snapshot may be newer than its
+            # label, never older. tuple() copies the dict in one C call.
+            version = store.version
+            records = tuple(store)
+            self._snapshot = (store, version, records)
+        return records
+
+    def count_hospitals(self) -> int:
+        return len(self.store)
+
+    def get_all_hospitals(self) -> List[Hospital]:
+        return [record.to_model() for record in self._records()]
+
+    def get_hospitals_by_batch_id(self, batch_id: UUID) -> List[Hospital]:
+        members = self.store.batch_members(batch_id)
+        for record in members:
+            self.store.touch(record.id)
+        return [record.to_model() for record in members]
+
+    def get_batch_size(self, batch_id: UUID) -> int:
+        stats = self.store.batch_stats(batch_id)
+        return len(stats.members) if stats is not None else 0
+
+    def get_batch_summary(self, batch_id: UUID) -> Optional[BatchSummary]:
+        stats = self.store.batch_stats(batch_id)
+        if stats is None:
+            return None
+        hospital_count = len(stats.members)
+        if hospital_count == 0:
+            return None  # Emptied by a concurrent delete
+        return BatchSummary(
+            batch_id=batch_id,
+            hospital_count=hospital_count,
+            active_count=stats.active_count,
+            first_created_at=_unpack_datetime(stats.first_created_at),
+            last_created_at=_unpack_datetime(stats.last_created_at),
+        )
+
+    def get_hospital_by_id(self, hospital_id: int) -> Optional[Hospital]:
+        record = self.store.get(hospital_id)
+        if record is None:
+            return None
+        self.store.touch(hospital_id)
+        return record.to_model()
+
+    def get_hospital_json(self, hospital_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]:
+        record = self.store.get(hospital_id)
+        if record is None:
+            return None
+        self.store.touch(hospital_id)
+        return record.to_json() if fields is None else encode_hospital(record.project(fields))
+
+    def get_all_hospitals_json(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        if fields is None:
+            return json_array(record.to_json() for record in self._records())
+        # Projections are not cached; encoding all rows in one call is the next best
+        return encode_hospitals([record.project(fields) for record in self._records()])
+
+    def get_hospitals_page(self, after_id: int, limit: int) -> List[Hospital]:
+        return [record.to_model() for record in self.store.page(after_id, limit)]
+
+    def get_version(self, batch_id: Optional[UUID] = None) -> Optional[str]:
+        store = self.store
+        if batch_id is None:
+            return f"{store.epoch}.{store.version}"
+        stats = store.batch_stats(batch_id)
+        return f"{store.epoch}.{stats.version}" if stats is not None else None
+
+    def iter_hospitals(self) -> Iterator[Hospital]:
+        # Walks the shared snapshot; models are built one at a time
+        return (record.to_model() for record in self._records())
+
+    def find_duplicate(self, name: str, address: str, phone: Optional[str]) -> Optional[Hospital]:
+        store = self.store
+        if store.dedup_index is None:
+            with self._lock:
+                store.build_dedup_index()
+        record = store.find_duplicate(dedup_key(name, address, phone))
+        return record.to_model() if record is not None else None
+
+    def search_hospitals(self, query: str, limit: int) -> List[Hospital]:
+        store = self.store
+        index = store.search_index
+        if index is None:
+            with self._lock:
+                index = store.build_search_index()
+        records = (store.get(hospital_id) for hospital_id in index.search(query, limit))
+        return [record.to_model() for record in records if record is not None]
+
+    def get_stats(self) -> StoreStats:
+        return StoreStats(
+            backend=self.name,
+            hospital_count=len(self.store),
+            capacity=self.store.maxlen,
+            eviction_policy=self.store.policy.name,
+            evictions=self.store.evictions,
+            max_bytes=self.store.max_bytes or None,
+            estimated_bytes=self.store.bytes,
+        )
+
+    def _create(self, hospital: Hospital) -> List[HospitalRecord]:
+        # Callers hold the writer lock; returns the rows evicted to make room
+        hospital.id = self.next_id
+        self.next_id += 1
+        return self.store.append(HospitalRecord.from_model(hospital))
+
+    def _create_many(self, hospitals: List[Hospital]) -> List[HospitalRecord]:
+        # Like ``_create``, but evicts only once every new row is in, so
+        # none of them can be chosen to make room for another
+        new_ids = set()
+        for hospital in hospitals:
+            hospital.id = self.next_id
+            self.next_id += 1
+            self.store.append(HospitalRecord.from_model(hospital), evict=False)
+            new_ids.add(hospital.id)
+        return self.store.evict(protected=new_ids)
+
+    def _find_or_create_many(self, hospitals: List[Hospital]) -> Tuple[List[Tuple[Hospital, bool]], List[HospitalRecord]]:
+        # Callers hold the writer lock, so no duplicate can be stored between
+        # the lookup and the insert; repeats within ``hospitals`` share a row
+        self.store.build_dedup_index()
+        found: Dict[str, Hospital] = {}
+        results = []
+        new = []
+        for hospital in hospitals:
+            key = dedup_key(hospital.name, hospital.address, hospital.phone)
+            if key not in found:
+                record = self.store.find_duplicate(key)
+                if record is None:
+                    found[key] = hospital
+                    new.append(hospital)
+                    results.append((hospital, True))
+                    continue
+                found[key] = record.to_model()
+            results.append((found[key], False))
+        return results, self._create_many(new) if new else []
+
+    def create_hospital(self, hospital: Hospital) -> Hospital:
+        with self._lock:
+            self._create(hospital)
+        return hospital
+
+    def create_hospitals(self, hospitals: List[Hospital]) -> List[Hospital]:
+        with self._lock:
+            self._create_many(hospitals)
+        return hospitals
+
+    def find_or_create_hospitals(self, hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]:
+        with self._lock:
+            results, _ = self._find_or_create_many(hospitals)
+        return results
+
+    def update_hospital(self, hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]:
+        record = HospitalRecord.from_model(updated_hospital)
+        with self._lock:
+            if not self.store.replace(hospital_id, record):
+                return None
+        return updated_hospital
+
+    def update_hospital_fields(self, hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]:
+        with self._lock:
+            current = self.store.get(hospital_id)
+            if current is None:
+                return None
+            # Read under the lock, so a concurrent activation is kept, not overwritten
+            updated = with_fields(current.to_model(), fields)
+            self.store.replace(hospital_id, HospitalRecord.from_model(updated))
+        return updated
+
+    def delete_hospital(self, hospital_id: int) -> bool:
+        with self._lock:
+            if self.store.remove(hospital_id) is None:
+                return False
+        return True
+
+    def delete_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._lock:
+            member_ids = self.store.batch_member_ids(batch_id)
+            for hospital_id in member_ids:
+                self.store.remove(hospital_id)
+        return len(member_ids)
+
+    def activate_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._lock:
+            return self.store.activate_batch(batch_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.store = self.store.empty_copy()
+            self.next_id = 1
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,219 @@
+"""Text normalization, duplicate keys and the trigram search index."""
+
+import heapq
+import re
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+_WORD = re.compile(r"\w+")
+_LENGTH_BITS = 20
+_ID_BITS = 64
+# Estimated cost of one posting entry, and of a posting's gram key, array and dict slot
+_ENTRY_BYTES = array("q").itemsize
+_POSTING_BYTES = sys.getsizeof("abc") + sys.getsizeof(array("q")) + 32
+# Intersect with a posting only while it is at most this many times the candidates
+_INTERSECT_RATIO = 32
+
+
+def search_terms(text: str) -> List[str]:
+    """Split text into case-folded words, dropping punctuation."""
+    return _WORD.findall(text.casefold())
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join(search_terms(text)) if text else ""
+
+
+def dedup_key(name: str, address: str, phone: Optional[str]) -> str:
+    """Key under which two hospitals count as duplicates.
+
+    Case, punctuation and spacing are ignored in the name and address, and
+    only the digits of the phone number are kept.
+    """
+    digits = "".join(ch for ch in phone if ch.isdigit()) if phone else ""
+    return "\x1f".join((_normalize(name), _normalize(address), digits))
+
+
+def _word_grams(word: str) -> Iterable[str]:
+    # Two leading pads give every word "  w" and " wo" grams, so one- and
+    # two-character queries can still match word prefixes through the index
+    padded = "  " + word
+    return (padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _query_grams(term: str) -> List[str]:
+    if len(term) < 3:
+        return [("  " + term)[-3:]]
+    return [term[i:i + 3] for i in range(len(term) - 2)]
+
+
+def _term_rank(term: str, name: str, address: str) -> Optional[int]:
+    # Lower is better; short terms only match at word starts
+    if name.startswith(term):
+        return 0
+    if (" " + term) in name:
+        return 1
+    if len(term) >= 3 and term in name:
+        return 2
+    if address.startswith(term) or (" " + term) in address:
+        return 3
+    if len(term) >= 3 and term in address:
+        return 4
+    return None
+
+
+def rank_match(terms: List[str], name: Optional[str], address: Optional[str]) -> Optional[int]:
+    """Rank a hospital against search terms, lower first; ``None`` if any term is missing.
+
+    Name matches beat address matches, and prefixes beat substrings. Ties go
+    to the shorter name. Shared by every backend so results rank the same.
+    """
+    return _rank_normalized(terms, _normalize(name), _normalize(address))
+
+
+def _rank_normalized(terms: List[str], name: str, address: str) -> Optional[int]:
+    total = 0
+    for term in terms:
+        rank = _term_rank(term, name, address)
+        if rank is None:
+            return None
+        total += rank
+    # Packed into one int so ranking large candidate sets allocates no tuples
+    return total << _LENGTH_BITS | min(len(name), (1 << _LENGTH_BITS) - 1)
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to hospital ids.
+
+    Every word of a name or address is indexed by its trigrams, so a query
+    term of three or more characters is a substring match and a shorter term
+    a word-prefix match. Multi-word queries must match every term.
+    Candidates come from the rarest trigram's posting, narrowed by the
+    others while that is cheaper than checking them, and are then verified
+    and ranked against ``rows``, so cost follows the rarest trigram rather
+    than the number of rows.
+
+    ``rows`` maps ids to the indexed objects (anything with ``name`` and
+    ``address``); the index keeps no text of its own. Postings are arrays
+    of 8-byte ids, a fraction of what sets cost. Removing a row only counts
+    its entries as dead; a posting is compacted once a quarter of it is
+    dead, dropping ids no longer in ``rows``. A renamed row (``change``)
+    only leaves the trigrams its text lost, and is remembered as stale in
+    those until compaction, so renaming it back revives the old entry
+    instead of adding a second one. ``bytes`` estimates the live entries,
+    so dead ones can add at most a third on top.
+    """
+
+    def __init__(self, rows: Mapping[int, Any]):
+        self.bytes = 0
+        self._rows = rows
+        self._postings: Dict[str, "array[int]"] = {}
+        self._dead: Dict[str, int] = {}
+        self._stale: Dict[str, Set[int]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, hospital_id: int, name: str, address: str) -> None:
+        self._add_grams(hospital_id, _grams(name, address))
+        self._count += 1
+
+    def remove(self, hospital_id: int, name: str, address: str) -> None:
+        """Forget a row, given the text it was added with."""
+        self._remove_grams(hospital_id, _grams(name, address), renamed=False)
+        self._count -= 1
+
+    def change(self, hospital_id: int, old_name: str, old_address: str, name: str, address: str) -> None:
+        """Re-index a row whose text changed, touching only the trigrams that differ."""
+        old, new = _grams(old_name, old_address), _grams(name, address)
+        self._remove_grams(hospital_id, old - new, renamed=True)
+        self._add_grams(hospital_id, new - old)
+
+    def _add_grams(self, hospital_id: int, grams: Iterable[str]) -> None:
+        postings, dead, stale = self._postings, self._dead, self._stale
+        for gram in grams:
+            self.bytes += _ENTRY_BYTES
+            ids = stale.get(gram)
+            if ids is not None and hospital_id in ids:
+                # Renamed back before compaction: its entry is still there
+                ids.discard(hospital_id)
+                if not ids:
+                    del stale[gram]
+                dead[gram] -= 1
+                continue
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("q")
+                self.bytes += _POSTING_BYTES
+            posting.append(hospital_id)
+
+    def _remove_grams(self, hospital_id: int, grams: Iterable[str], renamed: bool) -> None:
+        postings, dead = self._postings, self._dead
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                continue
+            self.bytes -= _ENTRY_BYTES
+            if renamed:
+                # Still in ``rows``, so compaction must be told to drop it
+                self._stale.setdefault(gram, set()).add(hospital_id)
+            count = dead.get(gram, 0) + 1
+            if count * 4 < len(posting):
+                dead[gram] = count
+                continue
+            # Build a new array so lock-free readers keep a consistent one
+            rows = self._rows
+            stale = self._stale.pop(gram, ())
+            live = array("q", (i for i in posting if i in rows and i not in stale))
+            dead.pop(gram, None)
+            if live:
+                postings[gram] = live
+            else:
+                del postings[gram]
+                self.bytes -= _POSTING_BYTES
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Return up to ``limit`` matching ids, best match first."""
+        terms = search_terms(query)
+        if not terms or limit <= 0:
+            return []
+        grams = {gram for term in terms for gram in _query_grams(term)}
+        postings = [self._postings.get(gram) for gram in grams]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(posting) > _INTERSECT_RATIO * len(candidates):
+                break  # Checking the remaining candidates is cheaper
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        # Bounded heap of negated (rank, id) keys: heap[0] is the worst kept match
+        heap: List[int] = []
+        rows = self._rows
+        for hospital_id in candidates:
+            row = rows.get(hospital_id)
+            if row is None:
+                continue  # Removed, or removed by a concurrent writer
+            name = _normalize(row.name)
+            # Name matches never look at the address, so normalize it only when needed
+            rank = _rank_normalized(terms, name, "")
+            if rank is None:
+                rank = _rank_normalized(terms, name, _normalize(row.address))
+                if rank is None:
+                    continue
+            key = -(rank << _ID_BITS | hospital_id)
+            if len(heap) < limit:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heapreplace(heap, key)
+        id_mask = (1 << _ID_BITS) - 1
+        return [-key & id_mask for key in sorted(heap, reverse=True)]
+
+
+def _grams(name: str, address: str) -> Set[str]:
+    return {gram for field in (name, address) for word in search_terms(field) for gram in _word_grams(word)}
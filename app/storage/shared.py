@@ -0,0 +1,233 @@
+"""Share one storage backend between several worker processes.
+
+The supervising process hosts its backend behind a ``StoreServer`` on a
+local socket; each uvicorn worker talks to it through ``SharedBackend``.
+All ids are allocated by the hosted backend, so they are unique across
+workers, and every worker reads the same rows and batches.
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from uuid import UUID
+
+from app.config import (
+    MAX_TOTAL_HOSPITALS,
+    SHARED_STORE_POOL_SIZE,
+    STREAM_CHUNK_SIZE,
+    get_shared_store_address,
+    get_shared_store_authkey,
+)
+from app.models import BatchSummary, Hospital, StoreStats
+from .base import StorageBackend, iter_pages
+
+Address = Union[str, Tuple[str, int]]
+
+# Everything in the protocol except ``close``, which only drops a client's link,
+# and ``iter_hospitals``, whose generator cannot cross the connection
+EXPOSED_METHODS = frozenset(
+    name for name in dir(StorageBackend)
+    if not name.startswith("_") and name not in ("close", "iter_hospitals")
+)
+
+
+def parse_address(address: str) -> Address:
+    """Parse ``host:port`` into a TCP address; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address
+
+
+def format_address(address: Address) -> str:
+    if isinstance(address, tuple):
+        return f"{address[0]}:{address[1]}"
+    return address
+
+
+class StoreServer:
+    """Serve a backend to other local processes from background threads.
+
+    Each client connection gets its own thread; the backend's own locking
+    keeps concurrent calls safe, exactly as with FastAPI's threadpool.
+    """
+
+    def __init__(self, backend: StorageBackend, address: Optional[str] = None, authkey: Optional[bytes] = None):
+        self.backend = backend
+        self.authkey = authkey or os.urandom(16)
+        self._listener = Listener(
+            parse_address(address or get_shared_store_address()), authkey=self.authkey, backlog=128
+        )
+        self._thread = threading.Thread(target=self._accept, name="store-server", daemon=True)
+
+    @property
+    def address(self) -> str:
+        return format_address(self._listener.address)
+
+    def start(self) -> "StoreServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._listener.close()
+
+    def client_environment(self) -> dict:
+        """Environment variables that make worker processes attach to this server."""
+        return {
+            "STORAGE_BACKEND": "shared",
+            "SHARED_STORE_ADDRESS": self.address,
+            "SHARED_STORE_AUTHKEY": self.authkey.hex(),
+        }
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return  # Listener closed by stop()
+            except Exception:
+                continue  # Failed handshake; keep serving everyone else
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    method, args = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if method not in EXPOSED_METHODS:
+                        raise AttributeError(f"Store method '{method}' is not exposed")
+                    reply = (True, getattr(self.backend, method)(*args))
+                except Exception as exc:
+                    reply = (False, exc)
+                connection.send(reply)
+
+
+class SharedBackend:
+    """Storage backend that forwards every call to a ``StoreServer``.
+
+    Connections come from a small fixed pool, like ``SqliteBackend``'s, so a
+    worker's threadpool issues concurrent calls without opening a socket per
+    thread. ``capacity`` is accepted for interface compatibility; the hosting
+    process enforces it.
+    """
+
+    def __init__(
+        self,
+        capacity: int = MAX_TOTAL_HOSPITALS,
+        address: Optional[str] = None,
+        authkey: Optional[Union[str, bytes]] = None,
+        pool_size: int = SHARED_STORE_POOL_SIZE,
+    ):
+        authkey = authkey if authkey is not None else get_shared_store_authkey()
+        if isinstance(authkey, str):
+            authkey = bytes.fromhex(authkey)
+        self.address = parse_address(address or get_shared_store_address())
+        self._pool: "queue.Queue[Connection]" = queue.Queue()
+        self._connections = [Client(self.address, authkey=authkey) for _ in range(max(1, pool_size))]
+        for connection in self._connections:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _connection(self) -> Iterator[Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def _call(self, method: str, *args: Any) -> Any:
+        with self._connection() as connection:
+            connection.send((method, args))
+            ok, result = connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def count_hospitals(self) -> int:
+        return self._call("count_hospitals")
+
+    def get_all_hospitals(self) -> List[Hospital]:
+        return self._call("get_all_hospitals")
+
+    def get_all_hospitals_json(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        return self._call("get_all_hospitals_json", fields)
+
+    def get_hospitals_page(self, after_id: int, limit: int) -> List[Hospital]:
+        return self._call("get_hospitals_page", after_id, limit)
+
+    def iter_hospitals(self) -> Iterator[Hospital]:
+        return iter_pages(self.get_hospitals_page, STREAM_CHUNK_SIZE)
+
+    def get_hospital_by_id(self, hospital_id: int) -> Optional[Hospital]:
+        return self._call("get_hospital_by_id", hospital_id)
+
+    def get_hospital_json(self, hospital_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]:
+        return self._call("get_hospital_json", hospital_id, fields)
+
+    def create_hospital(self, hospital: Hospital) -> Hospital:
+        created = self._call("create_hospital", hospital)
+        # Callers rely on the id being assigned to the model they passed in
+        hospital.id = created.id
+        return created
+
+    def create_hospitals(self, hospitals: List[Hospital]) -> List[Hospital]:
+        created = self._call("create_hospitals", hospitals)
+        for hospital, stored in zip(hospitals, created):
+            hospital.id = stored.id
+        return created
+
+    def find_or_create_hospitals(self, hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]:
+        results = self._call("find_or_create_hospitals", hospitals)
+        for hospital, (stored, created) in zip(hospitals, results):
+            if created:
+                hospital.id = stored.id
+        return results
+
+    def update_hospital(self, hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]:
+        return self._call("update_hospital", hospital_id, updated_hospital)
+
+    def update_hospital_fields(self, hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]:
+        return self._call("update_hospital_fields", hospital_id, fields)
+
+    def delete_hospital(self, hospital_id: int) -> bool:
+        return self._call("delete_hospital", hospital_id)
+
+    def get_hospitals_by_batch_id(self, batch_id: UUID) -> List[Hospital]:
+        return self._call("get_hospitals_by_batch_id", batch_id)
+
+    def get_batch_size(self, batch_id: UUID) -> int:
+        return self._call("get_batch_size", batch_id)
+
+    def get_batch_summary(self, batch_id: UUID) -> Optional[BatchSummary]:
+        return self._call("get_batch_summary", batch_id)
+
+    def delete_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        return self._call("delete_hospitals_by_batch_id", batch_id)
+
+    def activate_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        return self._call("activate_hospitals_by_batch_id", batch_id)
+
+    def find_duplicate(self, name: str, address: str, phone: Optional[str]) -> Optional[Hospital]:
+        return self._call("find_duplicate", name, address, phone)
+
+    def search_hospitals(self, query: str, limit: int) -> List[Hospital]:
+        return self._call("search_hospitals", query, limit)
+
+    def get_version(self, batch_id: Optional[UUID] = None) -> Optional[str]:
+        return self._call("get_version", batch_id)
+
+    def get_stats(self) -> StoreStats:
+        return self._call("get_stats")
+
+    def clear(self) -> None:
+        self._call("clear")
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.close()
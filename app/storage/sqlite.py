@@ -0,0 +1,492 @@
+"""Durable SQLite storage backend running in WAL mode."""
+
+import heapq
+import queue
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from app.config import (
+    MAX_TOTAL_HOSPITALS,
+    SQLITE_POOL_SIZE,
+    STREAM_CHUNK_SIZE,
+    get_eviction_policy,
+    get_sqlite_path,
+)
+from app.models import BatchSummary, Hospital, StoreStats
+from app.serialization import encode_hospital, encode_hospitals
+from .base import iter_pages, with_fields
+from .search import dedup_key, rank_match, search_terms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hospitals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    address TEXT NOT NULL,
+    phone TEXT,
+    creation_batch_id TEXT,
+    active INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    dedup_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hospitals_batch ON hospitals (creation_batch_id);
+CREATE TABLE IF NOT EXISTS hospital_count (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO hospital_count (id, value) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS hospitals_count_insert AFTER INSERT ON hospitals
+BEGIN
+    UPDATE hospital_count SET value = value + 1 WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS hospitals_count_delete AFTER DELETE ON hospitals
+BEGIN
+    UPDATE hospital_count SET value = value - 1 WHERE id = 0;
+END;
+"""
+
+# Trigram full-text index (SQLite 3.34+) kept in step with the table by triggers
+_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS hospitals_fts USING fts5(
+    name, address, content='hospitals', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS hospitals_fts_insert AFTER INSERT ON hospitals
+BEGIN
+    INSERT INTO hospitals_fts (rowid, name, address) VALUES (new.id, new.name, new.address);
+END;
+CREATE TRIGGER IF NOT EXISTS hospitals_fts_delete AFTER DELETE ON hospitals
+BEGIN
+    INSERT INTO hospitals_fts (hospitals_fts, rowid, name, address)
+    VALUES ('delete', old.id, old.name, old.address);
+END;
+CREATE TRIGGER IF NOT EXISTS hospitals_fts_update AFTER UPDATE OF name, address ON hospitals
+BEGIN
+    INSERT INTO hospitals_fts (hospitals_fts, rowid, name, address)
+    VALUES ('delete', old.id, old.name, old.address);
+    INSERT INTO hospitals_fts (rowid, name, address) VALUES (new.id, new.name, new.address);
+END;
+"""
+
+# Change counters for conditional GETs: scope '' counts every change to the
+# table, and each batch's row holds the global count at its latest change, so
+# a deleted and re-created batch never repeats a version. '#epoch' tells
+# databases apart should a file be replaced.
+_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    scope TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO versions (scope, value) VALUES ('', 0), ('#epoch', abs(random()));
+CREATE TRIGGER IF NOT EXISTS hospitals_version_insert AFTER INSERT ON hospitals
+BEGIN
+    UPDATE versions SET value = value + 1 WHERE scope = '';
+    INSERT OR REPLACE INTO versions (scope, value)
+    SELECT new.creation_batch_id, value FROM versions WHERE scope = '' AND new.creation_batch_id IS NOT NULL;
+END;
+CREATE TRIGGER IF NOT EXISTS hospitals_version_update AFTER UPDATE ON hospitals
+BEGIN
+    UPDATE versions SET value = value + 1 WHERE scope = '';
+    INSERT OR REPLACE INTO versions (scope, value)
+    SELECT batch_id, (SELECT value FROM versions WHERE scope = '')
+    FROM (SELECT old.creation_batch_id AS batch_id UNION SELECT new.creation_batch_id)
+    WHERE batch_id IS NOT NULL
+        AND EXISTS (SELECT 1 FROM hospitals WHERE creation_batch_id = batch_id);
+    DELETE FROM versions WHERE scope = old.creation_batch_id
+        AND NOT EXISTS (SELECT 1 FROM hospitals WHERE creation_batch_id = old.creation_batch_id);
+END;
+CREATE TRIGGER IF NOT EXISTS hospitals_version_delete AFTER DELETE ON hospitals
+BEGIN
+    UPDATE versions SET value = value + 1 WHERE scope = '';
+    INSERT OR REPLACE INTO versions (scope, value)
+    SELECT old.creation_batch_id, value FROM versions WHERE scope = ''
+        AND EXISTS (SELECT 1 FROM hospitals WHERE creation_batch_id = old.creation_batch_id);
+    DELETE FROM versions WHERE scope = old.creation_batch_id
+        AND NOT EXISTS (SELECT 1 FROM hospitals WHERE creation_batch_id = old.creation_batch_id);
+END;
+"""
+
+_COLUMNS = "id, name, address, phone, creation_batch_id, active, created_at"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM hospitals ORDER BY id"
+_SELECT_PAGE = f"SELECT {_COLUMNS} FROM hospitals WHERE id > ? ORDER BY id LIMIT ?"
+_SELECT_BY_ID = f"SELECT {_COLUMNS} FROM hospitals WHERE id = ?"
+_SELECT_BY_BATCH = f"SELECT {_COLUMNS} FROM hospitals WHERE creation_batch_id = ? ORDER BY id"
+_SELECT_DUPLICATE = f"SELECT {_COLUMNS} FROM hospitals WHERE dedup_key = ? ORDER BY id LIMIT 1"
+_INSERT = (
+    "INSERT INTO hospitals (name, address, phone, creation_batch_id, active, created_at, dedup_key) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE = (
+    "UPDATE hospitals SET name = ?, address = ?, phone = ?, creation_batch_id = ?, "
+    "active = ?, created_at = ?, dedup_key = ? WHERE id = ?"
+)
+# Victim order per eviction policy; rows from the current insert (ids from the
+# first new one up) are never evicted
+_EVICTION_ORDER = {
+    "fifo": "id",
+    "inactive_first": "active, id",
+}
+_EVICT = "DELETE FROM hospitals WHERE id IN (SELECT id FROM hospitals WHERE id < ? ORDER BY {order} LIMIT ?)"
+_SEARCH_FTS = (
+    f"SELECT {_COLUMNS} FROM hospitals "
+    "WHERE id IN (SELECT rowid FROM hospitals_fts WHERE hospitals_fts MATCH ?)"
+)
+_SEARCH_LIKE = (
+    f"SELECT {_COLUMNS} FROM hospitals "
+    "WHERE name LIKE ? ESCAPE '\\' OR address LIKE ? ESCAPE '\\'"
+)
+_BATCH_SUMMARY = (
+    "SELECT COUNT(*), COALESCE(SUM(active), 0), MIN(created_at), MAX(created_at) "
+    "FROM hospitals WHERE creation_batch_id = ?"
+)
+
+
+def _batch_key(batch_id: Optional[UUID]) -> Optional[str]:
+    return str(batch_id) if batch_id is not None else None
+
+
+def _to_row(hospital: Hospital) -> tuple:
+    return (
+        hospital.name,
+        hospital.address,
+        hospital.phone,
+        _batch_key(hospital.creation_batch_id),
+        int(hospital.active),
+        # Fixed-width timestamps keep MIN/MAX on the text column chronological
+        hospital.created_at.isoformat(timespec="microseconds"),
+        dedup_key(hospital.name, hospital.address, hospital.phone),
+    )
+
+
+def _to_fields(row: tuple) -> dict:
+    hospital_id, name, address, phone, batch_id, active, created_at = row
+    return {
+        "id": hospital_id,
+        "name": name,
+        "address": address,
+        "phone": phone,
+        "creation_batch_id": UUID(batch_id) if batch_id is not None else None,
+        "active": bool(active),
+        "created_at": datetime.fromisoformat(created_at),
+    }
+
+
+def _to_model(row: tuple) -> Hospital:
+    return Hospital.model_construct(**_to_fields(row))
+
+
+def _to_projection(row: tuple, fields: Tuple[str, ...]) -> dict:
+    values = _to_fields(row)
+    return {name: values[name] for name in fields}
+
+
+def _to_json(row: tuple, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    return encode_hospital(_to_fields(row) if fields is None else _to_projection(row, fields))
+
+
+class SqliteBackend:
+    """Storage backend persisting hospitals to an SQLite database in WAL mode.
+
+    Connections come from a small fixed pool so the backend can be shared by
+    FastAPI's threadpool. Writes run in ``BEGIN IMMEDIATE`` transactions, which
+    serialize writers while WAL lets readers proceed concurrently. SQL text is
+    constant, so each connection's statement cache reuses prepared statements.
+
+    Search uses an FTS5 trigram index when the SQLite build has one, and a
+    table scan otherwise or for queries made only of one- or two-character
+    words. Matches are ranked in Python exactly like the in-memory index.
+
+    Only the ``fifo`` and ``inactive_first`` eviction policies are supported;
+    ``evictions`` counts rows evicted by this process.
+
+    JSON reads encode rows directly without building models. Nothing is
+    cached, since other worker processes may write the same file.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        capacity: int = MAX_TOTAL_HOSPITALS,
+        path: Optional[str] = None,
+        pool_size: int = SQLITE_POOL_SIZE,
+        eviction_policy: Optional[str] = None,
+    ):
+        self.capacity = capacity
+        self.eviction_policy = (eviction_policy or get_eviction_policy()).lower()
+        if self.eviction_policy not in _EVICTION_ORDER:
+            raise ValueError(
+                f"Eviction policy '{self.eviction_policy}' is not supported by the sqlite backend, "
+                f"expected one of: {', '.join(sorted(_EVICTION_ORDER))}"
+            )
+        self._evict_sql = _EVICT.format(order=_EVICTION_ORDER[self.eviction_policy])
+        self.evictions = 0
+        self.path = path or get_sqlite_path()
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections = [self._connect() for _ in range(max(1, pool_size))]
+        self._connections[0].executescript(_SCHEMA)
+        self._add_dedup_index(self._connections[0])
+        self._fts = self._create_search_index(self._connections[0])
+        self._create_versions(self._connections[0])
+        for connection in self._connections:
+            self._pool.put(connection)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=64,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    @staticmethod
+    def _add_dedup_index(connection: sqlite3.Connection) -> None:
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(hospitals)")}
+        if "dedup_key" not in columns:
+            # Databases created before duplicate detection: add and backfill the key
+            connection.execute("ALTER TABLE hospitals ADD COLUMN dedup_key TEXT")
+            rows = connection.execute("SELECT id, name, address, phone FROM hospitals").fetchall()
+            connection.executemany(
+                "UPDATE hospitals SET dedup_key = ? WHERE id = ?",
+                [(dedup_key(name, address, phone), hospital_id) for hospital_id, name, address, phone in rows],
+            )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_hospitals_dedup ON hospitals (dedup_key)")
+
+    @staticmethod
+    def _create_search_index(connection: sqlite3.Connection) -> bool:
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'hospitals_fts'"
+        ).fetchone()
+        try:
+            connection.executescript(_SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False  # No FTS5 or no trigram tokenizer in this SQLite build
+        if not exists:
+            # Index rows written before the search index existed
+            connection.execute("INSERT INTO hospitals_fts (hospitals_fts) VALUES ('rebuild')")
+        return True
+
+    @staticmethod
+    def _create_versions(connection: sqlite3.Connection) -> None:
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'versions'"
+        ).fetchone()
+        connection.executescript(_VERSION_SCHEMA)
+        if not exists:
+            # Give batches written before versioning existed a version of their own
+            connection.execute(
+                "INSERT OR IGNORE INTO versions (scope, value) "
+                "SELECT DISTINCT creation_batch_id, 0 FROM hospitals WHERE creation_batch_id IS NOT NULL"
+            )
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _evict_overflow(self, connection: sqlite3.Connection, first_new_id: int) -> None:
+        (count,) = connection.execute("SELECT value FROM hospital_count WHERE id = 0").fetchone()
+        if count > self.capacity:
+            cursor = connection.execute(self._evict_sql, (first_new_id, count - self.capacity))
+            self.evictions += cursor.rowcount
+
+    def count_hospitals(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("SELECT value FROM hospital_count WHERE id = 0").fetchone()[0]
+
+    def get_all_hospitals(self) -> List[Hospital]:
+        with self._connection() as connection:
+            return [_to_model(row) for row in connection.execute(_SELECT_ALL)]
+
+    def get_all_hospitals_json(self, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        with self._connection() as connection:
+            rows = connection.execute(_SELECT_ALL)
+            return encode_hospitals([
+                _to_fields(row) if fields is None else _to_projection(row, fields) for row in rows
+            ])
+
+    def get_hospitals_page(self, after_id: int, limit: int) -> List[Hospital]:
+        with self._connection() as connection:
+            return [_to_model(row) for row in connection.execute(_SELECT_PAGE, (after_id, limit))]
+
+    def iter_hospitals(self) -> Iterator[Hospital]:
+        # Page by id instead of holding a pooled connection for the whole stream
+        return iter_pages(self.get_hospitals_page, STREAM_CHUNK_SIZE)
+
+    def get_hospitals_by_batch_id(self, batch_id: UUID) -> List[Hospital]:
+        with self._connection() as connection:
+            rows = connection.execute(_SELECT_BY_BATCH, (_batch_key(batch_id),))
+            return [_to_model(row) for row in rows]
+
+    def get_batch_size(self, batch_id: UUID) -> int:
+        with self._connection() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM hospitals WHERE creation_batch_id = ?", (_batch_key(batch_id),)
+            ).fetchone()[0]
+
+    def get_batch_summary(self, batch_id: UUID) -> Optional[BatchSummary]:
+        with self._connection() as connection:
+            count, active, first, last = connection.execute(
+                _BATCH_SUMMARY, (_batch_key(batch_id),)
+            ).fetchone()
+        if count == 0:
+            return None
+        return BatchSummary(
+            batch_id=batch_id,
+            hospital_count=count,
+            active_count=active,
+            first_created_at=datetime.fromisoformat(first),
+            last_created_at=datetime.fromisoformat(last),
+        )
+
+    def find_duplicate(self, name: str, address: str, phone: Optional[str]) -> Optional[Hospital]:
+        with self._connection() as connection:
+            row = connection.execute(_SELECT_DUPLICATE, (dedup_key(name, address, phone),)).fetchone()
+        return _to_model(row) if row is not None else None
+
+    def search_hospitals(self, query: str, limit: int) -> List[Hospital]:
+        terms = search_terms(query)
+        if not terms or limit <= 0:
+            return []
+        long_terms = [term for term in terms if len(term) >= 3]
+        if self._fts and long_terms:
+            sql, params = _SEARCH_FTS, (" ".join(f'"{term}"' for term in long_terms),)
+        else:
+            # Terms are word characters, so "_" is the only LIKE wildcard to escape
+            pattern = "%" + terms[0].replace("_", "\\_") + "%"
+            sql, params = _SEARCH_LIKE, (pattern, pattern)
+        with self._connection() as connection:
+            rows = connection.execute(sql, params).fetchall()
+        ranked = []
+        for row in rows:
+            rank = rank_match(terms, row[1], row[2])
+            if rank is not None:
+                ranked.append((rank, row[0], row))
+        return [_to_model(row) for _, _, row in heapq.nsmallest(limit, ranked)]
+
+    def get_stats(self) -> StoreStats:
+        return StoreStats(
+            backend=self.name,
+            hospital_count=self.count_hospitals(),
+            capacity=self.capacity,
+            eviction_policy=self.eviction_policy,
+            evictions=self.evictions,
+        )
+
+    def get_hospital_by_id(self, hospital_id: int) -> Optional[Hospital]:
+        with self._connection() as connection:
+            row = connection.execute(_SELECT_BY_ID, (hospital_id,)).fetchone()
+        return _to_model(row) if row is not None else None
+
+    def get_hospital_json(self, hospital_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]:
+        with self._connection() as connection:
+            row = connection.execute(_SELECT_BY_ID, (hospital_id,)).fetchone()
+        return _to_json(row, fields) if row is not None else None
+
+    def create_hospital(self, hospital: Hospital) -> Hospital:
+        with self._transaction() as connection:
+            cursor = connection.execute(_INSERT, _to_row(hospital))
+            hospital.id = cursor.lastrowid
+            self._evict_overflow(connection, hospital.id)
+        return hospital
+
+    def create_hospitals(self, hospitals: List[Hospital]) -> List[Hospital]:
+        with self._transaction() as connection:
+            for hospital in hospitals:
+                hospital.id = connection.execute(_INSERT, _to_row(hospital)).lastrowid
+            if hospitals:
+                self._evict_overflow(connection, hospitals[0].id)
+        return hospitals
+
+    def find_or_create_hospitals(self, hospitals: List[Hospital]) -> List[Tuple[Hospital, bool]]:
+        # One write transaction: a duplicate cannot be inserted between the
+        # lookup and the insert, and later repeats find the row just inserted
+        results = []
+        first_new_id = None
+        with self._transaction() as connection:
+            for hospital in hospitals:
+                key = dedup_key(hospital.name, hospital.address, hospital.phone)
+                row = connection.execute(_SELECT_DUPLICATE, (key,)).fetchone()
+                if row is not None:
+                    results.append((_to_model(row), False))
+                    continue
+                hospital.id = connection.execute(_INSERT, _to_row(hospital)).lastrowid
+                if first_new_id is None:
+                    first_new_id = hospital.id
+                results.append((hospital, True))
+            if first_new_id is not None:
+                self._evict_overflow(connection, first_new_id)
+        return results
+
+    def update_hospital(self, hospital_id: int, updated_hospital: Hospital) -> Optional[Hospital]:
+        with self._transaction() as connection:
+            cursor = connection.execute(_UPDATE, _to_row(updated_hospital) + (hospital_id,))
+        return updated_hospital if cursor.rowcount else None
+
+    def update_hospital_fields(self, hospital_id: int, fields: Dict[str, Any]) -> Optional[Hospital]:
+        # BEGIN IMMEDIATE takes the write lock before the read, so no write lands in between
+        with self._transaction() as connection:
+            row = connection.execute(_SELECT_BY_ID, (hospital_id,)).fetchone()
+            if row is None:
+                return None
+            updated = with_fields(_to_model(row), fields)
+            connection.execute(_UPDATE, _to_row(updated) + (hospital_id,))
+        return updated
+
+    def delete_hospital(self, hospital_id: int) -> bool:
+        with self._transaction() as connection:
+            cursor = connection.execute("DELETE FROM hospitals WHERE id = ?", (hospital_id,))
+        return cursor.rowcount > 0
+
+    def delete_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM hospitals WHERE creation_batch_id = ?", (_batch_key(batch_id),)
+            )
+        return cursor.rowcount
+
+    def activate_hospitals_by_batch_id(self, batch_id: UUID) -> int:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE hospitals SET active = 1 WHERE creation_batch_id = ? AND active = 0",
+                (_batch_key(batch_id),),
+            )
+        return cursor.rowcount
+
+    def get_version(self, batch_id: Optional[UUID] = None) -> Optional[str]:
+        scope = _batch_key(batch_id) if batch_id is not None else ""
+        with self._connection() as connection:
+            rows = dict(connection.execute(
+                "SELECT scope, value FROM versions WHERE scope IN ('#epoch', ?)", (scope,)
+            ))
+        if scope not in rows:
+            return None
+        return f"{rows['#epoch']:x}.{rows[scope]}"
+
+    def clear(self) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM hospitals")
+            connection.execute("DELETE FROM sqlite_sequence WHERE name = 'hospitals'")
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.close()
@@ -0,0 +1,113 @@
+"""Bounded work queue in front of the create workers, with load shedding.
+
+Creates spend seconds in the slow task, so when they arrive faster than the
+workers drain them a queue builds up. Past ``max_depth`` waiting tasks the
+queue refuses new work at once with :class:`QueueFull`, whose
+``retry_after`` is how long the current backlog takes to drain.
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable
+
+from app.models import QueueStats
+
+# Weight of the newest sample in the moving averages of wait and service time
+SMOOTHING = 0.2
+
+
+class QueueFull(Exception):
+    """The work queue is at ``max_depth``; try again after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Work queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class WorkQueue(Executor):
+    """Thread pool with a bounded number of tasks waiting for a worker.
+
+    ``expected_seconds`` seeds the service time estimate until tasks have
+    run; after that the drain rate follows a moving average of how long
+    tasks actually take.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_depth: int,
+        expected_seconds: float,
+        thread_name_prefix: str = "",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.workers = workers
+        self.max_depth = max_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._service_seconds = expected_seconds
+        self._wait_seconds = 0.0
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._lock:
+            self._check_room()
+            self._queued += 1
+        try:
+            return self._executor.submit(self._run, self._clock(), fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def admit(self) -> None:
+        """Raise ``QueueFull`` now if a task submitted at this moment would be refused."""
+        with self._lock:
+            self._check_room()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> QueueStats:
+        with self._lock:
+            return QueueStats(
+                workers=self.workers,
+                max_depth=self.max_depth,
+                running=self._running,
+                queued=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                drain_rate=self.workers / self._service_seconds if self._service_seconds else None,
+                wait_seconds=self._wait_seconds,
+                estimated_wait_seconds=self._drain_seconds(self._queued),
+            )
+
+    def _check_room(self) -> None:
+        # Tasks still on their way to an idle worker count as queued too
+        if self._queued + self._running >= self.workers + self.max_depth:
+            self._rejected += 1
+            raise QueueFull(max(1, math.ceil(self._drain_seconds(self._queued))))
+
+    def _drain_seconds(self, tasks: int) -> float:
+        # Every worker finishes one task per service time
+        return tasks * self._service_seconds / self.workers
+
+    def _run(self, submitted: float, fn, args, kwargs):
+        started = self._clock()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_seconds += SMOOTHING * (started - submitted - self._wait_seconds)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            finished = self._clock()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._service_seconds += SMOOTHING * (finished - started - self._service_seconds)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Side-by-side benchmark of the storage backends.
+
+Runs the same workload (create, get, update, batch summary, activation,
+batch deletion and a full listing) against each backend and reports the
+mean latency per operation.
+
+Usage:
+    python scripts/bench_backends.py [--backends memory sqlite] [--records 10000]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models import Hospital  # noqa: E402
+from app.storage import (  # noqa: E402
+    BACKENDS,
+    JournaledBackend,
+    MemoryBackend,
+    SharedBackend,
+    SqliteBackend,
+    StoreServer,
+)
+
+BATCH_SIZE = 20
+
+
+@contextmanager
+def open_backend(name, capacity, workdir):
+    server = None
+    if name == "sqlite":
+        backend = SqliteBackend(capacity=capacity, path=str(Path(workdir) / "bench.db"))
+    elif name == "shared":
+        # Host the store in this process, as the supervisor does for its workers
+        server = StoreServer(MemoryBackend(capacity=capacity), address=str(Path(workdir) / "store.sock")).start()
+        backend = SharedBackend(capacity=capacity, address=server.address, authkey=server.authkey)
+    elif name == "journal":
+        # Never ./journal, which would replay a previous run's log into this one
+        backend = JournaledBackend(capacity=capacity, directory=str(Path(workdir) / "journal"))
+    else:
+        backend = BACKENDS[name](capacity=capacity)
+    try:
+        yield backend
+    finally:
+        backend.close()
+        if server is not None:
+            server.stop()
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / max(1, len(items)) * 1e6
+
+
+def bench(backend, records, ops):
+    rng = random.Random(records)
+    batches = [uuid.uuid4() for _ in range(records // BATCH_SIZE)]
+
+    def create(i):
+        batch_id = batches[i // BATCH_SIZE] if i // BATCH_SIZE < len(batches) else None
+        backend.create_hospital(
+            Hospital(id=0, name=f"Hospital {i}", address=f"{i} Main St", phone="555-0000",
+                     creation_batch_id=batch_id, active=False)
+        )
+
+    results = {"create": timed(create, range(records))}
+    ids = [rng.randint(1, records) for _ in range(ops)]
+    sample_batches = rng.sample(batches, min(ops, len(batches)))
+
+    def update(hospital_id):
+        hospital = backend.get_hospital_by_id(hospital_id)
+        if hospital is not None:
+            hospital.name += " (updated)"
+            backend.update_hospital(hospital_id, hospital)
+
+    results["get"] = timed(backend.get_hospital_by_id, ids)
+    results["update"] = timed(update, ids)
+    results["summary"] = timed(backend.get_batch_summary, sample_batches)
+    results["activate"] = timed(backend.activate_hospitals_by_batch_id, sample_batches)
+    results["del batch"] = timed(backend.delete_hospitals_by_batch_id, sample_batches)
+    results["list all"] = timed(lambda _: backend.get_all_hospitals(), range(3))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--ops", type=int, default=500, help="Operations per measurement")
+    args = parser.parse_args()
+
+    rows = []
+    for name in args.backends:
+        with tempfile.TemporaryDirectory() as workdir, open_backend(name, args.records, workdir) as backend:
+            rows.append((name, bench(backend, args.records, args.ops)))
+
+    columns = list(rows[0][1])
+    print(f"mean latency in microseconds, {args.records} records")
+    print(f"{'backend':>10} " + " ".join(f"{c:>10}" for c in columns))
+    for name, results in rows:
+        print(f"{name:>10} " + " ".join(f"{results[c]:>10.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
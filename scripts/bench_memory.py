@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for stored hospitals.
+
+Reports bytes per hospital for the previous ``deque`` of Pydantic models and
+for the compact ``HospitalStore`` records, measured with tracemalloc, plus
+what the search index adds once a store has been searched and how much of
+that the store's own estimate (``HospitalStore.bytes``) accounts for.
+
+Usage:
+    python scripts/bench_memory.py [--sizes 10000 1000000]
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import uuid
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.storage.memory import HospitalRecord, HospitalStore  # noqa: E402
+from app.models import Hospital  # noqa: E402
+
+BATCH_SIZE = 20
+
+
+def make_hospital(i, batch_id):
+    # Strings are rebuilt per row, as they would be when parsed from requests
+    return Hospital(
+        id=i,
+        name=f"Hospital {i % 500}",
+        address=f"{i} Main St",
+        phone="555-%04d" % (i % 10000),
+        creation_batch_id=uuid.UUID(str(batch_id)),
+        active=False,
+    )
+
+
+def measure(size, build):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    store = build(size)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    estimated = getattr(store, "bytes", 0)
+    del store
+    gc.collect()
+    return used / size, estimated / size
+
+
+def build_deque(size):
+    store = deque(maxlen=size)
+    batch_id = uuid.uuid4()
+    for i in range(1, size + 1):
+        if i % BATCH_SIZE == 0:
+            batch_id = uuid.uuid4()
+        store.append(make_hospital(i, batch_id))
+    return store
+
+
+def build_records(size):
+    store = HospitalStore(maxlen=size)
+    batch_id = uuid.uuid4()
+    for i in range(1, size + 1):
+        if i % BATCH_SIZE == 0:
+            batch_id = uuid.uuid4()
+        store.append(HospitalRecord.from_model(make_hospital(i, batch_id)))
+    return store
+
+
+def build_searched(size):
+    store = build_records(size)
+    store.build_search_index()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(
+        f"{'records':>10} {'deque of models':>18} {'HospitalStore':>15} {'saving':>8} "
+        f"{'+ search index':>16} {'estimated':>15}"
+    )
+    for size in args.sizes:
+        legacy, _ = measure(size, build_deque)
+        compact, _ = measure(size, build_records)
+        searched, estimated = measure(size, build_searched)
+        print(
+            f"{size:>10} {legacy:>12.0f} B/row {compact:>9.0f} B/row {1 - compact / legacy:>7.0%} "
+            f"{searched:>10.0f} B/row {estimated:>9.0f} B/row"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Crash-recovery benchmark for the journaled in-memory store.
+
+Writes N hospitals through ``JournaledBackend`` and measures how long a
+restart takes when recovering from the write-ahead log alone and from a
+snapshot.
+
+Usage:
+    python scripts/bench_recovery.py [--records 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models import Hospital  # noqa: E402
+from app.storage.journal import LOG_FILENAME, SNAPSHOT_FILENAME, JournaledBackend  # noqa: E402
+
+BATCH_SIZE = 20
+
+
+def timed_open(directory, records):
+    start = time.perf_counter()
+    backend = JournaledBackend(capacity=records, directory=directory)
+    elapsed = time.perf_counter() - start
+    assert backend.count_hospitals() == records
+    return backend, elapsed
+
+
+def size_mb(path):
+    return os.path.getsize(path) / 1e6 if os.path.exists(path) else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = JournaledBackend(
+            capacity=args.records, directory=directory, fsync_batch=10_000, snapshot_interval=0
+        )
+        template = Hospital(id=0, name="Hospital", address="1 Main St", phone="555-0000")
+        start = time.perf_counter()
+        batch_id = uuid.uuid4()
+        for i in range(args.records):
+            if i % BATCH_SIZE == 0:
+                batch_id = uuid.uuid4()
+            backend.create_hospital(template.model_copy(update={"creation_batch_id": batch_id}))
+        write_time = time.perf_counter() - start
+        backend.close()
+        log_mb = size_mb(os.path.join(directory, LOG_FILENAME))
+
+        backend, log_recovery = timed_open(directory, args.records)
+        start = time.perf_counter()
+        backend.snapshot()
+        # Writers wait only for the log rotation; the snapshot is written in the background
+        snapshot_pause = time.perf_counter() - start
+        backend.close()
+        snapshot_mb = size_mb(os.path.join(directory, SNAPSHOT_FILENAME))
+
+        backend, snapshot_recovery = timed_open(directory, args.records)
+        backend.close()
+
+    print(f"records:                {args.records}")
+    print(f"journaled writes:       {write_time:.2f} s ({args.records / write_time:,.0f}/s)")
+    print(f"recovery from log:      {log_recovery:.2f} s ({log_mb:.1f} MB)")
+    print(f"snapshot writer pause:  {snapshot_pause * 1000:.1f} ms")
+    print(f"recovery from snapshot: {snapshot_recovery:.2f} s ({snapshot_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark hospital listing and lookup responses: response_model vs cached JSON.
+
+Fills the in-memory backend and times ``GET /hospitals/`` and
+``GET /hospitals/{id}`` through the real app against equivalent routes that
+return models and let FastAPI validate and serialize them through
+``response_model``, which is how these endpoints used to render.
+
+Usage:
+    python scripts/bench_render.py [--rows 10000] [--requests 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["STORAGE_BACKEND"] = "memory"
+
+from fastapi import Request  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Hospital  # noqa: E402
+
+
+@app.get("/bench/hospitals/", response_model=List[Hospital])
+def legacy_list(request: Request):
+    return database.get_all_hospitals()
+
+
+@app.get("/bench/hospitals/{hospital_id}", response_model=Hospital)
+def legacy_get(request: Request, hospital_id: int):
+    return database.get_hospital_by_id(hospital_id)
+
+
+def fill(rows):
+    database.store = database.create_backend("memory", capacity=rows)
+    for i in range(rows):
+        database.create_hospital(
+            Hospital(id=0, name=f"Hospital {i}", address=f"{i} Main St", phone=f"555-{i % 10000:04d}")
+        )
+
+
+def throughput(client, paths, check):
+    start = time.perf_counter()
+    for path in paths:
+        response = client.get(path)
+        check(response)
+    return len(paths) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per single-hospital run")
+    parser.add_argument("--lists", type=int, default=20, help="Requests per full-listing run")
+    args = parser.parse_args()
+
+    app.state.limiter.enabled = False
+    fill(args.rows)
+    rng = random.Random(0)
+    ids = [rng.randint(1, args.rows) for _ in range(args.requests)]
+
+    def ok(response):
+        assert response.status_code == 200, response.text
+
+    with TestClient(app) as client:
+        # Warm the caches so both paths are measured in steady state
+        assert client.get("/hospitals/").json() == client.get("/bench/hospitals/").json()
+        cases = [
+            ("list", "/hospitals/", "/bench/hospitals/", args.lists),
+            ("get", "/hospitals/{}", "/bench/hospitals/{}", args.requests),
+        ]
+        print(f"{args.rows} hospitals, requests/second")
+        print(f"{'endpoint':>10} {'response_model':>15} {'cached JSON':>12} {'speedup':>8}")
+        for name, cached_path, legacy_path, count in cases:
+            targets = ids[:count]
+            legacy = throughput(client, [legacy_path.format(i) for i in targets], ok)
+            cached = throughput(client, [cached_path.format(i) for i in targets], ok)
+            print(f"{name:>10} {legacy:>15.1f} {cached:>12.1f} {cached / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for hospital search with the trigram index.
+
+Builds a ``TrigramIndex`` over synthetic names and addresses and times a mix
+of queries against a full scan, which is what filtering the output of
+``GET /hospitals/`` on the client amounts to.
+
+Usage:
+    python scripts/bench_search.py [--sizes 100000 1000000] [--repeat 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.storage.search import TrigramIndex, rank_match, search_terms  # noqa: E402
+
+PLACES = [
+    "Riverside", "Lakeview", "Hilltop", "Oakwood", "Maplewood", "Harbor", "Summit", "Cedar",
+    "Pinecrest", "Brookside", "Fairview", "Westgate", "Northfield", "Southpoint", "Eastwood",
+]
+KINDS = ["General Hospital", "Medical Center", "Clinic", "Children's Hospital", "Health Center"]
+STREETS = ["Main St", "Oak Ave", "Park Rd", "Elm St", "Washington Blvd", "Lake Dr", "Hill Rd"]
+QUERIES = ["riverside general", "oakwood", "clinic", "hospital 4711", "ce", "harbor elm"]
+
+
+class Row(NamedTuple):
+    name: str
+    address: str
+
+
+def synthetic_rows(size, rng):
+    rows = {}
+    for i in range(1, size + 1):
+        name = f"{rng.choice(PLACES)} {rng.choice(KINDS)} {i}"
+        address = f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+        rows[i] = Row(name, address)
+    return rows
+
+
+def scan(rows, query, limit):
+    terms = search_terms(query)
+    ranked = []
+    for hospital_id, row in rows.items():
+        rank = rank_match(terms, row.name, row.address)
+        if rank is not None:
+            ranked.append((rank, hospital_id))
+    return [hospital_id for _, hospital_id in sorted(ranked)[:limit]]
+
+
+def time_query(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per indexed query")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rows = synthetic_rows(size, random.Random(size))
+        index = TrigramIndex(rows)
+        start = time.perf_counter()
+        for hospital_id, row in rows.items():
+            index.add(hospital_id, row.name, row.address)
+        build = time.perf_counter() - start
+        print(
+            f"\n{size} records, index built in {build:.1f}s ({build / size * 1e6:.1f} us/row), "
+            f"~{index.bytes / size:.0f} B/row"
+        )
+        print(f"{'query':>20} {'index ms':>10} {'scan ms':>10}")
+        for query in QUERIES:
+            indexed = time_query(lambda: index.search(query, args.limit), args.repeat)
+            scanned = time_query(lambda: scan(rows, query, args.limit), 1)
+            print(f"{query:>20} {indexed:>10.2f} {scanned:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for hospital lookups, updates and deletes.
+
+Compares the previous ``deque(maxlen=...)`` storage, which scanned or copied
+the whole deque per operation, with the id-keyed ``HospitalStore``.
+
+Usage:
+    python scripts/bench_store.py [--sizes 10000 1000000] [--ops 200]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.storage.memory import HospitalRecord, HospitalStore  # noqa: E402
+from app.models import Hospital  # noqa: E402
+
+
+class LegacyDequeStore:
+    """The deque-based operations as they were implemented before."""
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self.rows = deque(maxlen=maxlen)
+
+    def append(self, hospital):
+        self.rows.append(hospital)
+
+    def get(self, hospital_id):
+        for hospital in self.rows:
+            if hospital.id == hospital_id:
+                return hospital
+        return None
+
+    def replace(self, hospital_id, updated):
+        hospital_list = list(self.rows)
+        for i, hospital in enumerate(hospital_list):
+            if hospital.id == hospital_id:
+                hospital_list[i] = updated
+                self.rows = deque(hospital_list, maxlen=self.maxlen)
+                return True
+        return False
+
+    def remove(self, hospital_id):
+        filtered = [hospital for hospital in self.rows if hospital.id != hospital_id]
+        self.rows = deque(filtered, maxlen=self.maxlen)
+
+
+def populate(store, size):
+    template = Hospital(id=0, name="Hospital", address="1 Main St", phone="555-0000")
+    for i in range(1, size + 1):
+        hospital = template.model_copy(update={"id": i})
+        store.append(HospitalRecord.from_model(hospital) if isinstance(store, HospitalStore) else hospital)
+
+
+def time_ops(label, fn, ids):
+    start = time.perf_counter()
+    for hospital_id in ids:
+        fn(hospital_id)
+    elapsed = time.perf_counter() - start
+    return label, elapsed / len(ids) * 1e6
+
+
+def bench(size, ops):
+    rng = random.Random(size)
+    ids = [rng.randint(1, size) for _ in range(ops)]
+    results = []
+    for name, factory in (("deque", LegacyDequeStore), ("HospitalStore", HospitalStore)):
+        store = factory(maxlen=size)
+        populate(store, size)
+        results.append((name, [
+            time_ops("get", store.get, ids),
+            time_ops("update", lambda i: store.replace(i, store.get(i)), ids),
+            time_ops("delete", store.remove, ids),
+        ]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=200, help="Operations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'records':>10} {'store':>14} {'get us/op':>12} {'update us/op':>14} {'delete us/op':>14}")
+    for size in args.sizes:
+        for name, timings in bench(size, args.ops):
+            cols = " ".join(f"{us:>{w}.2f}" for (_, us), w in zip(timings, (12, 14, 14)))
+            print(f"{size:>10} {name:>14} {cols}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Load test: GET latency while many slow creates are in flight.
+
+Measures ``GET /hospitals/{id}`` latency on an idle API, then again while
+``--creates`` concurrent ``POST /hospitals/`` requests sit in the slow task.
+Creates run on their own executor (``CREATE_WORKERS``), so the read
+percentiles should stay close to the idle ones.
+
+Runs the app in process by default; pass ``--url`` to load a running server
+instead (its rate limits then apply).
+
+Usage:
+    python scripts/load_test.py [--creates 200] [--reads 500] [--delay 5]
+    python scripts/load_test.py --url http://127.0.0.1:10000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from app import main  # noqa: E402
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def read_latencies(client, hospital_id, reads, concurrency):
+    latencies: List[float] = []
+    queue = asyncio.Queue()
+    for _ in range(reads):
+        queue.put_nowait(None)
+
+    async def reader():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(f"/hospitals/{hospital_id}")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return latencies
+
+
+def report(label, latencies):
+    ms = [latency * 1000 for latency in latencies]
+    print(
+        f"{label:>12} {len(ms):>6} {statistics.median(ms):>9.2f} "
+        f"{percentile(ms, 95):>9.2f} {percentile(ms, 99):>9.2f} {max(ms):>9.2f}"
+    )
+
+
+async def run(args):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+    else:
+        main.app.state.limiter.enabled = False
+        main.SLOW_TASK_DELAY_SECONDS = args.delay
+        transport = httpx.ASGITransport(app=main.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None)
+
+    async with client:
+        response = await client.post("/hospitals/bulk?activate=true", json=[
+            {"name": "Load Test Hospital", "address": "1 Main St"}
+        ])
+        assert response.status_code == 200, response.text
+        hospital_id = response.json()["hospitals"][0]["id"]
+
+        print(f"{args.creates} creates in flight, {args.reads} reads at concurrency {args.concurrency}")
+        print(f"{'phase':>12} {'reads':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        report("idle", await read_latencies(client, hospital_id, args.reads, args.concurrency))
+
+        creates = [
+            asyncio.ensure_future(client.post("/hospitals/", json={"name": f"Load {i}", "address": f"{i} Load St"}))
+            for i in range(args.creates)
+        ]
+        await asyncio.sleep(0.1)  # let the creates reach the slow task
+        start = time.perf_counter()
+        busy = await read_latencies(client, hospital_id, args.reads, args.concurrency)
+        report("creating", busy)
+        if time.perf_counter() - start > args.delay:
+            print("warning: reads outlasted the slow task; raise --delay for a fair comparison")
+
+        responses = await asyncio.gather(*creates)
+        failed = sum(response.status_code != 200 for response in responses)
+        print(f"creates finished, {failed} failed")
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--creates", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent readers")
+    parser.add_argument("--delay", type=float, default=5.0, help="Slow task seconds (in-process only)")
+    parser.add_argument("--url", help="Load a running server instead of the in-process app")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    cli()
@@ -2,12 +2,12 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 import uuid
-from collections import deque
 
 # Import the application
-from app.main import app
+from app.main import app, idempotency_cache, import_store, job_store
 from app import database
 from app.models import Hospital
+from app.storage import MemoryBackend, StoreServer, create_backend
 from app.config import MAX_TOTAL_HOSPITALS
 
 @pytest.fixture
@@ -16,14 +16,28 @@ def client():
     return TestClient(app)
 
 @pytest.fixture(autouse=True)
-def reset_database():
+def reset_database(tmp_path, monkeypatch):
     """Reset the database before each test."""
-    database.hospitals_db = deque(maxlen=MAX_TOTAL_HOSPITALS)
-    database.next_id = 1
+    # Durable backends get a fresh file per test
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "hospitals.db"))
+    monkeypatch.setenv("JOURNAL_DIR", str(tmp_path / "journal"))
+    database.store = create_backend(capacity=MAX_TOTAL_HOSPITALS)
+    idempotency_cache.clear()
+    job_store.clear()
+    import_store.clear()
     yield
     # Cleanup after test
-    database.hospitals_db = deque(maxlen=MAX_TOTAL_HOSPITALS)
-    database.next_id = 1
+    database.store.close()
+
+@pytest.fixture
+def store_server(monkeypatch):
+    """Host a memory backend that "shared" backends in this test connect to."""
+    server = StoreServer(MemoryBackend(capacity=MAX_TOTAL_HOSPITALS)).start()
+    for name, value in server.client_environment().items():
+        if name != "STORAGE_BACKEND":
+            monkeypatch.setenv(name, value)
+    yield server
+    server.stop()
 
 @pytest.fixture
 def mock_slow_task():
@@ -50,16 +64,14 @@ def create_test_hospital():
     """Factory function to create test hospitals."""
     def _create_hospital(name="Test Hospital", address="123 Test St", phone="555-0123", batch_id=None, active=True):
         hospital = Hospital(
-            id=database.next_id,
+            id=0,  # Will be set by create_hospital
             name=name,
             address=address,
             phone=phone,
             creation_batch_id=batch_id,
             active=active
         )
-        database.next_id += 1
-        database.hospitals_db.append(hospital)
-        return hospital
+        return database.create_hospital(hospital)
     return _create_hospital
 
 @pytest.fixture
@@ -72,16 +84,14 @@ def create_test_batch():
         hospitals = []
         for i in range(count):
             hospital = Hospital(
-                id=database.next_id,
+                id=0,  # Will be set by create_hospital
                 name=f"Hospital {i+1}",
                 address=f"{i+1}23 Test St",
                 phone=f"555-{i:04d}",
                 creation_batch_id=batch_id,
                 active=active
             )
-            database.next_id += 1
-            database.hospitals_db.append(hospital)
-            hospitals.append(hospital)
+            hospitals.append(database.create_hospital(hospital))
 
         return hospitals, batch_id
     return _create_batch
@@ -91,7 +101,7 @@ def create_test_hospital_direct():
     """Factory function to create test hospitals directly in database."""
     def _create_hospital_direct(name="Test Hospital", address="123 Test St", phone="555-0123", batch_id=None, active=True):
         hospital = Hospital(
-            id=database.next_id,
+            id=0,  # Will be set by create_hospital
             name=name,
             address=address,
             phone=phone,
@@ -105,5 +115,24 @@ def create_test_hospital_direct():
 @pytest.fixture
 def bypass_rate_limit():
     """Bypass rate limiting for testing."""
-    with patch('slowapi.Limiter.limit', lambda self, rate: lambda func: func):
-        yield
\ No newline at end of file
+    # Routes are decorated at import time, so also switch the live limiter off
+    app.state.limiter.enabled = False
+    try:
+        with patch('slowapi.Limiter.limit', lambda self, rate: lambda func: func):
+            yield
+    finally:
+        app.state.limiter.enabled = True
+
+class FakeClock:
+    """Stands in for ``time.monotonic``; tests move ``now`` by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    """A clock that only moves when a test sets ``clock.now``."""
+    return FakeClock()
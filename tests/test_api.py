@@ -1,4 +1,11 @@
+import json
+import uuid
+
 from fastapi import status
+from unittest.mock import patch
+from app import database, main
+from app.work_queue import QueueFull
+from app.pagination import encode_cursor
 
 
 class TestHealthCheck:
@@ -11,6 +18,22 @@ class TestHealthCheck:
         assert response.json() == {"status": "OK"}
 
 
+class TestStoreStats:
+    """Test the store statistics endpoint."""
+
+    def test_stats(self, client, create_test_hospital):
+        """Test that stats report size, capacity and evictions."""
+        create_test_hospital()
+        response = client.get("/stats")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["hospital_count"] == 1
+        assert data["evictions"] == 0
+        assert data["eviction_policy"] == "fifo"
+        assert data["capacity"] > 0
+
+
 class TestHospitalCRUD:
     """Test hospital CRUD operations via API."""
 
@@ -118,6 +141,17 @@ class TestHospitalCRUD:
         assert data["phone"] == "555-9999"
         assert data["address"] == "Original Address"  # Should remain unchanged
 
+    def test_update_rejects_null_required_fields(self, client, create_test_hospital):
+        """Test that null name or address is rejected and leaves the hospital unchanged."""
+        hospital = create_test_hospital("Original Name", "Original Address")
+        client.get("/hospitals/search?q=original")  # Build the search index first
+
+        for field in ("name", "address"):
+            response = client.put(f"/hospitals/{hospital.id}", json={field: None})
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get(f"/hospitals/{hospital.id}").json()["name"] == "Original Name"
+        assert client.get("/hospitals/search?q=original").status_code == status.HTTP_200_OK
+
     def test_update_hospital_not_found(self, client):
         """Test updating non-existent hospital."""
         update_data = {"name": "New Name"}
@@ -146,6 +180,362 @@ class TestHospitalCRUD:
 
 
 
+class TestPagination:
+    """Test keyset pagination of the hospital listing."""
+
+    def _walk(self, client, **params):
+        ids, pages = [], 0
+        while True:
+            response = client.get("/hospitals/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            ids += [h["id"] for h in response.json()]
+            pages += 1
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                return ids, pages
+            params = {"limit": params["limit"], "cursor": cursor}
+
+    def test_walk_all_pages(self, client, bypass_rate_limit, create_test_hospital):
+        """Test that following cursors returns every hospital once."""
+        for i in range(7):
+            create_test_hospital(name=f"H{i}")
+
+        ids, pages = self._walk(client, limit=3)
+        assert ids == list(range(1, 8))
+        assert pages == 3
+
+    def test_after_id(self, client, create_test_hospital):
+        """Test starting a page after a known id."""
+        for i in range(5):
+            create_test_hospital(name=f"H{i}")
+
+        response = client.get("/hospitals/", params={"after_id": 3, "limit": 10})
+        assert [h["id"] for h in response.json()] == [4, 5]
+        assert "x-next-cursor" not in response.headers
+
+    def test_cursor_survives_inserts_and_eviction(self, client, create_test_hospital):
+        """Test that a cursor keeps its place while rows come and go."""
+        for i in range(4):
+            create_test_hospital(name=f"H{i}")
+        response = client.get("/hospitals/", params={"limit": 2})
+        cursor = response.headers["x-next-cursor"]
+
+        database.delete_hospital(1)
+        create_test_hospital(name="Late")
+
+        response = client.get("/hospitals/", params={"limit": 2, "cursor": cursor})
+        assert [h["id"] for h in response.json()] == [3, 4]
+
+    def test_invalid_cursor(self, client):
+        """Test that a tampered cursor is rejected."""
+        response = client.get("/hospitals/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cursor_and_after_id_conflict(self, client):
+        """Test that only one way of giving the position is accepted."""
+        response = client.get("/hospitals/", params={"cursor": encode_cursor(1), "after_id": 1})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_limit_bounds(self, client):
+        """Test that page sizes outside the allowed range are rejected."""
+        assert client.get("/hospitals/", params={"limit": 0}).status_code == 422
+        assert client.get("/hospitals/", params={"limit": 100000}).status_code == 422
+
+
+class TestNdjsonStreaming:
+    """Test the newline-delimited JSON listing mode."""
+
+    NDJSON = {"Accept": "application/x-ndjson"}
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_full_listing(self, client, create_test_hospital):
+        """Test that every hospital is streamed as one JSON object per line."""
+        for i in range(3):
+            create_test_hospital(name=f"H{i}")
+
+        response = client.get("/hospitals/", headers=self.NDJSON)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.text.endswith("\n")
+        assert self._lines(response) == client.get("/hospitals/").json()
+
+    def test_empty_listing(self, client):
+        """Test that an empty store streams an empty body."""
+        response = client.get("/hospitals/", headers=self.NDJSON)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == ""
+
+    def test_chunked_across_writes(self, client, monkeypatch, create_test_hospital):
+        """Test that lines are intact when the stream spans several chunks."""
+        monkeypatch.setattr("app.responses.STREAM_CHUNK_SIZE", 2)
+        for i in range(5):
+            create_test_hospital(name=f"H{i}")
+
+        response = client.get("/hospitals/", headers=self.NDJSON)
+        assert [h["id"] for h in self._lines(response)] == [1, 2, 3, 4, 5]
+
+    def test_page_keeps_cursor(self, client, create_test_hospital):
+        """Test that a streamed page still carries the next cursor."""
+        for i in range(3):
+            create_test_hospital(name=f"H{i}")
+
+        response = client.get("/hospitals/", params={"limit": 2}, headers=self.NDJSON)
+        assert [h["id"] for h in self._lines(response)] == [1, 2]
+        assert response.headers["x-next-cursor"] == encode_cursor(2)
+
+    def test_batch_listing(self, client, create_test_batch):
+        """Test that batch listings stream too, and still 404 when empty."""
+        _, batch_id = create_test_batch(count=3)
+
+        response = client.get(f"/hospitals/batch/{batch_id}", headers=self.NDJSON)
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(self._lines(response)) == 3
+
+        missing = client.get(f"/hospitals/batch/{uuid.uuid4()}", headers=self.NDJSON)
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestConditionalGet:
+    """Test ETags and If-None-Match on the polled listings."""
+
+    def test_full_listing_not_modified(self, client, create_test_hospital):
+        """Test that an unchanged store answers 304 with no body."""
+        create_test_hospital()
+        first = client.get("/hospitals/")
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = client.get("/hospitals/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_writes_change_the_tag(self, client, create_test_hospital):
+        """Test that any write, including a delete, invalidates the tag."""
+        create_test_hospital()
+        etag = client.get("/hospitals/").headers["etag"]
+        database.delete_hospital(1)
+
+        response = client.get("/hospitals/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+        assert response.headers["etag"] != etag
+
+    def test_tag_per_representation(self, client, create_test_hospital):
+        """Test that JSON and NDJSON never share a tag."""
+        create_test_hospital()
+        etag = client.get("/hospitals/").headers["etag"]
+
+        response = client.get(
+            "/hospitals/", headers={"If-None-Match": etag, "Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert "Accept" in [value.strip() for value in response.headers["vary"].split(",")]
+
+    def test_tag_list_and_wildcard(self, client):
+        """Test matching within a list of tags, weakly, and the * wildcard."""
+        etag = client.get("/hospitals/").headers["etag"]
+        strong = etag[2:]
+        for header in (f'"other", {strong}', "*"):
+            response = client.get("/hospitals/", headers={"If-None-Match": header})
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_page_not_modified(self, client, create_test_hospital):
+        """Test that pages carry a tag too."""
+        create_test_hospital()
+        etag = client.get("/hospitals/", params={"limit": 1}).headers["etag"]
+        response = client.get("/hospitals/", params={"limit": 1}, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_batch_not_modified(self, client, create_test_batch, create_test_hospital):
+        """Test that a batch tag only changes when that batch does."""
+        _, batch_id = create_test_batch(count=2)
+        url = f"/hospitals/batch/{batch_id}"
+        etag = client.get(url).headers["etag"]
+
+        create_test_hospital(name="Elsewhere")
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        database.activate_hospitals_by_batch_id(batch_id)
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert all(h["active"] for h in response.json())
+
+    def test_deleted_batch_is_not_found(self, client, create_test_batch):
+        """Test that a stale tag for a deleted batch gets a 404, not a 304."""
+        _, batch_id = create_test_batch(count=2)
+        url = f"/hospitals/batch/{batch_id}"
+        etag = client.get(url).headers["etag"]
+        database.delete_hospitals_by_batch_id(batch_id)
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestSparseFieldsets:
+    """Test the ``fields`` projection on listings and lookups."""
+
+    def test_full_listing(self, client, create_test_hospital):
+        """Test that listed hospitals carry only the requested fields."""
+        create_test_hospital(name="A")
+        response = client.get("/hospitals/", params={"fields": "id,name,active"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{"id": 1, "name": "A", "active": True}]
+
+    def test_page_and_stream(self, client, create_test_hospital):
+        """Test that pages and NDJSON streams are projected too."""
+        for i in range(2):
+            create_test_hospital(name=f"H{i}")
+        page = client.get("/hospitals/", params={"fields": "name", "limit": 1})
+        assert page.json() == [{"name": "H0"}]
+        assert "x-next-cursor" in page.headers
+
+        streamed = client.get(
+            "/hospitals/", params={"fields": "id"}, headers={"Accept": "application/x-ndjson"}
+        )
+        assert streamed.text == '{"id":1}\n{"id":2}\n'
+
+    def test_batch_and_single(self, client, create_test_batch):
+        """Test the batch listing and single-hospital lookups."""
+        hospitals, batch_id = create_test_batch(count=2)
+        response = client.get(f"/hospitals/batch/{batch_id}", params={"fields": "id,active"})
+        assert response.json() == [{"id": h.id, "active": False} for h in hospitals]
+
+        response = client.get(f"/hospitals/{hospitals[0].id}", params={"fields": "creation_batch_id"})
+        assert response.json() == {"creation_batch_id": str(batch_id)}
+
+    def test_invalid_fields(self, client, create_test_hospital):
+        """Test that unknown or empty field lists are rejected."""
+        create_test_hospital()
+        for url in ("/hospitals/", "/hospitals/1"):
+            response = client.get(url, params={"fields": "id,secret"})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert "secret" in response.json()["detail"]
+            assert client.get(url, params={"fields": ""}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestDuplicateDetection:
+    """Test duplicate-aware hospital creation."""
+
+    def test_duplicates_allowed_by_default(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that dedup is off unless configured."""
+        first = client.post("/hospitals/", json=sample_hospital_data).json()
+        second = client.post("/hospitals/", json=sample_hospital_data).json()
+        assert first["id"] != second["id"]
+
+    def test_return_mode_skips_slow_task(self, client, monkeypatch, bypass_rate_limit, sample_hospital_data):
+        """Test that a normalized duplicate returns the stored hospital at once."""
+        monkeypatch.setenv("DEDUP_MODE", "return")
+        with patch("app.main.slow_running_task") as slow_task:
+            created = client.post("/hospitals/", json=sample_hospital_data).json()
+            retry = client.post("/hospitals/", json={
+                "name": "  test HOSPITAL ",
+                "address": "123 Test St.",
+                "phone": "(555) 0123",
+            })
+
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry.json() == created
+        assert slow_task.call_count == 1
+        assert len(client.get("/hospitals/").json()) == 1
+
+    def test_reject_mode(self, client, mock_slow_task, monkeypatch, bypass_rate_limit, sample_hospital_data):
+        """Test that reject mode answers 409 pointing at the existing hospital."""
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        created = client.post("/hospitals/", json=sample_hospital_data).json()
+
+        response = client.post("/hospitals/", json=sample_hospital_data)
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.headers["location"] == f"/hospitals/{created['id']}"
+        assert str(created["id"]) in response.json()["detail"]
+
+    def test_different_phone_is_not_duplicate(
+        self, client, mock_slow_task, monkeypatch, bypass_rate_limit, sample_hospital_data
+    ):
+        """Test that all three fields must match."""
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        client.post("/hospitals/", json=sample_hospital_data)
+        response = client.post("/hospitals/", json={**sample_hospital_data, "phone": "555-9999"})
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestIdempotencyKey:
+    """Test Idempotency-Key handling on hospital creation."""
+
+    def test_retry_returns_first_response(self, client, bypass_rate_limit, sample_hospital_data):
+        """Test that a retried request is answered without new work."""
+        headers = {"Idempotency-Key": "upload-1"}
+        with patch("app.main.slow_running_task") as slow_task:
+            first = client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+            retry = client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert slow_task.call_count == 1
+        assert len(client.get("/hospitals/").json()) == 1
+
+    def test_key_reused_with_other_body(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that reusing a key for a different hospital is rejected."""
+        headers = {"Idempotency-Key": "upload-1"}
+        client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+        response = client.post(
+            "/hospitals/", json={**sample_hospital_data, "name": "Other"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_refused_create_is_retried(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data, monkeypatch):
+        """Test that a create the queue refused at once is not replayed to retries."""
+        headers = {"Idempotency-Key": "upload-1"}
+        monkeypatch.setattr(main.create_coalescer, "window_seconds", 0)
+        with patch.object(main.create_queue, "submit", side_effect=QueueFull(retry_after=1)) as submit:
+            responses = [client.post("/hospitals/", json=sample_hospital_data, headers=headers) for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_503_SERVICE_UNAVAILABLE] * 3
+        assert submit.call_count == 3
+        response = client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert "idempotent-replayed" not in response.headers
+
+    def test_different_keys_create_separately(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that distinct keys are independent requests."""
+        first = client.post("/hospitals/", json=sample_hospital_data, headers={"Idempotency-Key": "a"})
+        second = client.post("/hospitals/", json=sample_hospital_data, headers={"Idempotency-Key": "b"})
+        assert first.json()["id"] != second.json()["id"]
+
+
+class TestHospitalSearch:
+    """Test the hospital search endpoint."""
+
+    def test_search(self, client, create_test_hospital):
+        """Test searching by name and by address."""
+        create_test_hospital(name="Riverside General", address="1 Main St")
+        create_test_hospital(name="Hilltop Clinic", address="5 Riverside Ave")
+
+        response = client.get("/hospitals/search", params={"q": "riverside"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [h["name"] for h in response.json()] == ["Riverside General", "Hilltop Clinic"]
+
+        response = client.get("/hospitals/search", params={"q": "riverside", "limit": 1})
+        assert [h["name"] for h in response.json()] == ["Riverside General"]
+
+    def test_search_requires_query(self, client):
+        """Test that a missing or empty query is rejected."""
+        assert client.get("/hospitals/search").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/hospitals/search", params={"q": ""}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_no_matches(self, client, create_test_hospital):
+        """Test that an unmatched query returns an empty list."""
+        create_test_hospital()
+        response = client.get("/hospitals/search", params={"q": "nowhere"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+
 class TestAPIValidation:
     """Test API validation and error handling."""
 
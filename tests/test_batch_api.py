@@ -1,5 +1,7 @@
 import pytest
 import uuid
+from unittest.mock import patch
+
 from fastapi import status
 
 
@@ -24,6 +26,26 @@ class TestBatchAPIEndpoints:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert "No hospitals found" in response.json()["detail"]
 
+    def test_get_batch_summary(self, client, create_test_batch, bypass_rate_limit):
+        """Test the lightweight batch summary endpoint."""
+        hospitals, batch_id = create_test_batch(3, active=False)
+
+        response = client.get(f"/hospitals/batch/{batch_id}/summary")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["batch_id"] == str(batch_id)
+        assert data["hospital_count"] == 3
+        assert data["active_count"] == 0
+
+        client.patch(f"/hospitals/batch/{batch_id}/activate")
+        response = client.get(f"/hospitals/batch/{batch_id}/summary")
+        assert response.json()["active_count"] == 3
+
+    def test_get_batch_summary_not_found(self, client, bypass_rate_limit):
+        """Test the batch summary for a non-existent batch."""
+        response = client.get(f"/hospitals/batch/{uuid.uuid4()}/summary")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_delete_hospitals_by_batch_success(self, client, create_test_batch, bypass_rate_limit):
         """Test deleting hospitals by batch ID."""
         hospitals, batch_id = create_test_batch(3)
@@ -90,4 +112,111 @@ class TestBatchAPIEndpoints:
 
         # Verify still only 20
         response = client.get(f"/hospitals/batch/{batch_id}")
-        assert len(response.json()) == 20
\ No newline at end of file
+        assert len(response.json()) == 20
+
+class TestBulkCreate:
+    """Test creating a whole batch with POST /hospitals/bulk."""
+
+    def _rows(self, count, batch_id=None):
+        rows = [{"name": f"Hospital {i}", "address": f"{i} Main St"} for i in range(count)]
+        if batch_id is not None:
+            for row in rows:
+                row["creation_batch_id"] = str(batch_id)
+        return rows
+
+    def test_creates_inactive_batch(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that every row lands in one batch, inactive until activated."""
+        response = client.post("/hospitals/bulk", json=self._rows(3))
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["created_count"] == 3
+        assert data["activated"] is False
+        assert [h["name"] for h in data["hospitals"]] == ["Hospital 0", "Hospital 1", "Hospital 2"]
+        assert {h["creation_batch_id"] for h in data["hospitals"]} == {data["batch_id"]}
+        assert not any(h["active"] for h in data["hospitals"])
+
+        response = client.get(f"/hospitals/batch/{data['batch_id']}")
+        assert len(response.json()) == 3
+
+    def test_activate_includes_existing_members(self, client, create_test_batch, mock_slow_task, bypass_rate_limit):
+        """Test that activate=true also activates rows already in the batch."""
+        hospitals, batch_id = create_test_batch(2)
+
+        response = client.post(f"/hospitals/bulk?batch_id={batch_id}&activate=true", json=self._rows(2))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["batch_id"] == str(batch_id)
+
+        batch = client.get(f"/hospitals/batch/{batch_id}").json()
+        assert len(batch) == 4
+        assert all(h["active"] for h in batch)
+
+    def test_mismatched_batch_ids(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that rows from different batches are rejected."""
+        rows = self._rows(1, uuid.uuid4()) + self._rows(1, uuid.uuid4())
+        response = client.post("/hospitals/bulk", json=rows)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.post(f"/hospitals/bulk?batch_id={uuid.uuid4()}", json=self._rows(1, uuid.uuid4()))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_limit_is_all_or_nothing(self, client, create_test_batch, mock_slow_task, bypass_rate_limit):
+        """Test that a request overflowing the batch stores none of its rows."""
+        hospitals, batch_id = create_test_batch(15)
+
+        response = client.post("/hospitals/bulk", json=self._rows(6, batch_id))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert len(client.get(f"/hospitals/batch/{batch_id}").json()) == 15
+
+    @pytest.mark.parametrize("body", [[], "too many", [{"name": "", "address": "1 Main St"}]])
+    def test_invalid_body(self, client, mock_slow_task, bypass_rate_limit, body):
+        """Test that empty, oversized and invalid bodies are rejected before any work."""
+        if body == "too many":
+            body = self._rows(21)
+        response = client.post("/hospitals/bulk", json=body)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/hospitals/").json() == []
+
+    def test_one_slow_task_per_request(self, client, bypass_rate_limit):
+        """Test that the slow work is paid once per request, not once per row."""
+        with patch("app.main.slow_running_task") as slow_task:
+            response = client.post("/hospitals/bulk", json=self._rows(10))
+        assert response.status_code == status.HTTP_200_OK
+        assert slow_task.call_count == 1
+
+    def test_duplicates_follow_dedup_mode(self, client, create_test_hospital, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that duplicates are answered with the stored row, or rejected as a whole."""
+        existing = create_test_hospital(name="Hospital 0", address="0 Main St", phone=None)
+        monkeypatch.setenv("DEDUP_MODE", "return")
+
+        data = client.post("/hospitals/bulk", json=self._rows(2)).json()
+        assert data["created_count"] == 1
+        assert data["hospitals"][0]["id"] == existing.id
+
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        response = client.post("/hospitals/bulk", json=self._rows(3))
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert len(client.get("/hospitals/").json()) == 2
+
+    def test_repeated_rows_are_stored_once(self, client, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that a row sent twice in one request is not stored twice."""
+        rows = self._rows(2) + [{"name": "HOSPITAL 0", "address": "0 Main St."}]
+        monkeypatch.setenv("DEDUP_MODE", "return")
+
+        data = client.post("/hospitals/bulk", json=rows).json()
+        assert data["created_count"] == 2
+        assert data["hospitals"][2] == data["hospitals"][0]
+
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        response = client.post("/hospitals/bulk", json=[{"name": "Twin", "address": "9 Main St"}] * 2)
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert len(client.get("/hospitals/").json()) == 2
+
+    def test_idempotency_key_replays(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that a retried request with the same key creates nothing new."""
+        headers = {"Idempotency-Key": "bulk-1"}
+        first = client.post("/hospitals/bulk", json=self._rows(2), headers=headers)
+        second = client.post("/hospitals/bulk", json=self._rows(2), headers=headers)
+
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert len(client.get("/hospitals/").json()) == 2
@@ -2,6 +2,7 @@ import pytest
 import uuid
 from uuid import UUID
 from app.database import (
+    get_hospital_by_id,
     get_hospitals_by_batch_id,
     has_active_hospitals_in_batch,
     activate_hospitals_by_batch_id,
@@ -89,9 +90,9 @@ class TestBatchOperationsLogic:
         activated_count = activate_hospitals_by_batch_id(batch_id)
 
         assert activated_count == 2
-        assert hospital1.active is True
-        assert hospital2.active is True
-        assert hospital3.active is False  # Should remain unchanged
+        assert get_hospital_by_id(hospital1.id).active is True
+        assert get_hospital_by_id(hospital2.id).active is True
+        assert get_hospital_by_id(hospital3.id).active is False  # Should remain unchanged
 
     def test_activate_hospitals_mixed_states(self, reset_database, create_test_hospital_direct):
         """Test activating hospitals when some are already active."""
@@ -103,8 +104,8 @@ class TestBatchOperationsLogic:
         activated_count = activate_hospitals_by_batch_id(batch_id)
 
         assert activated_count == 1  # Only one was activated
-        assert hospital1.active is True
-        assert hospital2.active is True  # Was already active
+        assert get_hospital_by_id(hospital1.id).active is True
+        assert get_hospital_by_id(hospital2.id).active is True  # Was already active
 
     def test_delete_hospitals_by_batch_id(self, reset_database, create_test_hospital_direct):
         """Test deleting hospitals by batch ID."""
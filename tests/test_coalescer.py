@@ -0,0 +1,162 @@
+import threading
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from app import main
+from app.coalescer import Coalescer
+
+
+class Recorder:
+    """Process function recording each group it is given."""
+
+    def __init__(self):
+        self.groups = []
+
+    def __call__(self, key, items):
+        self.groups.append((key, list(items)))
+        return [ValueError(item) if item == "bad" else f"{key}:{item}" for item in items]
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+class TestCoalescer:
+    """Test grouping of concurrent submissions."""
+
+    def test_full_group_is_processed_at_once(self, executor):
+        """Test that reaching max_size flushes without waiting for the window."""
+        process = Recorder()
+        coalescer = Coalescer(process, executor, window_seconds=60, max_size=3)
+
+        futures = [coalescer.submit("a", i) for i in range(3)]
+        assert [future.result(timeout=5) for future in futures] == ["a:0", "a:1", "a:2"]
+        assert process.groups == [("a", [0, 1, 2])]
+
+    def test_window_flushes_partial_groups(self, executor):
+        """Test that a group short of max_size is processed when its window ends."""
+        process = Recorder()
+        coalescer = Coalescer(process, executor, window_seconds=0.05, max_size=10)
+
+        futures = [coalescer.submit("a", 1), coalescer.submit("b", 2), coalescer.submit("a", 3)]
+        assert [future.result(timeout=5) for future in futures] == ["a:1", "b:2", "a:3"]
+        assert sorted(process.groups) == [("a", [1, 3]), ("b", [2])]
+
+    def test_zero_window_processes_items_alone(self, executor):
+        """Test that a zero window turns coalescing off."""
+        process = Recorder()
+        coalescer = Coalescer(process, executor, window_seconds=0, max_size=10)
+
+        assert [coalescer.submit("a", i).result(timeout=5) for i in range(2)] == ["a:0", "a:1"]
+        assert process.groups == [("a", [0]), ("a", [1])]
+
+    def test_outcomes_are_per_item(self, executor):
+        """Test that one failing item does not fail the rest of its group."""
+        coalescer = Coalescer(Recorder(), executor, window_seconds=60, max_size=2)
+
+        bad, good = coalescer.submit("a", "bad"), coalescer.submit("a", "ok")
+        with pytest.raises(ValueError):
+            bad.result(timeout=5)
+        assert good.result(timeout=5) == "a:ok"
+
+    def test_group_errors_fail_every_item(self, executor):
+        """Test that an error from process or the executor reaches every submitter."""
+        def broken(key, items):
+            raise RuntimeError("down")
+
+        class FullExecutor(Executor):
+            def submit(self, fn, *args, **kwargs):
+                raise OverflowError("full")
+
+        futures = [Coalescer(broken, executor, window_seconds=0, max_size=1).submit("a", 1)]
+        futures.append(Coalescer(Recorder(), FullExecutor(), window_seconds=0, max_size=1).submit("a", 1))
+        with pytest.raises(RuntimeError):
+            futures[0].result(timeout=5)
+        with pytest.raises(OverflowError):
+            futures[1].result(timeout=5)
+
+
+class TestCoalescedCreates:
+    """Test that concurrent creates for one batch share their processing."""
+
+    @pytest.fixture
+    def coalesce(self, monkeypatch):
+        def configure(max_size):
+            # A long window, so each group closes on size alone
+            monkeypatch.setattr(main.create_coalescer, "window_seconds", 5)
+            monkeypatch.setattr(main.create_coalescer, "max_size", max_size)
+        return configure
+
+    def _post_concurrently(self, client, rows):
+        responses = [None] * len(rows)
+
+        def post(i):
+            responses[i] = client.post("/hospitals/", json=rows[i])
+
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(len(rows))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return responses
+
+    def test_one_slow_task_per_group(self, client, coalesce, bypass_rate_limit):
+        """Test that a group of creates runs the slow task once and stores every row."""
+        coalesce(max_size=5)
+        batch_id = str(uuid.uuid4())
+        rows = [{"name": f"H{i}", "address": "1 Main St", "creation_batch_id": batch_id} for i in range(5)]
+
+        with patch("app.main.slow_running_task") as slow_task:
+            responses = self._post_concurrently(client, rows)
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 5
+        assert sorted(response.json()["name"] for response in responses) == [row["name"] for row in rows]
+        assert slow_task.call_count == 1
+        assert len(client.get(f"/hospitals/batch/{batch_id}").json()) == 5
+
+    @pytest.mark.parametrize("max_size", [1, 4])
+    def test_identical_creates_store_one_row(self, client, coalesce, mock_slow_task, bypass_rate_limit, monkeypatch, max_size):
+        """Test that identical concurrent creates store one row, in one group or racing groups."""
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        coalesce(max_size=max_size)
+        batch_id = str(uuid.uuid4())
+        rows = [{"name": "Twin", "address": "1 Main St", "creation_batch_id": batch_id}] * 4
+
+        responses = self._post_concurrently(client, rows)
+
+        codes = sorted(response.status_code for response in responses)
+        assert codes == [status.HTTP_200_OK] + [status.HTTP_409_CONFLICT] * 3
+        created = next(response for response in responses if response.status_code == status.HTTP_200_OK)
+        conflicts = [response for response in responses if response.status_code == status.HTTP_409_CONFLICT]
+        assert {response.headers["Location"] for response in conflicts} == {f"/hospitals/{created.json()['id']}"}
+        assert len(client.get(f"/hospitals/batch/{batch_id}").json()) == 1
+
+    def test_identical_creates_share_a_row_in_return_mode(self, client, coalesce, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that repeats within a group are answered with the row of the first."""
+        monkeypatch.setenv("DEDUP_MODE", "return")
+        coalesce(max_size=4)
+        batch_id = str(uuid.uuid4())
+        rows = [{"name": "Twin", "address": "1 Main St", "creation_batch_id": batch_id}] * 4
+
+        responses = self._post_concurrently(client, rows)
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 4
+        assert len({response.json()["id"] for response in responses}) == 1
+
+    def test_batch_overflow_fails_per_create(self, client, coalesce, create_test_batch, mock_slow_task, bypass_rate_limit):
+        """Test that only the creates past the batch limit fail."""
+        coalesce(max_size=4)
+        hospitals, batch_id = create_test_batch(18)
+        rows = [{"name": f"H{i}", "address": "1 Main St", "creation_batch_id": str(batch_id)} for i in range(4)]
+
+        responses = self._post_concurrently(client, rows)
+
+        codes = sorted(response.status_code for response in responses)
+        assert codes == [status.HTTP_200_OK] * 2 + [status.HTTP_400_BAD_REQUEST] * 2
+        assert len(client.get(f"/hospitals/batch/{batch_id}").json()) == 20
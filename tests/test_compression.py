@@ -0,0 +1,112 @@
+import gzip
+import json
+import pytest
+from app import compression, database
+from app.compression import CompressedBodyCache, negotiate
+
+
+class TestNegotiate:
+    """Test choosing a content coding from Accept-Encoding."""
+
+    def test_gzip(self):
+        """Test the common browser header."""
+        assert negotiate("gzip, deflate") == "gzip"
+
+    def test_identity_only(self):
+        """Test that nothing is picked when no supported coding is acceptable."""
+        assert negotiate("") is None
+        assert negotiate("identity") is None
+        assert negotiate("deflate, gzip;q=0") is None
+
+    def test_wildcard(self):
+        """Test that * covers codings not listed explicitly."""
+        assert negotiate("*") is not None
+        assert negotiate("*;q=0") is None
+
+    def test_highest_weight_wins(self, monkeypatch):
+        """Test q-values first, then server preference for ties."""
+        stub = (lambda data: data, None)
+        monkeypatch.setattr(compression, "ENCODERS", {"zstd": stub, "br": stub, "gzip": stub})
+        assert negotiate("gzip, br;q=0.5") == "gzip"
+        assert negotiate("gzip, br, zstd") == "zstd"
+        assert negotiate("gzip;q=0.5, br;q=bogus") == "gzip"
+
+
+class TestCompressedBodyCache:
+    """Test the bounded cache of compressed bodies."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used body goes first."""
+        cache = CompressedBodyCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        assert cache.get("a") == b"1"
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+
+@pytest.fixture
+def many_hospitals(create_test_hospital):
+    for i in range(50):
+        create_test_hospital(name=f"Hospital {i}")
+
+
+class TestCompressedResponses:
+    """Test compression of API responses."""
+
+    def test_large_listing_is_gzipped(self, client, many_hospitals):
+        """Test that a big JSON body is compressed and decodes to the same data."""
+        response = client.get("/hospitals/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 50
+
+        raw = client.get("/hospitals/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in raw.headers
+        assert raw.json() == response.json()
+
+    def test_small_body_skipped(self, client, create_test_hospital):
+        """Test that bodies below the minimum size go out uncompressed."""
+        create_test_hospital()
+        response = client.get("/hospitals/1", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_unchanged_listing_compressed_once(self, client, monkeypatch, many_hospitals):
+        """Test that a tagged listing reuses its compressed body until it changes."""
+        calls = []
+        compress, stream = compression.ENCODERS["gzip"]
+
+        def counting(data):
+            calls.append(len(data))
+            return compress(data)
+
+        monkeypatch.setitem(compression.ENCODERS, "gzip", (counting, stream))
+        headers = {"Accept-Encoding": "gzip"}
+        first = client.get("/hospitals/", headers=headers)
+        second = client.get("/hospitals/", headers=headers)
+        assert second.json() == first.json()
+        assert len(calls) == 1
+
+        database.delete_hospital(1)
+        assert len(client.get("/hospitals/", headers=headers).json()) == 49
+        assert len(calls) == 2
+
+    def test_stream_is_compressed_incrementally(self, client, monkeypatch, many_hospitals):
+        """Test that NDJSON streams are compressed chunk by chunk."""
+        monkeypatch.setattr("app.responses.STREAM_CHUNK_SIZE", 10)
+        with client.stream(
+            "GET", "/hospitals/", headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"}
+        ) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join(response.iter_raw())
+        lines = gzip.decompress(raw).decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == list(range(1, 51))
+
+    def test_not_modified_untouched(self, client, many_hospitals):
+        """Test that 304 responses carry no content coding."""
+        etag = client.get("/hospitals/").headers["etag"]
+        response = client.get("/hospitals/", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
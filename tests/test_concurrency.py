@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import anyio
+import httpx
+import pytest
+from app import database, main
+from app.main import app
+from app.models import Hospital
+from app.storage import BACKENDS, create_backend
+
+WRITERS = 200
+READERS = 4
+HOSPITALS_PER_WRITER = 5
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    """Create each registered backend with room for every row written."""
+    if request.param == "shared":
+        request.getfixturevalue("store_server")
+    store = create_backend(request.param, capacity=WRITERS * HOSPITALS_PER_WRITER)
+    yield store
+    store.close()
+
+
+@pytest.mark.slow
+class TestConcurrentStore:
+    """Stress tests running many writer and reader threads against a store."""
+
+    def test_concurrent_writers_keep_invariants(self, backend):
+        """Test that hundreds of concurrent writers never corrupt the store."""
+        start = threading.Barrier(WRITERS + READERS)
+        done = threading.Event()
+        reader_errors = []
+
+        def writer(n):
+            start.wait()
+            batch_id = uuid.uuid4()
+            created = [
+                backend.create_hospital(Hospital(
+                    id=0, name=f"W{n}-{i}", address=f"{i} Thread St",
+                    creation_batch_id=batch_id, active=False
+                ))
+                for i in range(HOSPITALS_PER_WRITER)
+            ]
+            renamed = created[0]
+            renamed.name += " (updated)"
+            backend.update_hospital(renamed.id, renamed)
+            backend.delete_hospital(created[-1].id)
+            if n % 2 == 0:
+                backend.activate_hospitals_by_batch_id(batch_id)
+            return batch_id, [h.id for h in created]
+
+        def reader():
+            start.wait()
+            try:
+                while not done.wait(0.001):
+                    hospitals = backend.get_all_hospitals()
+                    ids = [h.id for h in hospitals]
+                    assert ids == sorted(ids)
+                    for hospital in hospitals[:5]:
+                        backend.get_hospital_by_id(hospital.id)
+                        if hospital.creation_batch_id is not None:
+                            backend.get_batch_summary(hospital.creation_batch_id)
+            except Exception as exc:  # surfaced by the main thread
+                reader_errors.append(exc)
+
+        readers = [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in readers:
+            thread.start()
+        with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+            results = list(executor.map(writer, range(WRITERS)))
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        assert reader_errors == []
+
+        all_ids = [hospital_id for _, ids in results for hospital_id in ids]
+        assert len(set(all_ids)) == WRITERS * HOSPITALS_PER_WRITER
+
+        hospitals = backend.get_all_hospitals()
+        expected_rows = WRITERS * (HOSPITALS_PER_WRITER - 1)
+        assert backend.count_hospitals() == len(hospitals) == expected_rows
+
+        for n, (batch_id, ids) in enumerate(results):
+            members = backend.get_hospitals_by_batch_id(batch_id)
+            summary = backend.get_batch_summary(batch_id)
+            assert [h.id for h in members] == ids[:-1]
+            assert members[0].name.endswith("(updated)")
+            assert summary.hospital_count == len(members)
+            assert summary.active_count == sum(h.active for h in members)
+            assert summary.active_count == (len(members) if n % 2 == 0 else 0)
+
+
+class TestCreatesDoNotStarveReads:
+    """Test that slow creates run apart from the threadpool serving reads."""
+
+    REQUEST_THREADS = 40  # Starlette's default threadpool size
+    CREATES = 50
+
+    @pytest.fixture
+    def anyio_backend(self):
+        return "asyncio"
+
+    @pytest.mark.anyio
+    async def test_reads_answer_while_creates_wait(self, bypass_rate_limit, monkeypatch):
+        """Test that a GET returns promptly while many creates are in their slow task."""
+        # Process each create alone, so every one of them waits in the slow task
+        monkeypatch.setattr(main.create_coalescer, "window_seconds", 0)
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def slow_task():
+            started.release()
+            release.wait(10)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch("app.main.slow_running_task", side_effect=slow_task):
+                creates = [
+                    asyncio.ensure_future(client.post("/hospitals/", json={"name": f"H{i}", "address": "1 Main St"}))
+                    for i in range(self.CREATES)
+                ]
+                try:
+                    # Enough creates are waiting to fill every request thread
+                    for _ in range(self.REQUEST_THREADS):
+                        await asyncio.to_thread(started.acquire)
+                    with anyio.fail_after(2):
+                        response = await client.get("/hospitals/")
+                    assert response.status_code == 200
+                finally:
+                    release.set()
+                    responses = await asyncio.gather(*creates)
+
+        assert all(response.status_code == 200 for response in responses)
+        assert database.count_hospitals() == self.CREATES
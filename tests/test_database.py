@@ -1,8 +1,9 @@
 import pytest
 import uuid
-from collections import deque
 from app import database
 from app.models import Hospital
+from app.storage import MemoryBackend, create_backend
+from app.storage.memory import HospitalRecord, HospitalStore, record_size
 from app.config import MAX_TOTAL_HOSPITALS
 
 class TestDatabaseCRUD:
@@ -24,7 +25,7 @@ class TestDatabaseCRUD:
         assert created.address == "123 Main St"
         assert created.phone == "555-1234"
         assert created.active is True
-        assert len(database.hospitals_db) == 1
+        assert database.count_hospitals() == 1
 
     def test_get_hospital_by_id(self):
         """Test retrieving a hospital by ID."""
@@ -94,12 +95,12 @@ class TestDatabaseCRUD:
         hospital = Hospital(id=0, name="To Delete", address="123 Main St", active=True)
         created = database.create_hospital(hospital)
 
-        assert len(database.hospitals_db) == 1
+        assert database.count_hospitals() == 1
 
         # Delete it
         result = database.delete_hospital(created.id)
         assert result is True
-        assert len(database.hospitals_db) == 0
+        assert database.count_hospitals() == 0
 
         # Verify it's gone
         retrieved = database.get_hospital_by_id(created.id)
@@ -163,12 +164,12 @@ class TestBatchOperations:
         hospital = Hospital(id=0, name="Keep Me", address="999 Safe St", active=True)
         database.create_hospital(hospital)
 
-        assert len(database.hospitals_db) == 4
+        assert database.count_hospitals() == 4
 
         # Delete batch
         deleted_count = database.delete_hospitals_by_batch_id(batch_id)
         assert deleted_count == 3
-        assert len(database.hospitals_db) == 1
+        assert database.count_hospitals() == 1
 
         # Verify only non-batch hospital remains
         remaining = database.get_all_hospitals()
@@ -266,15 +267,13 @@ class TestFIFOBehavior:
 
     def test_fifo_storage_limit(self):
         """Test that storage respects FIFO limit."""
-        # Save original database
-        original_db = database.hospitals_db
-        original_next_id = database.next_id
+        # Save original store
+        original_store = database.store
 
         try:
             # Set small limit for testing
             test_limit = 5
-            database.hospitals_db = deque(maxlen=test_limit)
-            database.next_id = 1
+            database.store = create_backend(capacity=test_limit)
 
             # Add 5 hospitals
             for i in range(5):
@@ -286,7 +285,7 @@ class TestFIFOBehavior:
                 )
                 database.create_hospital(hospital)
 
-            assert len(database.hospitals_db) == 5
+            assert database.count_hospitals() == 5
 
             # Add one more - should evict the first
             hospital = Hospital(
@@ -298,27 +297,25 @@ class TestFIFOBehavior:
             database.create_hospital(hospital)
 
             # Still 5 hospitals, but first one should be gone
-            assert len(database.hospitals_db) == 5
+            assert database.count_hospitals() == 5
             hospitals = database.get_all_hospitals()
             names = [h.name for h in hospitals]
             assert "Hospital 1" not in names  # First one evicted
             assert "Hospital 6" in names      # New one added
 
         finally:
-            # Restore original database
-            database.hospitals_db = original_db
-            database.next_id = original_next_id
+            # Restore original store
+            database.store.close()
+            database.store = original_store
 
-    def test_operations_with_deque(self):
-        """Test that all operations work correctly with deque."""
-        # Save original database
-        original_db = database.hospitals_db
-        original_next_id = database.next_id
+    def test_operations_with_bounded_store(self):
+        """Test that all operations work correctly with a bounded store."""
+        # Save original store
+        original_store = database.store
 
         try:
             # Set small limit for testing
-            database.hospitals_db = deque(maxlen=3)
-            database.next_id = 1
+            database.store = create_backend(capacity=3)
 
             # Create hospitals
             hospitals = []
@@ -347,20 +344,18 @@ class TestFIFOBehavior:
             assert len(database.get_all_hospitals()) == 2
 
         finally:
-            # Restore original database
-            database.hospitals_db = original_db
-            database.next_id = original_next_id
+            # Restore original store
+            database.store.close()
+            database.store = original_store
 
     def test_id_generation_continues(self):
         """Test that ID generation continues even with FIFO eviction."""
-        # Save original database
-        original_db = database.hospitals_db
-        original_next_id = database.next_id
+        # Save original store
+        original_store = database.store
 
         try:
             # Set small limit for testing
-            database.hospitals_db = deque(maxlen=2)
-            database.next_id = 1
+            database.store = create_backend(capacity=2)
 
             # Create 3 hospitals (will evict first)
             ids = []
@@ -386,6 +381,312 @@ class TestFIFOBehavior:
             assert 3 in remaining_ids
 
         finally:
-            # Restore original database
-            database.hospitals_db = original_db
-            database.next_id = original_next_id
\ No newline at end of file
+            # Restore original store
+            database.store.close()
+            database.store = original_store
+
+def _record(hospital_id, name="Hospital", batch_id=None, active=True):
+    return HospitalRecord.from_model(
+        Hospital(id=hospital_id, name=name, address="1 Main St", creation_batch_id=batch_id, active=active)
+    )
+
+
+class TestRecordJson:
+    """Test the per-record JSON cache of the in-memory backend."""
+
+    def test_encoded_once(self):
+        """Test that repeated reads reuse the cached bytes."""
+        record = _record(1)
+        assert record.to_json() is record.to_json()
+        assert record.to_json() == record.to_model().model_dump_json().encode()
+
+    def test_follows_activation(self):
+        """Test that flipping ``active`` in place refreshes the cached bytes."""
+        batch_id = uuid.uuid4()
+        store = HospitalStore(maxlen=10)
+        record = _record(1, batch_id=batch_id, active=False)
+        store.append(record)
+        assert b'"active":false' in record.to_json()
+
+        store.activate_batch(batch_id)
+        assert b'"active":true' in record.to_json()
+
+    def test_backend_updates_and_deletes(self):
+        """Test that JSON reads see updates and deletions."""
+        backend = MemoryBackend(capacity=10)
+        backend.create_hospital(Hospital(id=0, name="Old", address="1 Main St"))
+        assert b'"name":"Old"' in backend.get_hospital_json(1)
+
+        backend.update_hospital(1, Hospital(id=1, name="New", address="1 Main St"))
+        assert b'"name":"New"' in backend.get_hospital_json(1)
+        assert backend.get_all_hospitals_json().count(b'"name":"New"') == 1
+
+        backend.delete_hospital(1)
+        assert backend.get_hospital_json(1) is None
+        assert backend.get_all_hospitals_json() == b"[]"
+
+
+class TestHospitalStore:
+    """Test the id-keyed FIFO store backing the database module."""
+
+    def test_update_keeps_insertion_order(self):
+        """Test that replacing a record does not move it to the end."""
+        store = HospitalStore(maxlen=3)
+        for i in range(1, 4):
+            store.append(_record(i, f"H{i}"))
+
+        assert store.replace(1, _record(1, "Updated"))
+        assert [h.id for h in store] == [1, 2, 3]
+
+        # The updated record is still the oldest and is evicted first
+        store.append(_record(4, "H4"))
+        assert [h.id for h in store] == [2, 3, 4]
+
+    def test_remove_from_middle(self):
+        """Test removing a record from the middle of the store."""
+        store = HospitalStore(maxlen=5)
+        for i in range(1, 4):
+            store.append(_record(i, f"H{i}"))
+
+        removed = store.remove(2)
+        assert removed.id == 2
+        assert store.get(2) is None
+        assert 2 not in store
+        assert [h.id for h in store] == [1, 3]
+        assert store.remove(2) is None
+
+    def test_replace_missing_id(self):
+        """Test that replacing an unknown id is rejected."""
+        store = HospitalStore(maxlen=3)
+        assert store.replace(42, _record(42)) is False
+        assert len(store) == 0
+
+    def test_batch_index_follows_eviction(self):
+        """Test that FIFO eviction removes records from the batch index."""
+        store = HospitalStore(maxlen=2)
+        batch_id = uuid.uuid4()
+        for i in range(1, 4):
+            store.append(_record(i, f"H{i}", batch_id))
+
+        assert store.batch_member_ids(batch_id) == [2, 3]
+
+        store.append(_record(4, "H4"))
+        store.append(_record(5, "H5"))
+        assert store.batch_member_ids(batch_id) == []
+        assert store.batch_members(batch_id) == []
+
+    def test_batch_index_follows_replace(self):
+        """Test that moving a record to another batch updates the index."""
+        store = HospitalStore(maxlen=5)
+        old_batch, new_batch = uuid.uuid4(), uuid.uuid4()
+        store.append(_record(1, "H1", old_batch))
+
+        store.replace(1, _record(1, "H1", new_batch))
+
+        assert store.batch_member_ids(old_batch) == []
+        assert store.batch_member_ids(new_batch) == [1]
+
+    def test_batch_stats_track_counts(self):
+        """Test that per-batch counters follow activation, updates and deletes."""
+        batch_id = uuid.uuid4()
+        created = [
+            database.create_hospital(Hospital(
+                id=0, name=f"H{i}", address="1 Main St",
+                creation_batch_id=batch_id, active=False
+            ))
+            for i in range(3)
+        ]
+
+        summary = database.get_batch_summary(batch_id)
+        assert summary.hospital_count == 3
+        assert summary.active_count == 0
+        assert summary.first_created_at == created[0].created_at
+        assert summary.last_created_at == created[2].created_at
+
+        # In-place mutation followed by update_hospital is counted once
+        created[1].active = True
+        database.update_hospital(created[1].id, created[1])
+        assert database.get_batch_summary(batch_id).active_count == 1
+
+        assert database.activate_hospitals_by_batch_id(batch_id) == 2
+        assert database.get_batch_summary(batch_id).active_count == 3
+
+        database.delete_hospital(created[2].id)
+        summary = database.get_batch_summary(batch_id)
+        assert summary.hospital_count == 2
+        assert summary.active_count == 2
+        assert summary.last_created_at == created[1].created_at
+
+        database.delete_hospitals_by_batch_id(batch_id)
+        assert database.get_batch_summary(batch_id) is None
+        assert database.get_batch_size(batch_id) == 0
+
+    def test_record_round_trip(self):
+        """Test that compact records rebuild identical models."""
+        hospital = Hospital(
+            id=7, name="Round Trip", address="1 Main St", phone="555-0000",
+            creation_batch_id=uuid.uuid4(), active=False
+        )
+        record = HospitalRecord.from_model(hospital)
+
+        assert isinstance(record.created_at, int)
+        assert record.to_model() == hospital
+
+    def test_batch_members_share_batch_uuid(self):
+        """Test that rows in one batch reference a single UUID object."""
+        store = HospitalStore(maxlen=5)
+        batch_id = uuid.uuid4()
+        store.append(_record(1, "H1", batch_id))
+        store.append(_record(2, "H2", uuid.UUID(str(batch_id))))
+
+        first, second = store.batch_members(batch_id)
+        assert first.creation_batch_id is second.creation_batch_id
+
+
+class TestKeysetPages:
+    """Test id-ordered pages read from the store."""
+
+    def test_pages_skip_removed_rows(self):
+        """Test that deleted and evicted ids are skipped without breaking pages."""
+        store = HospitalStore(maxlen=8)
+        for i in range(1, 11):
+            store.append(_record(i))
+        store.remove(5)
+
+        assert [r.id for r in store.page(0, 3)] == [3, 4, 6]
+        assert [r.id for r in store.page(4, 3)] == [6, 7, 8]
+        assert [r.id for r in store.page(9, 3)] == [10]
+        assert store.page(10, 3) == []
+
+    def test_compaction_keeps_pages(self):
+        """Test that compacting dead ids does not change page contents."""
+        store = HospitalStore(maxlen=1000)
+        for i in range(1, 1001):
+            store.append(_record(i))
+        for i in range(1, 1001, 2):
+            store.remove(i)
+
+        assert len(store._ids) < 1000
+        assert [r.id for r in store.page(100, 3)] == [102, 104, 106]
+
+    def test_reinserted_id(self):
+        """Test that appending an existing id keeps a single page entry."""
+        store = HospitalStore(maxlen=5)
+        for i in range(1, 4):
+            store.append(_record(i))
+        store.append(_record(2, "Again"))
+
+        assert [r.id for r in store.page(0, 10)] == [1, 2, 3]
+
+
+class TestEvictionPolicies:
+    """Test the pluggable eviction policies of the bounded store."""
+
+    def test_fifo_counts_evictions(self):
+        """Test that FIFO evicts oldest-first and counts each eviction."""
+        store = HospitalStore(maxlen=2)
+        evicted = [store.append(_record(i)) for i in range(1, 5)]
+
+        assert [[r.id for r in batch] for batch in evicted] == [[], [], [1], [2]]
+        assert store.evictions == 2
+
+    def test_inactive_first_spares_active_rows(self):
+        """Test that inactive rows are evicted before older active ones."""
+        store = HospitalStore(maxlen=3, policy="inactive_first")
+        store.append(_record(1, active=True))
+        store.append(_record(2, active=False))
+        store.append(_record(3, active=True))
+
+        store.append(_record(4, active=True))
+        assert [h.id for h in store] == [1, 3, 4]
+
+        # With no inactive rows left it falls back to FIFO
+        store.append(_record(5, active=True))
+        assert [h.id for h in store] == [3, 4, 5]
+
+    def test_bulk_insert_protects_every_new_row(self):
+        """Test that eviction after a multi-row insert never picks one of the new rows."""
+        store = HospitalStore(maxlen=3, policy="inactive_first")
+        store.append(_record(1, active=True))
+        for i in (2, 3, 4):
+            store.append(_record(i, active=False), evict=False)
+
+        evicted = store.evict(protected={2, 3, 4})
+        assert [r.id for r in evicted] == [1]
+        assert [h.id for h in store] == [2, 3, 4]
+
+    def test_inactive_first_follows_activation(self):
+        """Test that activating a batch removes its rows from the inactive queue."""
+        store = HospitalStore(maxlen=3, policy="inactive_first")
+        batch_id = uuid.uuid4()
+        store.append(_record(1, batch_id=batch_id, active=False))
+        store.append(_record(2, active=False))
+        store.activate_batch(batch_id)
+        store.append(_record(3, active=True))
+
+        store.append(_record(4, active=True))
+        assert [h.id for h in store] == [1, 3, 4]
+
+    def test_inactive_first_never_evicts_new_row(self):
+        """Test that a new inactive row is not evicted to make room for itself."""
+        store = HospitalStore(maxlen=2, policy="inactive_first")
+        store.append(_record(1, active=True))
+        store.append(_record(2, active=True))
+
+        store.append(_record(3, active=False))
+        assert [h.id for h in store] == [2, 3]
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test that reads keep a row from being evicted."""
+        backend = MemoryBackend(capacity=3, eviction_policy="lru")
+        created = [
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+            for i in range(3)
+        ]
+        backend.get_hospital_by_id(created[0].id)
+
+        backend.create_hospital(Hospital(id=0, name="New", address="1 Main St"))
+        assert [h.id for h in backend.get_all_hospitals()] == [1, 3, 4]
+
+    def test_byte_budget(self):
+        """Test evicting by estimated size instead of row count."""
+        sample = _record(1)
+        budget = record_size(sample) * 3
+        store = HospitalStore(maxlen=100, max_bytes=budget)
+        for i in range(1, 6):
+            store.append(_record(i))
+
+        assert [h.id for h in store] == [3, 4, 5]
+        assert store.bytes <= budget
+        assert store.evictions == 2
+
+        store.remove(5)
+        assert store.bytes == record_size(sample) * 2
+
+    def test_eviction_keeps_batch_index(self):
+        """Test that policy-driven evictions also leave the batch index."""
+        store = HospitalStore(maxlen=2, policy="inactive_first")
+        batch_id = uuid.uuid4()
+        store.append(_record(1, active=True))
+        store.append(_record(2, batch_id=batch_id, active=False))
+        store.append(_record(3, active=True))
+
+        assert store.batch_stats(batch_id) is None
+        assert store.batch_member_ids(batch_id) == []
+
+    def test_unknown_policy(self):
+        """Test that an unknown policy name is rejected."""
+        with pytest.raises(ValueError, match="Unknown eviction policy"):
+            HospitalStore(maxlen=2, policy="random")
+
+    def test_stats_report_evictions(self):
+        """Test that store stats expose the eviction counter."""
+        backend = MemoryBackend(capacity=1)
+        for i in range(3):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+
+        stats = backend.get_stats()
+        assert stats.eviction_policy == "fifo"
+        assert stats.capacity == 1
+        assert stats.hospital_count == 1
+        assert stats.evictions == 2
@@ -142,16 +142,14 @@ class TestBoundaryValues:
         """Test FIFO storage boundary conditions using database directly."""
         from app import database
         from app.models import Hospital
-        from collections import deque
+        from app.storage import create_backend
 
-        # Save original database
-        original_db = database.hospitals_db
-        original_next_id = database.next_id
+        # Save original store
+        original_store = database.store
 
         try:
             # Set very small limit for testing
-            database.hospitals_db = deque(maxlen=3)
-            database.next_id = 1
+            database.store = create_backend(capacity=3)
 
             created_ids = []
 
@@ -166,7 +164,7 @@ class TestBoundaryValues:
                 created = database.create_hospital(hospital)
                 created_ids.append(created.id)
 
-            assert len(database.hospitals_db) == 3
+            assert database.count_hospitals() == 3
 
             # Add one more (should evict first)
             hospital = Hospital(
@@ -178,7 +176,7 @@ class TestBoundaryValues:
             fourth = database.create_hospital(hospital)
 
             # Should still have only 3 hospitals
-            assert len(database.hospitals_db) == 3
+            assert database.count_hospitals() == 3
 
             # First should be gone, others should exist
             assert database.get_hospital_by_id(created_ids[0]) is None
@@ -187,6 +185,6 @@ class TestBoundaryValues:
             assert database.get_hospital_by_id(fourth.id) is not None
 
         finally:
-            # Restore original database
-            database.hospitals_db = original_db
-            database.next_id = original_next_id
\ No newline at end of file
+            # Restore original store
+            database.store.close()
+            database.store = original_store
\ No newline at end of file
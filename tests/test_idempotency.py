@@ -0,0 +1,100 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from app.idempotency import IdempotencyCache, IdempotencyKeyReused
+
+
+class TestIdempotencyCache:
+    """Test the bounded idempotency response cache."""
+
+    def test_replays_finished_result(self):
+        """Test that a repeated key returns the first result without rerunning."""
+        cache = IdempotencyCache()
+        calls = []
+
+        def work():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.run("key", "body", work) == (1, False)
+        assert cache.run("key", "body", work) == (1, True)
+        assert len(calls) == 1
+
+    def test_rejects_reused_key_with_other_body(self):
+        """Test that a key cannot be replayed for a different request."""
+        cache = IdempotencyCache()
+        cache.run("key", "body", lambda: 1)
+        with pytest.raises(IdempotencyKeyReused):
+            cache.run("key", "other body", lambda: 2)
+
+    def test_concurrent_requests_share_execution(self):
+        """Test that requests racing on one key run the work once."""
+        cache = IdempotencyCache()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "created"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.run("key", "body", work)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 1
+        assert sorted(replayed for _, replayed in results) == [False] + [True] * 7
+        assert {result for result, _ in results} == {"created"}
+
+    def test_entries_expire(self, clock):
+        """Test that results are dropped after the TTL."""
+        cache = IdempotencyCache(ttl_seconds=10, clock=clock)
+        cache.run("key", "body", lambda: 1)
+
+        clock.now = 11
+        assert cache.run("key", "body", lambda: 2) == (2, False)
+
+    def test_lru_bound(self):
+        """Test that the least recently used key is evicted at capacity."""
+        cache = IdempotencyCache(max_entries=2)
+        cache.run("a", "body", lambda: "a")
+        cache.run("b", "body", lambda: "b")
+        cache.run("a", "body", lambda: "unused")
+        cache.run("c", "body", lambda: "c")
+
+        assert len(cache) == 2
+        assert cache.run("a", "body", lambda: "rerun") == ("a", True)
+        assert cache.run("b", "body", lambda: "rerun") == ("rerun", False)
+
+    def test_client_errors_are_cached(self):
+        """Test that a 4xx outcome is replayed rather than recomputed."""
+        cache = IdempotencyCache()
+
+        def work():
+            raise HTTPException(status_code=400, detail="Batch full")
+
+        with pytest.raises(HTTPException):
+            cache.run("key", "body", work)
+        with pytest.raises(HTTPException) as excinfo:
+            cache.run("key", "body", lambda: "never")
+        assert excinfo.value.detail == "Batch full"
+
+    def test_unexpected_errors_are_not_cached(self):
+        """Test that a crash leaves the key free for a retry."""
+        cache = IdempotencyCache()
+
+        def work():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.run("key", "body", work)
+        assert cache.run("key", "body", lambda: "retried") == ("retried", False)
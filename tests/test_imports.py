@@ -0,0 +1,206 @@
+import time
+import uuid
+
+import pytest
+from fastapi import status
+from starlette.requests import ClientDisconnect
+from app.imports import CsvRecords, parse_header, parse_row
+
+HEADER = "name,address,phone\n"
+
+
+def feed_all(data: bytes, step: int):
+    records = CsvRecords()
+    parsed = []
+    for start in range(0, len(data), step):
+        parsed += records.feed(data[start:start + step])
+    return parsed + records.close()
+
+
+def csv_body(count, start=0):
+    return HEADER + "".join(f"Hospital {i},{i} Main St,555-{i:04d}\n" for i in range(start, start + count))
+
+
+def wait_for_import(client, location, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = client.get(location).json()
+        if progress["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            return progress
+        time.sleep(0.01)
+
+
+class TestCsvRecords:
+    """Test the incremental CSV parser."""
+
+    @pytest.mark.parametrize("step", [1, 3, 1024])
+    def test_records_across_chunk_boundaries(self, step):
+        """Test that records come out the same however the bytes are split."""
+        data = '﻿name,address\r\n"Saint ""Mary""",1 Main St\r\n"Two\nLines",2 Main St\nÉcole,3 Rue'.encode()
+
+        assert feed_all(data, step) == [
+            (1, ["name", "address"]),
+            (2, ['Saint "Mary"', "1 Main St"]),
+            (3, ["Two\nLines", "2 Main St"]),
+            (5, ["École", "3 Rue"]),
+        ]
+
+    def test_skips_blank_lines(self):
+        """Test that blank lines are skipped but still counted."""
+        assert feed_all(b"a,b\n\n\nc,d\n", 1024) == [(1, ["a", "b"]), (4, ["c", "d"])]
+
+    def test_rejects_invalid_utf8_and_runaway_records(self):
+        """Test that bad encoding and unterminated quotes stop the parse."""
+        with pytest.raises(ValueError, match="UTF-8"):
+            feed_all(b"a,b\n\xff\xfe,c\n", 1024)
+        records = CsvRecords(max_record_size=10)
+        with pytest.raises(ValueError, match="exceeds"):
+            records.feed(b'"never closed,' + b"x" * 20)
+
+
+class TestRowParsing:
+    """Test header and row validation."""
+
+    def test_header_columns(self):
+        """Test that columns are matched by name, in any order."""
+        assert parse_header(["Phone", "Address", "Name", "notes"]) == {"phone": 0, "address": 1, "name": 2}
+        with pytest.raises(ValueError, match="missing: address"):
+            parse_header(["name", "phone"])
+
+    def test_row_validation(self):
+        """Test that rows are checked against HospitalCreate."""
+        columns = {"name": 0, "address": 1, "phone": 2}
+        hospital = parse_row(["General", "1 Main St", ""], columns, 3)
+        assert (hospital.name, hospital.phone) == ("General", None)
+        with pytest.raises(ValueError, match="name"):
+            parse_row(["  ", "1 Main St", ""], columns, 3)
+        with pytest.raises(ValueError, match="Expected 3 fields, got 2"):
+            parse_row(["General", "1 Main St"], columns, 3)
+
+
+class TestImportEndpoint:
+    """Test POST /hospitals/import and its progress resource."""
+
+    def test_creates_rows_in_batches(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that a multipart upload is created as batches of MAX_BATCH_SIZE."""
+        response = client.post("/hospitals/import", files={"file": ("hospitals.csv", csv_body(45), "text/csv")})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["rows_read"] == 45
+
+        progress = wait_for_import(client, response.headers["Location"])
+        assert progress["status"] == "completed"
+        assert (progress["rows_created"], progress["rows_failed"]) == (45, 0)
+        sizes = [len(client.get(f"/hospitals/batch/{batch_id}").json()) for batch_id in progress["batch_ids"]]
+        assert sizes == [20, 20, 5]
+        assert not any(h["active"] for h in client.get("/hospitals/").json())
+
+    def test_raw_csv_body_and_activation(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that a text/csv body works and activate=true activates the batches."""
+        response = client.post(
+            "/hospitals/import?activate=true", content=csv_body(3), headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        assert wait_for_import(client, response.headers["Location"])["rows_created"] == 3
+        assert all(h["active"] for h in client.get("/hospitals/").json())
+
+    def test_reports_row_errors(self, client, mock_slow_task, bypass_rate_limit, monkeypatch, create_test_hospital):
+        """Test that invalid and rejected rows are reported by line while the rest are created."""
+        create_test_hospital(name="Hospital 0", address="0 Main St", phone="555-0000")
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        body = csv_body(3) + ",No Name St,\nToo,Many,Fields,Here\n"
+        response = client.post("/hospitals/import", files={"file": ("h.csv", body, "text/csv")})
+
+        progress = wait_for_import(client, response.headers["Location"])
+        assert progress["status"] == "completed"
+        assert (progress["rows_read"], progress["rows_created"], progress["rows_failed"]) == (5, 2, 3)
+        errors = {error["line"]: error["detail"] for error in progress["errors"]}
+        assert set(errors) == {2, 5, 6}
+        assert "already exists" in errors[2]
+        assert errors[6] == "Expected 3 fields, got 4"
+
+    def test_client_chosen_id(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that an import can be given its id up front, once."""
+        import_id = uuid.uuid4()
+        url = f"/hospitals/import?import_id={import_id}"
+        response = client.post(url, content=csv_body(3), headers={"Content-Type": "text/csv"})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.headers["Location"] == f"/imports/{import_id}"
+        assert wait_for_import(client, f"/imports/{import_id}")["rows_created"] == 3
+
+        response = client.post(url, content=csv_body(3), headers={"Content-Type": "text/csv"})
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_disconnect_fails_the_import(self, client, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that an abandoned upload ends the import, keeps its rows, and frees the id for a retry."""
+        async def abandoned(content_type, body):
+            yield csv_body(3).encode()
+            raise ClientDisconnect()
+
+        import_id = uuid.uuid4()
+        url = f"/hospitals/import?import_id={import_id}"
+        with monkeypatch.context() as patch:
+            patch.setattr("app.main.upload_chunks", abandoned)
+            response = client.post(url, content=csv_body(3), headers={"Content-Type": "text/csv"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        progress = wait_for_import(client, f"/imports/{import_id}")
+        assert progress["status"] == "failed"
+        assert progress["rows_created"] == 3
+        response = client.post(url, content=csv_body(1), headers={"Content-Type": "text/csv"})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        # Let the retry finish before the store is torn down under its worker
+        assert wait_for_import(client, f"/imports/{import_id}")["status"] == "completed"
+
+    def test_batch_ids_are_capped(self, client, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that only the first batch ids are listed, with the total counted."""
+        monkeypatch.setattr("app.imports.IMPORT_MAX_BATCH_IDS", 2)
+        response = client.post("/hospitals/import", files={"file": ("hospitals.csv", csv_body(45), "text/csv")})
+
+        progress = wait_for_import(client, response.headers["Location"])
+        assert progress["batch_count"] == 3
+        assert len(progress["batch_ids"]) == 2
+
+    def test_several_workers_wait_for_completion(self, client, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that without polling the response is the finished import."""
+        monkeypatch.setenv("WORKERS", "2")
+        response = client.post("/hospitals/import", files={"file": ("hospitals.csv", csv_body(45), "text/csv")})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Location" not in response.headers
+        progress = response.json()
+        assert progress["status"] == "completed"
+        assert progress["rows_created"] == 45
+
+    def test_repeats_within_a_chunk_count_as_duplicates(self, client, mock_slow_task, bypass_rate_limit, monkeypatch):
+        """Test that a row repeated in one chunk is reported once as created."""
+        monkeypatch.setenv("DEDUP_MODE", "return")
+        body = csv_body(2) + "Hospital 0,0 Main St,555-0000\n"
+        response = client.post("/hospitals/import", content=body, headers={"Content-Type": "text/csv"})
+
+        progress = wait_for_import(client, response.headers["Location"])
+        assert (progress["rows_created"], progress["rows_duplicate"]) == (2, 1)
+        assert len(client.get("/hospitals/").json()) == 2
+
+    def test_bad_header_is_rejected(self, client, bypass_rate_limit):
+        """Test that a CSV without the required columns fails at once."""
+        response = client.post("/hospitals/import", files={"file": ("h.csv", "name,phone\nA,1\n", "text/csv")})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "address" in response.json()["detail"]
+
+        progress = client.get(response.headers["Location"]).json()
+        assert progress["status"] == "failed"
+        assert progress["rows_read"] == 0
+
+    @pytest.mark.parametrize("kwargs, code", [
+        ({"content": b"{}", "headers": {"Content-Type": "application/json"}}, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE),
+        ({"data": {"note": "no file"}, "files": {"other": (None, "x")}}, status.HTTP_400_BAD_REQUEST),
+        ({"content": b"", "headers": {"Content-Type": "text/csv"}}, status.HTTP_400_BAD_REQUEST),
+    ])
+    def test_unusable_uploads(self, client, bypass_rate_limit, kwargs, code):
+        """Test that wrong content types, missing files and empty files are rejected."""
+        assert client.post("/hospitals/import", **kwargs).status_code == code
+
+    def test_unknown_import(self, client, bypass_rate_limit):
+        """Test that unknown imports return 404."""
+        assert client.get(f"/imports/{uuid.uuid4()}").status_code == status.HTTP_404_NOT_FOUND
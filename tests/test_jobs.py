@@ -0,0 +1,202 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+import pytest
+from fastapi import HTTPException, status
+from app.jobs import JobStore
+from app.models import Hospital
+
+ASYNC = {"Prefer": "respond-async"}
+
+
+def _finished(result=None, error=None):
+    """A future that has already finished, so job outcomes are deterministic."""
+    future = Future()
+    future.set_running_or_notify_cancel()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def _hospital(hospital_id=1):
+    return Hospital(id=hospital_id, name="Test Hospital", address="123 Test St")
+
+
+def wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+class TestJobStore:
+    """Test the background job store."""
+
+    def test_records_result(self):
+        """Test that a finished job carries the created hospital."""
+        store = JobStore()
+        hospital = _hospital()
+        future = Future()
+        job = store.track(future)
+
+        assert job.status == "pending"
+        future.set_running_or_notify_cancel()
+        future.set_result(hospital)
+        finished = store.get(job.id)
+        assert finished.status == "succeeded"
+        assert finished.hospital == hospital
+        assert finished.finished_at is not None
+
+    def test_records_errors(self):
+        """Test that HTTP errors keep their detail and other errors are masked."""
+        store = JobStore()
+
+        job = store.get(store.track(_finished(error=HTTPException(status_code=400, detail="Batch is full"))).id)
+        assert (job.status, job.error, job.status_code) == ("failed", "Batch is full", 400)
+        job = store.get(store.track(_finished(error=RuntimeError("secret"))).id)
+        assert (job.status, job.error, job.status_code) == ("failed", "Internal error", 500)
+
+    def test_groups_by_batch(self):
+        """Test that jobs are listed per batch in submission order."""
+        store = JobStore()
+        batch_id = uuid.uuid4()
+        first = store.track(_finished(_hospital()), batch_id)
+        store.track(_finished(_hospital()))
+        second = store.track(_finished(_hospital()), batch_id)
+
+        assert [job.id for job in store.get_by_batch_id(batch_id)] == [first.id, second.id]
+        assert store.count_unfinished(batch_id) == 0
+
+    def test_finished_jobs_expire(self, clock):
+        """Test that finished jobs are dropped after their TTL."""
+        store = JobStore(ttl_seconds=10, clock=clock)
+        batch_id = uuid.uuid4()
+        old = store.track(_finished(_hospital()), batch_id)
+        clock.now = 11
+        store.track(_finished(_hospital()))
+
+        assert store.get(old.id) is None
+        assert store.get_by_batch_id(batch_id) == []
+        assert len(store) == 1
+
+    def test_unfinished_jobs_are_kept(self):
+        """Test that the size bound only drops finished jobs."""
+        store = JobStore(max_entries=1)
+        batch_id = uuid.uuid4()
+        futures = [Future() for _ in range(3)]
+        jobs = [store.track(future, batch_id) for future in futures]
+        store.track(_finished(_hospital()))
+
+        assert all(store.get(job.id) is not None for job in jobs)
+        assert store.count_unfinished(batch_id) == 3
+
+    def test_tracks_futures(self):
+        """Test that a tracked future reports running and then its outcome."""
+        store = JobStore()
+        future = Future()
+        job = store.track(future)
+
+        future.set_running_or_notify_cancel()
+        assert store.get(job.id).status == "running"
+        future.set_exception(HTTPException(status_code=409, detail="Duplicate"))
+        job = store.get(job.id)
+        assert (job.status, job.status_code) == ("failed", 409)
+
+
+class TestAsyncCreate:
+    """Test creating hospitals as background jobs."""
+
+    def test_returns_job_and_creates(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that Prefer: respond-async answers 202 and the job creates the hospital."""
+        response = client.post("/hospitals/", json=sample_hospital_data, headers=ASYNC)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.headers["Preference-Applied"] == "respond-async"
+        job = response.json()
+        assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+        job = wait_for_job(client, job["id"])
+        assert job["status"] == "succeeded"
+        hospital = client.get(f"/hospitals/{job['hospital']['id']}").json()
+        assert hospital["name"] == sample_hospital_data["name"]
+
+    def test_several_workers_create_synchronously(self, client, mock_slow_task, bypass_rate_limit, monkeypatch, sample_hospital_data):
+        """Test that respond-async is not applied when a poll could reach another worker."""
+        monkeypatch.setenv("WORKERS", "2")
+        response = client.post("/hospitals/", json=sample_hospital_data, headers=ASYNC)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "Preference-Applied" not in response.headers
+        assert client.get(f"/hospitals/{response.json()['id']}").status_code == status.HTTP_200_OK
+
+    def test_validates_before_accepting(self, client, bypass_rate_limit):
+        """Test that an invalid payload fails at once instead of as a job."""
+        response = client.post("/hospitals/", json={"name": "", "address": "1 Main St"}, headers=ASYNC)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_full_batch_is_rejected_up_front(self, client, create_test_batch, mock_slow_task, bypass_rate_limit):
+        """Test that queued jobs count towards the batch limit."""
+        hospitals, batch_id = create_test_batch(19)
+        row = {"name": "Last", "address": "1 Main St", "creation_batch_id": str(batch_id)}
+
+        with pytest.MonkeyPatch.context() as patch:
+            release = threading.Event()
+            patch.setattr("app.main.slow_running_task", lambda: release.wait(5))
+            try:
+                assert client.post("/hospitals/", json=row, headers=ASYNC).status_code == status.HTTP_202_ACCEPTED
+                response = client.post("/hospitals/", json=dict(row, name="Over"), headers=ASYNC)
+                assert response.status_code == status.HTTP_400_BAD_REQUEST
+            finally:
+                release.set()
+
+        jobs = client.get(f"/jobs?batch_id={batch_id}").json()
+        assert len(jobs) == 1
+        assert wait_for_job(client, jobs[0]["id"])["status"] == "succeeded"
+
+    def test_failed_job_reports_error(self, client, mock_slow_task, bypass_rate_limit, monkeypatch, create_test_hospital):
+        """Test that a create rejected by the worker shows up as a failed job."""
+        create_test_hospital(name="Dup", address="1 Main St", phone=None)
+        monkeypatch.setenv("DEDUP_MODE", "reject")
+        job = client.post("/hospitals/", json={"name": "Dup", "address": "1 Main St"}, headers=ASYNC).json()
+
+        job = wait_for_job(client, job["id"])
+        assert job["status"] == "failed"
+        assert job["status_code"] == status.HTTP_409_CONFLICT
+
+    def test_idempotency_key_returns_same_job(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that a retried async create returns the original job."""
+        headers = dict(ASYNC, **{"Idempotency-Key": "job-1"})
+        first = client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+        second = client.post("/hospitals/", json=sample_hospital_data, headers=headers)
+
+        assert second.status_code == status.HTTP_202_ACCEPTED
+        assert second.json()["id"] == first.json()["id"]
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert wait_for_job(client, first.json()["id"])["status"] == "succeeded"
+
+    def test_poll_by_batch(self, client, mock_slow_task, bypass_rate_limit):
+        """Test that a batch's jobs can be polled together."""
+        batch_id = uuid.uuid4()
+        for i in range(3):
+            row = {"name": f"H{i}", "address": "1 Main St", "creation_batch_id": str(batch_id)}
+            client.post("/hospitals/", json=row, headers=ASYNC)
+
+        jobs = client.get(f"/jobs?batch_id={batch_id}").json()
+        assert len(jobs) == 3
+        assert all(wait_for_job(client, job["id"])["status"] == "succeeded" for job in jobs)
+
+    def test_unknown_jobs(self, client, bypass_rate_limit):
+        """Test that unknown job ids and batches return 404."""
+        assert client.get(f"/jobs/{uuid.uuid4()}").status_code == status.HTTP_404_NOT_FOUND
+        assert client.get(f"/jobs?batch_id={uuid.uuid4()}").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_prefer_header_is_opt_in(self, client, mock_slow_task, bypass_rate_limit, sample_hospital_data):
+        """Test that other preferences keep the synchronous create."""
+        response = client.post("/hospitals/", json=sample_hospital_data, headers={"Prefer": "return=minimal"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == 1
@@ -145,6 +145,13 @@ class TestHospitalUpdateModel:
         assert hospital_update.address is None
         assert hospital_update.phone is None
 
+    def test_hospital_update_rejects_null_name_and_address(self):
+        """Test that name and address may be omitted but not set to null."""
+        for field in ("name", "address"):
+            with pytest.raises(ValidationError):
+                HospitalUpdate(**{field: None})
+        assert HospitalUpdate(phone=None).model_dump(exclude_unset=True) == {"phone": None}
+
     def test_hospital_update_model_dump_exclude_unset(self):
         """Test that model_dump(exclude_unset=True) works correctly."""
         update_data = {"name": "Updated Name"}
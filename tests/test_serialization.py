@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import serialization
+from app.models import Hospital
+from app.serialization import HOSPITAL_FIELDS, encode_hospitals, hospital_fields, hospital_json, json_array, parse_fields
+
+
+@pytest.fixture(params=["orjson", "pydantic"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+class TestHospitalJson:
+    """Test that pre-encoded hospitals match what FastAPI would send."""
+
+    @pytest.mark.parametrize("created_at", [
+        datetime(2024, 1, 1, 10, 0),
+        datetime(2024, 1, 1, 10, 0, 0, 120000),
+        datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc),
+        datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    ])
+    def test_matches_pydantic(self, encoder, created_at):
+        """Test byte-for-byte equality with the response model's encoding."""
+        hospital = Hospital(
+            id=7,
+            name='Zürich "Central"',
+            address="1 Main St",
+            phone=None,
+            creation_batch_id=uuid.uuid4(),
+            active=False,
+            created_at=created_at,
+        )
+        assert hospital_json(hospital) == hospital.model_dump_json().encode()
+
+    def test_projection(self, encoder):
+        """Test that only the requested fields are encoded, in model order."""
+        hospital = Hospital(id=7, name="General", address="1 Main St", active=False)
+        assert hospital_json(hospital, ("id", "name", "active")) == b'{"id":7,"name":"General","active":false}'
+
+    def test_encode_many(self, encoder):
+        """Test that encoding a list at once matches joining single encodings."""
+        hospitals = [Hospital(id=i, name=f"H{i}", address="1 Main St") for i in range(1, 4)]
+        expected = json_array(hospital_json(h) for h in hospitals)
+        assert encode_hospitals(hospital_fields(h) for h in hospitals) == expected
+        assert encode_hospitals([]) == b"[]"
+
+    def test_json_array(self):
+        """Test joining encoded values into an array."""
+        assert json_array([]) == b"[]"
+        assert json_array([b"1", b'{"a":2}']) == b'[1,{"a":2}]'
+
+
+class TestParseFields:
+    """Test parsing of the ``fields`` query parameter."""
+
+    def test_model_order(self):
+        """Test that names come back deduplicated in model order."""
+        assert parse_fields("active, name,id,name") == ("id", "name", "active")
+
+    def test_all_fields_means_no_projection(self):
+        """Test that asking for everything takes the unprojected path."""
+        assert parse_fields(None) is None
+        assert parse_fields(",".join(reversed(HOSPITAL_FIELDS))) is None
+
+    @pytest.mark.parametrize("text", ["", " , ", "id,secret"])
+    def test_rejected(self, text):
+        """Test that empty and unknown field lists are errors."""
+        with pytest.raises(ValueError):
+            parse_fields(text)
@@ -0,0 +1,749 @@
+import json
+import multiprocessing
+import os
+import pytest
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app import database
+from app.models import Hospital
+from pydantic import ValidationError
+from app.storage import (
+    BACKENDS,
+    JournaledBackend,
+    MemoryBackend,
+    SharedBackend,
+    SqliteBackend,
+    StorageBackend,
+    create_backend,
+)
+from app.storage.base import iter_pages
+
+
+@pytest.fixture
+def capacity(request):
+    """Backend capacity; a class overrides it with an indirect ``capacity`` parameter."""
+    return getattr(request, "param", 100)
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request, capacity):
+    """Every registered backend in turn, closed after the test."""
+    if request.param == "shared":
+        request.getfixturevalue("store_server")
+    backend = create_backend(request.param, capacity=capacity)
+    yield backend
+    backend.close()
+
+
+class TestBackendSelection:
+    """Test storage backend registry and selection."""
+
+    def test_default_backend_is_memory(self, monkeypatch):
+        """Test that the memory backend is used when nothing is configured."""
+        monkeypatch.delenv("STORAGE_BACKEND", raising=False)
+        backend = create_backend()
+        assert isinstance(backend, MemoryBackend)
+
+    def test_backend_selected_by_environment(self, monkeypatch):
+        """Test selecting a backend through the STORAGE_BACKEND variable."""
+        monkeypatch.setenv("STORAGE_BACKEND", "MEMORY")
+        assert isinstance(create_backend(capacity=3), MemoryBackend)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            create_backend("does-not-exist")
+
+    @pytest.mark.parametrize("name", sorted(BACKENDS))
+    def test_backends_implement_protocol(self, name, request):
+        """Test that every registered backend satisfies the protocol."""
+        if name == "shared":
+            request.getfixturevalue("store_server")
+        backend = create_backend(name, capacity=3)
+        try:
+            assert isinstance(backend, StorageBackend)
+        finally:
+            backend.close()
+
+    def test_active_store_implements_protocol(self):
+        """Test that the database facade uses a protocol-compliant store."""
+        assert isinstance(database.store, StorageBackend)
+
+
+class TestSqliteBackend:
+    """Test behavior specific to the durable SQLite backend."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        # Not the SQLITE_PATH the autouse fixture gives database.store
+        return str(tmp_path / "backend.db")
+
+    def test_uses_wal_mode(self, db_path):
+        """Test that connections run in write-ahead-log mode."""
+        backend = SqliteBackend(path=db_path)
+        try:
+            with backend._connection() as connection:
+                mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+            assert mode == "wal"
+        finally:
+            backend.close()
+
+    def test_data_survives_reopen(self, db_path):
+        """Test that hospitals and batches persist across restarts."""
+        batch_id = uuid.uuid4()
+        backend = SqliteBackend(path=db_path)
+        created = backend.create_hospital(
+            Hospital(id=0, name="Durable", address="1 Disk St", creation_batch_id=batch_id, active=False)
+        )
+        backend.close()
+
+        reopened = SqliteBackend(path=db_path)
+        try:
+            assert reopened.get_hospital_by_id(created.id) == created
+            assert reopened.get_batch_summary(batch_id).hospital_count == 1
+            # Ids keep increasing after a restart
+            assert reopened.create_hospital(Hospital(id=0, name="Next", address="2 Disk St")).id == created.id + 1
+        finally:
+            reopened.close()
+
+    def test_fifo_eviction_does_not_reuse_ids(self, db_path):
+        """Test FIFO eviction at capacity and monotonic ids."""
+        backend = SqliteBackend(capacity=2, path=db_path)
+        try:
+            ids = [
+                backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St")).id
+                for i in range(3)
+            ]
+            assert ids == [1, 2, 3]
+            assert backend.count_hospitals() == 2
+            assert [h.id for h in backend.get_all_hospitals()] == [2, 3]
+        finally:
+            backend.close()
+
+    def test_inactive_first_eviction(self, db_path):
+        """Test that inactive rows are evicted before active ones."""
+        backend = SqliteBackend(capacity=2, path=db_path, eviction_policy="inactive_first")
+        try:
+            backend.create_hospital(Hospital(id=0, name="Active", address="1 Main St"))
+            backend.create_hospital(Hospital(id=0, name="Inactive", address="1 Main St", active=False))
+            backend.create_hospital(Hospital(id=0, name="New", address="1 Main St"))
+            assert [h.name for h in backend.get_all_hospitals()] == ["Active", "New"]
+            assert backend.get_stats().evictions == 1
+        finally:
+            backend.close()
+
+    def test_unsupported_eviction_policy(self, db_path):
+        """Test that policies SQLite cannot honor are rejected."""
+        with pytest.raises(ValueError, match="not supported by the sqlite backend"):
+            SqliteBackend(path=db_path, eviction_policy="lru")
+
+    def test_dedup_key_backfilled_for_old_databases(self, db_path):
+        """Test that databases created before dedup get the key column."""
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE hospitals (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+            "address TEXT NOT NULL, phone TEXT, creation_batch_id TEXT, active INTEGER NOT NULL, "
+            "created_at TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO hospitals (name, address, phone, active, created_at) "
+            "VALUES ('Old Hospital', '1 Main St', NULL, 1, '2024-01-01T00:00:00.000000')"
+        )
+        connection.commit()
+        connection.close()
+
+        backend = SqliteBackend(path=db_path)
+        try:
+            assert backend.find_duplicate("old hospital", "1 MAIN ST", None).id == 1
+            assert [h.name for h in backend.search_hospitals("old", 10)] == ["Old Hospital"]
+        finally:
+            backend.close()
+
+    def test_versions_survive_reopen(self, db_path):
+        """Test that versions persist and that pre-existing batches get one."""
+        batch_id = uuid.uuid4()
+        connection = sqlite3.connect(db_path)
+        connection.execute(
+            "CREATE TABLE hospitals (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+            "address TEXT NOT NULL, phone TEXT, creation_batch_id TEXT, active INTEGER NOT NULL, "
+            "created_at TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO hospitals (name, address, phone, creation_batch_id, active, created_at) "
+            "VALUES ('Old Hospital', '1 Main St', NULL, ?, 1, '2024-01-01T00:00:00.000000')",
+            (str(batch_id),),
+        )
+        connection.commit()
+        connection.close()
+
+        backend = SqliteBackend(path=db_path)
+        try:
+            assert backend.get_version(batch_id) is not None
+            backend.create_hospital(Hospital(id=0, name="New", address="2 Main St"))
+            versions = backend.get_version(), backend.get_version(batch_id)
+        finally:
+            backend.close()
+
+        backend = SqliteBackend(path=db_path)
+        try:
+            assert (backend.get_version(), backend.get_version(batch_id)) == versions
+        finally:
+            backend.close()
+
+    def test_concurrent_creates(self, db_path):
+        """Test that pooled connections handle threadpool-style concurrency."""
+        backend = SqliteBackend(path=db_path, pool_size=4)
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                created = list(executor.map(
+                    lambda i: backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St")),
+                    range(100),
+                ))
+            assert len({h.id for h in created}) == 100
+            assert backend.count_hospitals() == 100
+        finally:
+            backend.close()
+
+
+class TestJournaledBackend:
+    """Test write-ahead logging and snapshot recovery of the memory store."""
+
+    @pytest.fixture
+    def journal_dir(self, tmp_path):
+        return str(tmp_path / "journal")
+
+    def _populate(self, backend):
+        batch_id = uuid.uuid4()
+        kept = backend.create_hospital(Hospital(id=0, name="Kept", address="1 Main St"))
+        deleted = backend.create_hospital(Hospital(id=0, name="Deleted", address="2 Main St"))
+        for i in range(3):
+            backend.create_hospital(
+                Hospital(id=0, name=f"B{i}", address="3 Main St", creation_batch_id=batch_id, active=False)
+            )
+        kept.name = "Kept (renamed)"
+        backend.update_hospital(kept.id, kept)
+        backend.delete_hospital(deleted.id)
+        backend.activate_hospitals_by_batch_id(batch_id)
+        return batch_id
+
+    def test_recovers_bulk_create(self, journal_dir):
+        """Test that a bulk create and the evictions it caused replay as one entry."""
+        backend = JournaledBackend(capacity=3, directory=journal_dir, snapshot_interval=0)
+        backend.create_hospital(Hospital(id=0, name="Old", address="1 Main St"))
+        batch_id = uuid.uuid4()
+        backend.create_hospitals([
+            Hospital(id=0, name=f"B{i}", address="1 Main St", creation_batch_id=batch_id) for i in range(3)
+        ])
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        recovered = JournaledBackend(capacity=3, directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+            assert recovered.create_hospital(Hospital(id=0, name="Next", address="1 Main St")).id == 5
+        finally:
+            recovered.close()
+
+    def test_recovers_from_log(self, journal_dir):
+        """Test that replaying the log restores every mutation."""
+        backend = JournaledBackend(directory=journal_dir, snapshot_interval=0)
+        batch_id = self._populate(backend)
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        recovered = JournaledBackend(directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+            assert recovered.get_batch_summary(batch_id).active_count == 3
+            assert recovered.create_hospital(Hospital(id=0, name="New", address="4 Main St")).id == 6
+        finally:
+            recovered.close()
+
+    def test_recovers_from_snapshot_and_log_tail(self, journal_dir):
+        """Test recovery from a snapshot plus the entries logged after it."""
+        backend = JournaledBackend(directory=journal_dir, snapshot_interval=4)
+        self._populate(backend)
+        backend.create_hospital(Hospital(id=0, name="Tail", address="5 Main St"))
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        assert os.path.getsize(os.path.join(journal_dir, "hospitals.snapshot")) > 0
+        recovered = JournaledBackend(directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+        finally:
+            recovered.close()
+
+    def test_snapshot_is_written_in_the_background(self, journal_dir, monkeypatch):
+        """Test that writes go on while a snapshot is written, and recovery sees both."""
+        backend = JournaledBackend(directory=journal_dir, snapshot_interval=0)
+        self._populate(backend)
+        release = threading.Event()
+        write_snapshot = backend._write_snapshot
+
+        def blocked(*args):
+            release.wait(5)
+            write_snapshot(*args)
+
+        monkeypatch.setattr(backend, "_write_snapshot", blocked)
+        backend.snapshot()
+        # The writer lock is free while the snapshot waits
+        backend.create_hospital(Hospital(id=0, name="During", address="5 Main St"))
+        assert os.listdir(journal_dir).count(f"hospitals.log.{backend.seq - 1}") == 1
+        release.set()
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        assert sorted(os.listdir(journal_dir)) == ["hospitals.log", "hospitals.snapshot"]
+        recovered = JournaledBackend(directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+        finally:
+            recovered.close()
+
+    def test_recovers_from_segments_without_snapshot(self, journal_dir, monkeypatch):
+        """Test that segments are replayed when the snapshot never finished."""
+        backend = JournaledBackend(directory=journal_dir, snapshot_interval=3)
+        monkeypatch.setattr(backend, "_write_snapshot", lambda *args: None)
+        batch_id = self._populate(backend)
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        assert len([name for name in os.listdir(journal_dir) if name.startswith("hospitals.log.")]) == 2
+        recovered = JournaledBackend(directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+            assert recovered.get_batch_summary(batch_id).active_count == 3
+        finally:
+            recovered.close()
+
+    def test_torn_log_tail_is_discarded(self, journal_dir):
+        """Test that a partially written last entry does not break recovery."""
+        backend = JournaledBackend(directory=journal_dir)
+        backend.create_hospital(Hospital(id=0, name="Complete", address="1 Main St"))
+        backend.close()
+        with open(os.path.join(journal_dir, "hospitals.log"), "ab") as f:
+            f.write(b'{"op":"create","row":[2,"Torn')
+
+        recovered = JournaledBackend(directory=journal_dir)
+        try:
+            assert [h.name for h in recovered.get_all_hospitals()] == ["Complete"]
+            recovered.create_hospital(Hospital(id=0, name="After", address="2 Main St"))
+        finally:
+            recovered.close()
+
+        reopened = JournaledBackend(directory=journal_dir)
+        try:
+            assert [h.name for h in reopened.get_all_hospitals()] == ["Complete", "After"]
+        finally:
+            reopened.close()
+
+    def test_replay_reproduces_fifo_eviction(self, journal_dir):
+        """Test that unlogged evictions are reproduced by replay."""
+        backend = JournaledBackend(capacity=2, directory=journal_dir)
+        for i in range(3):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+        backend.close()
+
+        recovered = JournaledBackend(capacity=2, directory=journal_dir)
+        try:
+            assert [h.id for h in recovered.get_all_hospitals()] == [2, 3]
+        finally:
+            recovered.close()
+
+    def test_replay_reproduces_lru_eviction(self, journal_dir, monkeypatch):
+        """Test that evictions depending on reads are restored from the log."""
+        monkeypatch.setenv("EVICTION_POLICY", "lru")
+        backend = JournaledBackend(capacity=2, directory=journal_dir)
+        for i in range(2):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+        backend.get_hospital_by_id(1)
+        backend.create_hospital(Hospital(id=0, name="H2", address="1 Main St"))
+        expected = backend.get_all_hospitals()
+        backend.close()
+
+        assert [h.id for h in expected] == [1, 3]
+        recovered = JournaledBackend(capacity=2, directory=journal_dir)
+        try:
+            assert recovered.get_all_hospitals() == expected
+            assert recovered.get_stats().evictions == 1
+        finally:
+            recovered.close()
+
+
+class TestSearch:
+    """Test name/address search on every backend."""
+
+    def _add(self, backend, name, address="1 Main St"):
+        return backend.create_hospital(Hospital(id=0, name=name, address=address))
+
+    def test_substring_and_prefix_matching(self, backend):
+        """Test substring matches for long terms and word prefixes for short ones."""
+        self._add(backend, "Riverside General Hospital")
+        self._add(backend, "St. Mary's Clinic")
+        self._add(backend, "Lakeview Medical Center", "9 Riverside Dr")
+
+        assert {h.name for h in backend.search_hospitals("verside", 10)} == {
+            "Riverside General Hospital", "Lakeview Medical Center"
+        }
+        assert [h.name for h in backend.search_hospitals("cl", 10)] == ["St. Mary's Clinic"]
+        assert [h.name for h in backend.search_hospitals("GENERAL hosp", 10)] == ["Riverside General Hospital"]
+        assert backend.search_hospitals("pediatric", 10) == []
+
+    def test_ranking(self, backend):
+        """Test that name prefixes beat name substrings, which beat addresses."""
+        self._add(backend, "Lakeview Medical Center", "9 Riverside Dr")
+        self._add(backend, "Central Riverside Hospital")
+        self._add(backend, "Riverside Clinic")
+
+        names = [h.name for h in backend.search_hospitals("riverside", 2)]
+        assert names == ["Riverside Clinic", "Central Riverside Hospital"]
+
+    def test_index_follows_writes(self, backend):
+        """Test that updates, deletes and evictions are reflected immediately."""
+        renamed = self._add(backend, "Old Name Hospital")
+        deleted = self._add(backend, "Doomed Hospital")
+
+        renamed.name = "Harbor Hospital"
+        backend.update_hospital(renamed.id, renamed)
+        backend.delete_hospital(deleted.id)
+
+        assert backend.search_hospitals("old name", 10) == []
+        assert backend.search_hospitals("doomed", 10) == []
+        assert [h.id for h in backend.search_hospitals("harbor", 10)] == [renamed.id]
+
+    def test_index_follows_eviction(self):
+        """Test that evicted rows leave the search index."""
+        backend = MemoryBackend(capacity=1)
+        self._add(backend, "Evicted Hospital")
+        self._add(backend, "Survivor Hospital")
+
+        assert [h.name for h in backend.search_hospitals("hospital", 10)] == ["Survivor Hospital"]
+        assert len(backend.store.search_index) == 1
+
+    def test_index_is_built_on_first_search(self):
+        """Test that unsearched stores hold no index and that a built one is budgeted."""
+        backend = MemoryBackend(capacity=10)
+        self._add(backend, "Riverside Hospital")
+        row_bytes = backend.store.bytes
+        assert backend.store.search_index is None
+
+        assert [h.name for h in backend.search_hospitals("river", 10)] == ["Riverside Hospital"]
+        assert backend.store.bytes == row_bytes + backend.store.search_index.bytes > row_bytes
+        self._add(backend, "Riverbend Clinic")
+        assert len(backend.search_hospitals("river", 10)) == 2
+
+    def test_postings_are_compacted(self):
+        """Test that removed rows are dropped from postings once enough of them are dead."""
+        backend = MemoryBackend(capacity=100)
+        hospitals = [self._add(backend, f"Harbor {i}") for i in range(20)]
+        backend.search_hospitals("harbor", 1)
+        index = backend.store.search_index
+        full_bytes = index.bytes
+
+        for hospital in hospitals[:15]:
+            backend.delete_hospital(hospital.id)
+        assert len(index._postings["har"]) < 20
+        assert index.bytes < full_bytes
+        assert sorted(h.id for h in backend.search_hospitals("harbor", 100)) == [h.id for h in hospitals[15:]]
+
+    def test_renames_do_not_grow_postings(self):
+        """Test that renaming a row back and forth keeps one entry per trigram."""
+        backend = MemoryBackend(capacity=100)
+        others = [self._add(backend, f"Harbor {i}") for i in range(5)]
+        hospital = self._add(backend, "Harbor General")
+        backend.search_hospitals("harbor", 1)
+        index = backend.store.search_index
+        sizes = {gram: len(posting) for gram, posting in index._postings.items()}
+        full_bytes = index.bytes
+
+        for i in range(2000):
+            backend.update_hospital_fields(hospital.id, {"name": "Harbor Central" if i % 2 == 0 else "Harbor General"})
+
+        assert {gram: len(posting) for gram, posting in index._postings.items()} == sizes
+        assert index.bytes == full_bytes
+        assert [h.id for h in backend.search_hospitals("general", 10)] == [hospital.id]
+        assert backend.search_hospitals("central", 10) == []
+        assert len(backend.search_hospitals("harbor", 10)) == len(others) + 1
+
+
+@pytest.mark.parametrize("capacity", [5], indirect=True)
+class TestPages:
+    """Test keyset pages on every backend."""
+
+    def test_pages_follow_evictions(self, backend):
+        """Test that pages stay in id order while FIFO eviction drops rows."""
+        for i in range(7):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+        backend.delete_hospital(5)
+
+        paged, after_id = [], 0
+        while True:
+            page = backend.get_hospitals_page(after_id, 2)
+            if not page:
+                break
+            paged += [h.id for h in page]
+            after_id = page[-1].id
+        assert paged == [h.id for h in backend.get_all_hospitals()]
+        assert paged[-2:] == [6, 7]
+
+    def test_iter_hospitals_matches_listing(self, backend):
+        """Test that streaming iteration yields the same rows as a full listing."""
+        for i in range(7):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+
+        assert list(backend.iter_hospitals()) == backend.get_all_hospitals()
+
+    @pytest.mark.parametrize("count", [0, 4, 5])
+    def test_iter_pages_boundaries(self, backend, count):
+        """Test page walking when the row count is, or is not, a page multiple."""
+        for i in range(count):
+            backend.create_hospital(Hospital(id=0, name=f"H{i}", address="1 Main St"))
+
+        walked = [h.id for h in iter_pages(backend.get_hospitals_page, 2)]
+        assert walked == [h.id for h in backend.get_all_hospitals()]
+
+
+class TestJsonReads:
+    """Test that pre-encoded reads agree with model reads on every backend."""
+
+    def test_json_matches_models(self, backend):
+        """Test single and full-listing JSON against the models' own encoding."""
+        batch_id = uuid.uuid4()
+        for i in range(3):
+            backend.create_hospital(
+                Hospital(id=0, name=f"H{i}", address="1 Main St", creation_batch_id=batch_id, active=False)
+            )
+        backend.activate_hospitals_by_batch_id(batch_id)
+
+        hospitals = backend.get_all_hospitals()
+        assert json.loads(backend.get_all_hospitals_json()) == [json.loads(h.model_dump_json()) for h in hospitals]
+        assert backend.get_hospital_json(2) == backend.get_hospital_by_id(2).model_dump_json().encode()
+        assert backend.get_hospital_json(99) is None
+
+    def test_projected_json(self, backend):
+        """Test that projected reads hold only the requested fields."""
+        backend.create_hospital(Hospital(id=0, name="H", address="1 Main St", phone="555-0100"))
+        assert json.loads(backend.get_all_hospitals_json(("id", "phone"))) == [{"id": 1, "phone": "555-0100"}]
+        assert json.loads(backend.get_hospital_json(1, ("name",))) == {"name": "H"}
+
+
+class TestVersions:
+    """Test the change versions behind conditional GETs on every backend."""
+
+    def _create(self, backend, batch_id=None):
+        return backend.create_hospital(Hospital(id=0, name="H", address="1 Main St", creation_batch_id=batch_id))
+
+    def test_global_version_follows_writes(self, backend):
+        """Test that creates, updates and deletes each change the version."""
+        seen = {backend.get_version()}
+        created = self._create(backend)
+        seen.add(backend.get_version())
+        backend.update_hospital(created.id, Hospital(id=created.id, name="Renamed", address="1 Main St"))
+        seen.add(backend.get_version())
+        backend.delete_hospital(created.id)
+        seen.add(backend.get_version())
+        assert len(seen) == 4
+
+    def test_batch_version_is_scoped(self, backend):
+        """Test that a batch version ignores other batches and tracks its own."""
+        batch_id = uuid.uuid4()
+        assert backend.get_version(batch_id) is None
+        self._create(backend, batch_id)
+        version = backend.get_version(batch_id)
+
+        self._create(backend, uuid.uuid4())
+        assert backend.get_version(batch_id) == version
+
+        backend.activate_hospitals_by_batch_id(batch_id)
+        assert backend.get_version(batch_id) == version  # Already active: nothing changed
+        self._create(backend, batch_id)
+        assert backend.get_version(batch_id) != version
+
+    def test_recreated_batch_gets_new_version(self, backend):
+        """Test that deleting and re-creating a batch never repeats a version."""
+        batch_id = uuid.uuid4()
+        self._create(backend, batch_id)
+        version = backend.get_version(batch_id)
+        backend.delete_hospitals_by_batch_id(batch_id)
+        assert backend.get_version(batch_id) is None
+
+        self._create(backend, batch_id)
+        assert backend.get_version(batch_id) not in (None, version)
+
+    def test_listing_is_never_older_than_version(self, monkeypatch):
+        """Test that a reader running right after a write never pairs its version with old rows."""
+        backend = MemoryBackend(capacity=10)
+        self._create(backend)
+        backend.get_all_hospitals_json()  # Cache a listing snapshot
+        seen = []
+        append = backend.store.append
+
+        def append_then_read(record, evict=True):
+            # A lock-free reader slipping in before the writer returns
+            evicted = append(record, evict)
+            version = backend.get_version()
+            seen.append((version, len(json.loads(backend.get_all_hospitals_json()))))
+            return evicted
+
+        monkeypatch.setattr(backend.store, "append", append_then_read)
+        self._create(backend)
+
+        assert seen == [(backend.get_version(), 2)]
+
+
+@pytest.mark.parametrize("capacity", [3], indirect=True)
+class TestBulkCreate:
+    """Test atomic multi-row creation on every backend."""
+
+    @pytest.fixture(autouse=True)
+    def eviction_policy(self, monkeypatch):
+        monkeypatch.setenv("EVICTION_POLICY", "inactive_first")
+
+    def _batch(self, count, batch_id):
+        return [
+            Hospital(id=0, name=f"B{i}", address="1 Main St", creation_batch_id=batch_id, active=False)
+            for i in range(count)
+        ]
+
+    def test_assigns_ids_in_order(self, backend):
+        """Test that every row is stored and gets its id, in request order."""
+        batch_id = uuid.uuid4()
+        hospitals = self._batch(3, batch_id)
+        created = backend.create_hospitals(hospitals)
+
+        assert [h.id for h in created] == [h.id for h in hospitals] == [1, 2, 3]
+        assert [h.id for h in backend.get_hospitals_by_batch_id(batch_id)] == [1, 2, 3]
+
+    def test_new_rows_are_never_evicted(self, backend):
+        """Test that a full store evicts older rows, not the inactive rows just added."""
+        if isinstance(backend, SharedBackend):
+            pytest.skip("The hosting process applies its own capacity")
+        backend.create_hospital(Hospital(id=0, name="Old", address="1 Main St"))
+        batch_id = uuid.uuid4()
+        backend.create_hospitals(self._batch(3, batch_id))
+
+        assert [h.name for h in backend.get_all_hospitals()] == ["B0", "B1", "B2"]
+        assert backend.get_stats().evictions == 1
+
+
+class TestDuplicateIndex:
+    """Test duplicate lookup by normalized name, address and phone."""
+
+    def test_find_duplicate(self, backend):
+        """Test that formatting differences still find the original."""
+        created = backend.create_hospital(Hospital(id=0, name="St. Mary's", address="1 Main St", phone="555-0100"))
+        backend.create_hospital(Hospital(id=0, name="St. Mary's", address="1 Main St", phone="555-0100"))
+
+        assert backend.find_duplicate("st marys", " 1 main  st. ", "(555) 0100") is None
+        assert backend.find_duplicate("ST. MARY'S", "1 Main St.", "555 0100").id == created.id
+        assert backend.find_duplicate("St. Mary's", "1 Main St", None) is None
+
+    def test_index_follows_writes(self, backend):
+        """Test that updates and deletes move rows in the duplicate index."""
+        hospital = backend.create_hospital(Hospital(id=0, name="Old", address="1 Main St"))
+        hospital.name = "New"
+        backend.update_hospital(hospital.id, hospital)
+
+        assert backend.find_duplicate("Old", "1 Main St", None) is None
+        assert backend.find_duplicate("New", "1 Main St", None).id == hospital.id
+
+        backend.delete_hospital(hospital.id)
+        assert backend.find_duplicate("New", "1 Main St", None) is None
+
+    def test_find_or_create(self, backend):
+        """Test that duplicates, stored or earlier in the call, are returned instead of inserted."""
+        stored = backend.create_hospital(Hospital(id=0, name="Stored", address="1 Main St"))
+        results = backend.find_or_create_hospitals([
+            Hospital(id=0, name="stored", address="1 Main St."),
+            Hospital(id=0, name="New", address="2 Main St"),
+            Hospital(id=0, name="NEW", address="2 main st"),
+        ])
+
+        assert [(hospital.id, created) for hospital, created in results] == [
+            (stored.id, False), (results[1][0].id, True), (results[1][0].id, False)
+        ]
+        assert backend.count_hospitals() == 2
+        assert backend.get_hospital_by_id(results[1][0].id).name == "New"
+
+    def test_memory_index_is_built_on_first_lookup(self):
+        """Test that the in-memory index costs nothing until duplicates are looked up."""
+        backend = MemoryBackend(capacity=100)
+        created = backend.create_hospital(Hospital(id=0, name="Early", address="1 Main St"))
+        row_bytes = backend.store.bytes
+        assert backend.store.dedup_index is None
+
+        assert backend.find_duplicate("early", "1 main st", None).id == created.id
+        assert backend.store.bytes > row_bytes
+        backend.delete_hospital(created.id)
+        assert backend.store.dedup_index == {}
+        assert backend.store.bytes == 0
+
+
+class TestFieldUpdates:
+    """Test partial updates on every backend."""
+
+    def test_only_given_fields_change(self, backend):
+        """Test that an update keeps an activation that happened after the client read the row."""
+        batch_id = uuid.uuid4()
+        created = backend.create_hospital(
+            Hospital(id=0, name="Old", address="1 Main St", phone="555-0100", creation_batch_id=batch_id, active=False)
+        )
+        backend.activate_hospitals_by_batch_id(batch_id)
+
+        updated = backend.update_hospital_fields(created.id, {"name": "New", "phone": None})
+        assert (updated.name, updated.address, updated.phone, updated.active) == ("New", "1 Main St", None, True)
+        assert backend.get_hospital_by_id(created.id) == updated
+        assert backend.get_batch_summary(batch_id).active_count == 1
+        assert backend.update_hospital_fields(999, {"name": "Missing"}) is None
+
+    def test_invalid_rows_are_not_stored(self, backend):
+        """Test that an update leaving a required field empty changes nothing."""
+        created = backend.create_hospital(Hospital(id=0, name="Kept", address="1 Main St"))
+        with pytest.raises(ValidationError):
+            backend.update_hospital_fields(created.id, {"name": None})
+        assert backend.get_hospital_by_id(created.id).name == "Kept"
+
+
+def _create_from_worker(environment, count):
+    """Create hospitals from a separate process, as a uvicorn worker would."""
+    backend = SharedBackend(
+        address=environment["SHARED_STORE_ADDRESS"], authkey=environment["SHARED_STORE_AUTHKEY"]
+    )
+    try:
+        return [
+            backend.create_hospital(Hospital(id=0, name=f"P{os.getpid()}-{i}", address="1 Main St")).id
+            for i in range(count)
+        ]
+    finally:
+        backend.close()
+
+
+class TestSharedBackend:
+    """Test sharing one hosted store between processes."""
+
+    def test_processes_see_one_store(self, store_server):
+        """Test that worker processes get unique ids from one shared store."""
+        environment = store_server.client_environment()
+        with multiprocessing.get_context("spawn").Pool(4) as pool:
+            results = pool.starmap(_create_from_worker, [(environment, 25)] * 4)
+
+        ids = [hospital_id for worker_ids in results for hospital_id in worker_ids]
+        assert sorted(ids) == list(range(1, 101))
+        assert store_server.backend.count_hospitals() == 100
+
+    def test_reads_and_batches_are_shared(self, store_server):
+        """Test that a client sees rows and batches written by the host."""
+        batch_id = uuid.uuid4()
+        store_server.backend.create_hospital(
+            Hospital(id=0, name="Hosted", address="1 Main St", creation_batch_id=batch_id, active=False)
+        )
+        backend = SharedBackend()
+        try:
+            assert backend.get_hospital_by_id(1).name == "Hosted"
+            assert backend.activate_hospitals_by_batch_id(batch_id) == 1
+            assert store_server.backend.get_batch_summary(batch_id).active_count == 1
+        finally:
+            backend.close()
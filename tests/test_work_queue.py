@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+from fastapi import status
+from app import main
+from app.work_queue import QueueFull, WorkQueue
+
+
+class Gate:
+    """Blocks tasks until released, counting the ones that started."""
+
+    def __init__(self):
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.started.release()
+        self.release.wait(5)
+
+    def wait_started(self, count):
+        for _ in range(count):
+            assert self.started.acquire(timeout=5)
+
+
+@pytest.fixture
+def gate():
+    gate = Gate()
+    yield gate
+    gate.release.set()
+
+
+class TestWorkQueue:
+    """Test the bounded create work queue."""
+
+    def test_runs_work(self):
+        """Test that submitted work runs and returns its result."""
+        queue = WorkQueue(workers=2, max_depth=2, expected_seconds=1)
+        assert queue.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+        assert queue.stats().completed == 1
+
+    def test_rejects_past_max_depth(self, gate):
+        """Test that a full queue refuses work with a drain-based Retry-After."""
+        queue = WorkQueue(workers=1, max_depth=2, expected_seconds=4)
+        futures = [queue.submit(gate)]
+        gate.wait_started(1)
+        futures += [queue.submit(gate) for _ in range(2)]
+
+        with pytest.raises(QueueFull) as exc_info:
+            queue.submit(gate)
+        # Two queued tasks at one task per 4 seconds
+        assert exc_info.value.retry_after == 8
+
+        stats = queue.stats()
+        assert (stats.running, stats.queued, stats.rejected) == (1, 2, 1)
+        assert stats.estimated_wait_seconds == 8
+
+        gate.release.set()
+        for future in futures:
+            future.result(timeout=5)
+        assert queue.stats().queued == 0
+
+    def test_tracks_service_and_wait_time(self, clock):
+        """Test that the drain rate follows how long tasks actually take."""
+        queue = WorkQueue(workers=2, max_depth=1, expected_seconds=10, clock=clock)
+        assert queue.stats().drain_rate == pytest.approx(0.2)
+
+        def task():
+            clock.now += 1
+
+        for _ in range(50):
+            queue.submit(task).result(timeout=5)
+        stats = queue.stats()
+        assert stats.drain_rate == pytest.approx(2, rel=0.01)
+        assert stats.wait_seconds == pytest.approx(0, abs=0.01)
+
+
+class TestCreateBackpressure:
+    """Test that creates past the queue bound fail fast."""
+
+    @pytest.fixture
+    def small_queue(self, monkeypatch, gate):
+        queue = WorkQueue(workers=1, max_depth=0, expected_seconds=5)
+        monkeypatch.setattr(main, "create_queue", queue)
+        monkeypatch.setattr(main.create_coalescer, "executor", queue)
+        monkeypatch.setattr(main, "slow_running_task", gate)
+        yield queue
+        gate.release.set()
+        queue.shutdown()
+
+    def _fill(self, client, gate):
+        thread = threading.Thread(target=client.post, args=("/hospitals/",), kwargs={
+            "json": {"name": "First", "address": "1 Main St"}
+        })
+        thread.start()
+        gate.wait_started(1)
+        return thread
+
+    def test_full_queue_returns_503(self, client, small_queue, gate, bypass_rate_limit):
+        """Test that a create beyond capacity gets 503 with Retry-After."""
+        first = self._fill(client, gate)
+
+        response = client.post("/hospitals/", json={"name": "Second", "address": "2 Main St"})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+
+        stats = client.get("/stats/queue").json()
+        assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 0, 1)
+
+        gate.release.set()
+        first.join(5)
+        assert [h["name"] for h in client.get("/hospitals/").json()] == ["First"]
+
+    def test_full_queue_refuses_jobs(self, client, small_queue, gate, bypass_rate_limit):
+        """Test that async creates are refused rather than queued as jobs."""
+        batch_id = "550e8400-e29b-41d4-a716-446655440000"
+        first = self._fill(client, gate)
+
+        response = client.post(
+            "/hospitals/",
+            json={"name": "Second", "address": "2 Main St", "creation_batch_id": batch_id},
+            headers={"Prefer": "respond-async"},
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert client.get(f"/jobs?batch_id={batch_id}").status_code == status.HTTP_404_NOT_FOUND
+
+        gate.release.set()
+        first.join(5)
+
+    def test_queue_stats(self, client, bypass_rate_limit):
+        """Test that queue stats report the configured bounds."""
+        stats = client.get("/stats/queue").json()
+        assert stats["workers"] == main.create_queue.workers
+        assert stats["max_depth"] == main.create_queue.max_depth